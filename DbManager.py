@@ -132,6 +132,7 @@ CREATE TABLE IF NOT EXISTS client (
   special_notes               TEXT         NOT NULL,
   created_at                  TIMESTAMPTZ  NOT NULL DEFAULT now(),
   updated_at                  TIMESTAMPTZ  NOT NULL DEFAULT now(),
+  row_version                 BIGINT       NOT NULL DEFAULT 1,
   is_deleted                  BOOLEAN      NOT NULL DEFAULT FALSE,
   deleted_at                  TIMESTAMPTZ,
   search_text TEXT
@@ -222,6 +223,7 @@ CREATE TABLE IF NOT EXISTS project (
   assignee_id           UUID         NOT NULL REFERENCES "user"(id)           ON UPDATE CASCADE ON DELETE RESTRICT,
   created_at            TIMESTAMPTZ  NOT NULL DEFAULT now(),
   updated_at            TIMESTAMPTZ  NOT NULL DEFAULT now(),
+  row_version           BIGINT       NOT NULL DEFAULT 1,
   is_deleted            BOOLEAN      NOT NULL DEFAULT FALSE,
   deleted_at            TIMESTAMPTZ,
   search_text TEXT
@@ -272,6 +274,7 @@ CREATE TABLE IF NOT EXISTS document (
   client_id      UUID         REFERENCES client(id)    ON UPDATE CASCADE ON DELETE RESTRICT,
   created_at     TIMESTAMPTZ  NOT NULL DEFAULT now(),
   updated_at     TIMESTAMPTZ  NOT NULL DEFAULT now(),
+  row_version    BIGINT       NOT NULL DEFAULT 1,
   purpose        VARCHAR(100) NOT NULL,
   is_deleted     BOOLEAN      NOT NULL DEFAULT FALSE,
   deleted_at     TIMESTAMPTZ,
@@ -289,6 +292,7 @@ CREATE TABLE IF NOT EXISTS quote (
   number     INT          GENERATED ALWAYS AS IDENTITY UNIQUE,
   created_at TIMESTAMPTZ  NOT NULL DEFAULT now(),
   updated_at TIMESTAMPTZ  NOT NULL DEFAULT now(),
+  row_version BIGINT       NOT NULL DEFAULT 1,
   amount     NUMERIC      NOT NULL,
   project_id UUID         NOT NULL REFERENCES project(id)   ON UPDATE CASCADE ON DELETE RESTRICT,
   client_id  UUID         NOT NULL REFERENCES client(id)    ON UPDATE CASCADE ON DELETE RESTRICT,
@@ -312,6 +316,7 @@ CREATE TABLE IF NOT EXISTS invoice (
   issuance_date DATE         NOT NULL,
   created_at    TIMESTAMPTZ  NOT NULL DEFAULT now(),
   updated_at    TIMESTAMPTZ  NOT NULL DEFAULT now(),
+  row_version   BIGINT       NOT NULL DEFAULT 1,
   amount        NUMERIC      NOT NULL,
   client_id     UUID         NOT NULL REFERENCES client(id)   ON UPDATE CASCADE ON DELETE RESTRICT,
   status_id     UUID         NOT NULL REFERENCES status(id) ON UPDATE CASCADE ON DELETE RESTRICT,
@@ -339,6 +344,7 @@ CREATE TABLE IF NOT EXISTS message (
   is_deleted         BOOLEAN      NOT NULL DEFAULT FALSE,
   deleted_at         TIMESTAMPTZ,
   has_mentions       BOOLEAN      NOT NULL DEFAULT FALSE,
+  mentions           CITEXT[]     NOT NULL DEFAULT '{}',
   search_text TEXT
 );
 """
@@ -479,6 +485,8 @@ CREATE TABLE IF NOT EXISTS notification (
   triggered_by_user CITEXT,
   content TEXT NOT NULL,
   isProcessed BOOLEAN NOT NULL DEFAULT FALSE,
+  client_id UUID REFERENCES client(id) ON DELETE CASCADE,
+  recipient_id UUID REFERENCES "user"(id) ON DELETE CASCADE,
   created_at TIMESTAMPTZ NOT NULL DEFAULT now()
 );
 """
@@ -500,6 +508,136 @@ CREATE TRIGGER trg_new_notification_row
   EXECUTE FUNCTION notify_notification_insert();
 """
 
+# Feeds the /event-stream listener in events.py. The payload is only the id,
+# NOTIFY payloads are capped at 8000 bytes.
+MESSAGE_LISTEN_NOTIFY = """
+CREATE OR REPLACE FUNCTION notify_message_insert() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+BEGIN
+  PERFORM pg_notify('project_message', NEW.id::text);
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_new_message_row ON message;
+CREATE TRIGGER trg_new_message_row
+  AFTER INSERT ON message
+  FOR EACH ROW
+  EXECUTE FUNCTION notify_message_insert();
+"""
+
+# Every notification is fanned out into one inbox row per recipient:
+#   recipient_id set -> that user
+#   client_id set    -> the client's users, its account managers and employee admins
+#   neither          -> every employee (admins and account managers), never
+#                       another client's users
+# The user who triggered it never receives their own notification.
+NOTIFICATION_INBOX = """
+CREATE TABLE IF NOT EXISTS notification_inbox (
+  user_id         UUID        NOT NULL REFERENCES "user"(id)       ON DELETE CASCADE,
+  notification_id UUID        NOT NULL REFERENCES notification(id) ON DELETE CASCADE,
+  created_at      TIMESTAMPTZ NOT NULL,
+  read_at         TIMESTAMPTZ,
+  PRIMARY KEY (user_id, notification_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_notification_inbox_cursor
+  ON notification_inbox (user_id, created_at DESC, notification_id DESC);
+CREATE INDEX IF NOT EXISTS idx_notification_inbox_unread
+  ON notification_inbox (user_id, created_at DESC) WHERE read_at IS NULL;
+
+CREATE TABLE IF NOT EXISTS notification_unread (
+  user_id UUID   PRIMARY KEY REFERENCES "user"(id) ON DELETE CASCADE,
+  unread  BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION notification_fan_out() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+BEGIN
+  INSERT INTO notification_inbox (user_id, notification_id, created_at)
+  SELECT u.id, NEW.id, NEW.created_at
+    FROM "user" u
+   WHERE NOT u.is_deleted
+     AND u.is_active
+     AND u.email IS DISTINCT FROM NEW.triggered_by_user
+     AND CASE
+           WHEN NEW.recipient_id IS NOT NULL THEN u.id = NEW.recipient_id
+           WHEN NEW.client_id IS NOT NULL THEN
+                u.client_id = NEW.client_id
+             OR u.email IN (SELECT account_manager_email FROM account_manager_client WHERE client_id = NEW.client_id)
+             OR u.email IN (SELECT v0 FROM casbin_rule WHERE ptype = 'g' AND v1 = 'employee_admin')
+           ELSE u.email IN (
+                  SELECT v0 FROM casbin_rule
+                   WHERE ptype = 'g' AND v1 IN ('employee_admin', 'employee_account_manager')
+                )
+         END
+  ON CONFLICT DO NOTHING;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_notification_fan_out ON notification;
+CREATE TRIGGER trg_notification_fan_out
+  AFTER INSERT ON notification
+  FOR EACH ROW
+  EXECUTE FUNCTION notification_fan_out();
+
+-- Unread counters move once per statement, so a broadcast or a bulk
+-- mark-as-read touches each recipient's counter row a single time
+CREATE OR REPLACE FUNCTION notification_unread_apply() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    INSERT INTO notification_unread (user_id, unread)
+    SELECT user_id, count(*) FROM new_rows WHERE read_at IS NULL GROUP BY user_id
+    ON CONFLICT (user_id) DO UPDATE SET unread = notification_unread.unread + EXCLUDED.unread;
+  ELSIF TG_OP = 'DELETE' THEN
+    UPDATE notification_unread nu
+       SET unread = GREATEST(nu.unread - d.n, 0)
+      FROM (SELECT user_id, count(*) AS n FROM old_rows WHERE read_at IS NULL GROUP BY user_id) d
+     WHERE nu.user_id = d.user_id;
+  ELSE
+    UPDATE notification_unread nu
+       SET unread = GREATEST(nu.unread + d.n, 0)
+      FROM (
+        SELECT n.user_id,
+               sum((n.read_at IS NULL)::int - (o.read_at IS NULL)::int) AS n
+          FROM new_rows n
+          JOIN old_rows o ON o.user_id = n.user_id AND o.notification_id = n.notification_id
+         GROUP BY n.user_id
+      ) d
+     WHERE nu.user_id = d.user_id AND d.n <> 0;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_notification_inbox_unread_insert ON notification_inbox;
+CREATE TRIGGER trg_notification_inbox_unread_insert
+  AFTER INSERT ON notification_inbox
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION notification_unread_apply();
+
+DROP TRIGGER IF EXISTS trg_notification_inbox_unread_update ON notification_inbox;
+CREATE TRIGGER trg_notification_inbox_unread_update
+  AFTER UPDATE ON notification_inbox
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION notification_unread_apply();
+
+DROP TRIGGER IF EXISTS trg_notification_inbox_unread_delete ON notification_inbox;
+CREATE TRIGGER trg_notification_inbox_unread_delete
+  AFTER DELETE ON notification_inbox
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION notification_unread_apply();
+"""
+
+NOTIFICATION_UNREAD_REBUILD = """
+INSERT INTO notification_unread (user_id, unread)
+SELECT user_id, count(*) FILTER (WHERE read_at IS NULL)
+  FROM notification_inbox
+ GROUP BY user_id;
+"""
+
 # ──────────────────────────────────────────────────────────────────────────────
 # 13: Notification
 # ──────────────────────────────────────────────────────────────────────────────
@@ -587,6 +725,25 @@ CREATE TABLE IF NOT EXISTS client_references (
   created_at                  TIMESTAMPTZ  NOT NULL DEFAULT now(),
   updated_at                  TIMESTAMPTZ  NOT NULL DEFAULT now()
 );
+-- One onboarding section row per client and one pricing row per label. These keys
+-- let /save-onboarding-data upsert instead of appending on every save.
+-- Saves from before the keys existed appended a row each time, only the newest is kept
+DELETE FROM client_onboarding_general o USING client_onboarding_general n
+ WHERE n.client_id = o.client_id AND (n.created_at, n.id) > (o.created_at, o.id);
+DELETE FROM client_onboarding_service o USING client_onboarding_service n
+ WHERE n.client_id = o.client_id AND (n.created_at, n.id) > (o.created_at, o.id);
+DELETE FROM client_onboarding_contact o USING client_onboarding_contact n
+ WHERE n.client_id = o.client_id AND (n.created_at, n.id) > (o.created_at, o.id);
+DELETE FROM client_onboarding_load o USING client_onboarding_load n
+ WHERE n.client_id = o.client_id AND (n.created_at, n.id) > (o.created_at, o.id);
+DELETE FROM client_pricing_structure o USING client_pricing_structure n
+ WHERE n.client_id = o.client_id AND n.item_label = o.item_label AND (n.created_at, n.id) > (o.created_at, o.id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_onboarding_general_client ON client_onboarding_general(client_id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_onboarding_service_client ON client_onboarding_service(client_id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_onboarding_contact_client ON client_onboarding_contact(client_id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_onboarding_load_client    ON client_onboarding_load(client_id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_pricing_client_label      ON client_pricing_structure(client_id, item_label);
+CREATE INDEX IF NOT EXISTS idx_references_client               ON client_references(client_id);
 """
 
 # Mapping of account managers to clients
@@ -611,57 +768,414 @@ CREATE TABLE IF NOT EXISTS client_admin_technician (
 
 
 
+# ──────────────────────────────────────────────────────────────────────────────
+# 14: ROW COUNTERS AND ROLLUPS
+# ──────────────────────────────────────────────────────────────────────────────
+
+# (counter, table, scope columns, has is_deleted) — exact per-scope totals for
+# the paginated list endpoints, so they never need COUNT(*) OVER(). Unscoped
+# counters ('*') are one total for a whole table, so like dashboard_rollup they
+# spread their writes over ROW_COUNTER_SHARDS rows and countRows sums them.
+ROW_COUNTER_SHARDS = 16
+
+ROW_COUNTERS = [
+    ("project", "project", [], True),
+    ("client", "client", [], True),
+    ("invoice_by_client", "invoice", ["client_id"], True),
+    ("quote_by_project", "quote", ["project_id"], True),
+    ("message_by_project", "message", ["project_id"], True),
+    ("document_by_project", "document", ["project_id"], True),
+    ("document_by_client_purpose", "document", ["client_id", "purpose"], True),
+    ("client_password_by_client", "client_password", ["client_id"], False),
+]
+
+ROW_COUNTER = f"""
+CREATE TABLE IF NOT EXISTS row_counter (
+  counter    VARCHAR(64) NOT NULL,
+  scope_key  TEXT        NOT NULL,
+  shard      SMALLINT    NOT NULL DEFAULT 0,
+  total      BIGINT      NOT NULL DEFAULT 0,
+  PRIMARY KEY (counter, scope_key, shard)
+);
+
+-- /get-notifications pages with has_more, nothing reads this counter any more
+DROP TRIGGER IF EXISTS trg_notification_row_counter ON notification;
+DELETE FROM row_counter WHERE counter = 'notification';
+
+CREATE OR REPLACE FUNCTION row_counter_apply(c TEXT, k TEXT, s SMALLINT, delta BIGINT) RETURNS VOID LANGUAGE sql AS $$
+  INSERT INTO row_counter (counter, scope_key, shard, total) VALUES (c, k, s, delta)
+  ON CONFLICT (counter, scope_key, shard) DO UPDATE SET total = row_counter.total + EXCLUDED.total
+$$;
+
+-- TG_ARGV[0] is the counter name, TG_ARGV[1..] the scope columns.
+-- Soft-deleted rows (is_deleted = TRUE) are not counted.
+CREATE OR REPLACE FUNCTION row_counter_refresh() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+DECLARE
+  old_row JSONB;
+  new_row JSONB;
+  old_key TEXT;
+  new_key TEXT;
+  shard   SMALLINT := CASE WHEN TG_NARGS = 1 THEN floor(random() * {ROW_COUNTER_SHARDS})::smallint ELSE 0 END;
+BEGIN
+  IF TG_OP <> 'INSERT' THEN
+    old_row := to_jsonb(OLD);
+    IF NOT COALESCE((old_row->>'is_deleted')::boolean, FALSE) THEN
+      old_key := CASE WHEN TG_NARGS = 1 THEN '*' END;
+      FOR i IN 1 .. TG_NARGS - 1 LOOP
+        old_key := CASE WHEN i = 1 THEN '' ELSE old_key || ':' END || COALESCE(old_row->>TG_ARGV[i], '');
+      END LOOP;
+    END IF;
+  END IF;
+
+  IF TG_OP <> 'DELETE' THEN
+    new_row := to_jsonb(NEW);
+    IF NOT COALESCE((new_row->>'is_deleted')::boolean, FALSE) THEN
+      new_key := CASE WHEN TG_NARGS = 1 THEN '*' END;
+      FOR i IN 1 .. TG_NARGS - 1 LOOP
+        new_key := CASE WHEN i = 1 THEN '' ELSE new_key || ':' END || COALESCE(new_row->>TG_ARGV[i], '');
+      END LOOP;
+    END IF;
+  END IF;
+
+  IF old_key IS NOT DISTINCT FROM new_key THEN
+    RETURN NULL;
+  END IF;
+
+  -- A shard may go negative, only the sum over the shards is meaningful
+  IF old_key IS NOT NULL THEN
+    PERFORM row_counter_apply(TG_ARGV[0], old_key, shard, -1);
+  END IF;
+
+  IF new_key IS NOT NULL THEN
+    PERFORM row_counter_apply(TG_ARGV[0], new_key, shard, 1);
+  END IF;
+
+  RETURN NULL;
+END;
+$$;
+""" + "".join(
+    f"""
+DROP TRIGGER IF EXISTS trg_{counter}_row_counter ON {table};
+CREATE TRIGGER trg_{counter}_row_counter
+  AFTER INSERT OR UPDATE OR DELETE ON {table}
+  FOR EACH ROW
+  EXECUTE FUNCTION row_counter_refresh({", ".join(f"'{a}'" for a in [counter, *cols])});
+"""
+    for counter, table, cols, _ in ROW_COUNTERS
+)
+
+
+# Dashboard totals. Every invoice/project write applies its delta to one of
+# DASHBOARD_ROLLUP_SHARDS rows (picked at random so concurrent writers rarely
+# contend on the same row) and /get-dashboard-metrics sums the shards.
+DASHBOARD_ROLLUP_SHARDS = 16
+
+DASHBOARD_ROLLUP = f"""
+DROP VIEW IF EXISTS overall_aggregates;
+
+CREATE TABLE IF NOT EXISTS dashboard_rollup (
+  shard            SMALLINT PRIMARY KEY,
+  total_invoiced   NUMERIC  NOT NULL DEFAULT 0,
+  total_collected  NUMERIC  NOT NULL DEFAULT 0,
+  total_projects   BIGINT   NOT NULL DEFAULT 0,
+  open_projects    BIGINT   NOT NULL DEFAULT 0
+);
+
+-- Locks the client row, so a concurrent soft delete or restore of the client
+-- (dashboard_rollup_client) either waits for this write and counts it, or
+-- commits first and is seen here. A STABLE snapshot read could miss either side.
+CREATE OR REPLACE FUNCTION rollup_client_active(cid UUID) RETURNS BOOLEAN LANGUAGE sql VOLATILE AS $$
+  SELECT COALESCE((SELECT NOT is_deleted FROM client WHERE id = cid FOR SHARE), FALSE)
+$$;
+
+CREATE OR REPLACE FUNCTION rollup_invoice_collected(sid UUID) RETURNS BOOLEAN LANGUAGE sql STABLE AS $$
+  SELECT EXISTS (SELECT 1 FROM status WHERE id = sid AND category = 'invoice' AND value IN ('Paid', 'Collected'))
+$$;
+
+CREATE OR REPLACE FUNCTION rollup_project_open(sid UUID) RETURNS BOOLEAN LANGUAGE sql STABLE AS $$
+  SELECT EXISTS (SELECT 1 FROM status WHERE id = sid AND value IN ('Open', 'In Progress'))
+$$;
+
+CREATE OR REPLACE FUNCTION dashboard_rollup_apply(
+  d_invoiced NUMERIC, d_collected NUMERIC, d_projects BIGINT, d_open BIGINT
+) RETURNS VOID LANGUAGE sql AS $$
+  INSERT INTO dashboard_rollup (shard, total_invoiced, total_collected, total_projects, open_projects)
+  VALUES (floor(random() * {DASHBOARD_ROLLUP_SHARDS})::smallint, d_invoiced, d_collected, d_projects, d_open)
+  ON CONFLICT (shard) DO UPDATE SET
+    total_invoiced  = dashboard_rollup.total_invoiced  + EXCLUDED.total_invoiced,
+    total_collected = dashboard_rollup.total_collected + EXCLUDED.total_collected,
+    total_projects  = dashboard_rollup.total_projects  + EXCLUDED.total_projects,
+    open_projects   = dashboard_rollup.open_projects   + EXCLUDED.open_projects
+$$;
+
+-- An invoice counts while neither it nor its client is soft-deleted
+CREATE OR REPLACE FUNCTION dashboard_rollup_invoice() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+DECLARE
+  d_invoiced  NUMERIC := 0;
+  d_collected NUMERIC := 0;
+BEGIN
+  IF TG_OP <> 'INSERT' AND NOT OLD.is_deleted AND rollup_client_active(OLD.client_id) THEN
+    d_invoiced := d_invoiced - OLD.amount;
+    IF rollup_invoice_collected(OLD.status_id) THEN
+      d_collected := d_collected - OLD.amount;
+    END IF;
+  END IF;
+
+  IF TG_OP <> 'DELETE' AND NOT NEW.is_deleted AND rollup_client_active(NEW.client_id) THEN
+    d_invoiced := d_invoiced + NEW.amount;
+    IF rollup_invoice_collected(NEW.status_id) THEN
+      d_collected := d_collected + NEW.amount;
+    END IF;
+  END IF;
+
+  IF d_invoiced <> 0 OR d_collected <> 0 THEN
+    PERFORM dashboard_rollup_apply(d_invoiced, d_collected, 0, 0);
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION dashboard_rollup_project() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+DECLARE
+  d_projects BIGINT := 0;
+  d_open     BIGINT := 0;
+BEGIN
+  IF TG_OP <> 'INSERT' AND NOT OLD.is_deleted AND rollup_client_active(OLD.client_id) THEN
+    d_projects := d_projects - 1;
+    IF rollup_project_open(OLD.status_id) THEN
+      d_open := d_open - 1;
+    END IF;
+  END IF;
+
+  IF TG_OP <> 'DELETE' AND NOT NEW.is_deleted AND rollup_client_active(NEW.client_id) THEN
+    d_projects := d_projects + 1;
+    IF rollup_project_open(NEW.status_id) THEN
+      d_open := d_open + 1;
+    END IF;
+  END IF;
+
+  IF d_projects <> 0 OR d_open <> 0 THEN
+    PERFORM dashboard_rollup_apply(0, 0, d_projects, d_open);
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+-- Soft-deleting (or restoring) a client removes (or adds back) all of its rows
+CREATE OR REPLACE FUNCTION dashboard_rollup_client() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+DECLARE
+  dir  INT := CASE WHEN NEW.is_deleted THEN -1 ELSE 1 END;
+  inv  RECORD;
+  prj  RECORD;
+BEGIN
+  SELECT COALESCE(SUM(i.amount), 0) AS invoiced,
+         COALESCE(SUM(i.amount) FILTER (WHERE rollup_invoice_collected(i.status_id)), 0) AS collected
+    INTO inv
+    FROM invoice i
+   WHERE i.client_id = NEW.id AND i.is_deleted = FALSE;
+
+  SELECT COUNT(*) AS projects,
+         COUNT(*) FILTER (WHERE rollup_project_open(p.status_id)) AS open_projects
+    INTO prj
+    FROM project p
+   WHERE p.client_id = NEW.id AND p.is_deleted = FALSE;
+
+  PERFORM dashboard_rollup_apply(dir * inv.invoiced, dir * inv.collected, dir * prj.projects, dir * prj.open_projects);
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_invoice_dashboard_rollup ON invoice;
+CREATE TRIGGER trg_invoice_dashboard_rollup
+  AFTER INSERT OR DELETE OR UPDATE OF amount, status_id, client_id, is_deleted ON invoice
+  FOR EACH ROW
+  EXECUTE FUNCTION dashboard_rollup_invoice();
+
+DROP TRIGGER IF EXISTS trg_project_dashboard_rollup ON project;
+CREATE TRIGGER trg_project_dashboard_rollup
+  AFTER INSERT OR DELETE OR UPDATE OF status_id, client_id, is_deleted ON project
+  FOR EACH ROW
+  EXECUTE FUNCTION dashboard_rollup_project();
+
+DROP TRIGGER IF EXISTS trg_client_dashboard_rollup ON client;
+CREATE TRIGGER trg_client_dashboard_rollup
+  AFTER UPDATE OF is_deleted ON client
+  FOR EACH ROW
+  WHEN (OLD.is_deleted IS DISTINCT FROM NEW.is_deleted)
+  EXECUTE FUNCTION dashboard_rollup_client();
+"""
+
+# Per-client totals for /get-clients and /fetch-client. Every client gets a row
+# on insert, so list queries can INNER JOIN it and sort on its index.
+CLIENT_SUMMARY = """
+DROP VIEW IF EXISTS client_aggregates;
+
+CREATE TABLE IF NOT EXISTS client_summary (
+  client_id        UUID     PRIMARY KEY REFERENCES client(id) ON UPDATE CASCADE ON DELETE CASCADE,
+  total_invoiced   NUMERIC  NOT NULL DEFAULT 0,
+  total_collected  NUMERIC  NOT NULL DEFAULT 0,
+  total_projects   BIGINT   NOT NULL DEFAULT 0,
+  open_projects    BIGINT   NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_client_summary_revenue ON client_summary (total_collected DESC, client_id DESC);
+
+CREATE OR REPLACE FUNCTION client_summary_apply(
+  cid UUID, d_invoiced NUMERIC, d_collected NUMERIC, d_projects BIGINT, d_open BIGINT
+) RETURNS VOID LANGUAGE sql AS $$
+  INSERT INTO client_summary (client_id, total_invoiced, total_collected, total_projects, open_projects)
+  VALUES (cid, d_invoiced, d_collected, d_projects, d_open)
+  ON CONFLICT (client_id) DO UPDATE SET
+    total_invoiced  = client_summary.total_invoiced  + EXCLUDED.total_invoiced,
+    total_collected = client_summary.total_collected + EXCLUDED.total_collected,
+    total_projects  = client_summary.total_projects  + EXCLUDED.total_projects,
+    open_projects   = client_summary.open_projects   + EXCLUDED.open_projects
+$$;
+
+CREATE OR REPLACE FUNCTION client_summary_client() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+BEGIN
+  INSERT INTO client_summary (client_id) VALUES (NEW.id) ON CONFLICT DO NOTHING;
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION client_summary_invoice() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+BEGIN
+  IF TG_OP <> 'INSERT' AND NOT OLD.is_deleted THEN
+    PERFORM client_summary_apply(
+      OLD.client_id, -OLD.amount,
+      CASE WHEN rollup_invoice_collected(OLD.status_id) THEN -OLD.amount ELSE 0 END, 0, 0
+    );
+  END IF;
+
+  IF TG_OP <> 'DELETE' AND NOT NEW.is_deleted THEN
+    PERFORM client_summary_apply(
+      NEW.client_id, NEW.amount,
+      CASE WHEN rollup_invoice_collected(NEW.status_id) THEN NEW.amount ELSE 0 END, 0, 0
+    );
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION client_summary_project() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+BEGIN
+  IF TG_OP <> 'INSERT' AND NOT OLD.is_deleted THEN
+    PERFORM client_summary_apply(
+      OLD.client_id, 0, 0, -1, CASE WHEN rollup_project_open(OLD.status_id) THEN -1 ELSE 0 END
+    );
+  END IF;
+
+  IF TG_OP <> 'DELETE' AND NOT NEW.is_deleted THEN
+    PERFORM client_summary_apply(
+      NEW.client_id, 0, 0, 1, CASE WHEN rollup_project_open(NEW.status_id) THEN 1 ELSE 0 END
+    );
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_client_summary_client ON client;
+CREATE TRIGGER trg_client_summary_client
+  AFTER INSERT ON client
+  FOR EACH ROW
+  EXECUTE FUNCTION client_summary_client();
+
+DROP TRIGGER IF EXISTS trg_invoice_client_summary ON invoice;
+CREATE TRIGGER trg_invoice_client_summary
+  AFTER INSERT OR DELETE OR UPDATE OF amount, status_id, client_id, is_deleted ON invoice
+  FOR EACH ROW
+  EXECUTE FUNCTION client_summary_invoice();
+
+DROP TRIGGER IF EXISTS trg_project_client_summary ON project;
+CREATE TRIGGER trg_project_client_summary
+  AFTER INSERT OR DELETE OR UPDATE OF status_id, client_id, is_deleted ON project
+  FOR EACH ROW
+  EXECUTE FUNCTION client_summary_project();
+"""
+
+CLIENT_SUMMARY_REBUILD = """
+INSERT INTO client_summary (client_id, total_invoiced, total_collected, total_projects, open_projects)
+SELECT c.id,
+       COALESCE(inv.invoiced, 0),
+       COALESCE(inv.collected, 0),
+       COALESCE(prj.projects, 0),
+       COALESCE(prj.open_projects, 0)
+  FROM client c
+  LEFT JOIN (
+    SELECT i.client_id,
+           SUM(i.amount) AS invoiced,
+           SUM(i.amount) FILTER (WHERE s.category = 'invoice' AND s.value IN ('Paid', 'Collected')) AS collected
+      FROM invoice i
+      JOIN status s ON s.id = i.status_id
+     WHERE i.is_deleted = FALSE
+     GROUP BY i.client_id
+  ) inv ON inv.client_id = c.id
+  LEFT JOIN (
+    SELECT p.client_id,
+           COUNT(*) AS projects,
+           COUNT(*) FILTER (WHERE s.value IN ('Open', 'In Progress')) AS open_projects
+      FROM project p
+      JOIN status s ON s.id = p.status_id
+     WHERE p.is_deleted = FALSE
+     GROUP BY p.client_id
+  ) prj ON prj.client_id = c.id;
+"""
+
+# Full recompute, used by "rebuild-rollups". Invoices and projects are summed
+# in separate subqueries so neither side multiplies the other.
+DASHBOARD_ROLLUP_REBUILD = """
+INSERT INTO dashboard_rollup (shard, total_invoiced, total_collected, total_projects, open_projects)
+SELECT 0, inv.invoiced, inv.collected, prj.projects, prj.open_projects
+  FROM (
+    SELECT COALESCE(SUM(i.amount), 0) AS invoiced,
+           COALESCE(SUM(i.amount) FILTER (WHERE s.category = 'invoice' AND s.value IN ('Paid', 'Collected')), 0)
+             AS collected
+      FROM invoice i
+      JOIN client c ON c.id = i.client_id AND c.is_deleted = FALSE
+      JOIN status s ON s.id = i.status_id
+     WHERE i.is_deleted = FALSE
+  ) inv,
+  (
+    SELECT COUNT(*) AS projects,
+           COUNT(*) FILTER (WHERE s.value IN ('Open', 'In Progress')) AS open_projects
+      FROM project p
+      JOIN client c ON c.id = p.client_id AND c.is_deleted = FALSE
+      JOIN status s ON s.id = p.status_id
+     WHERE p.is_deleted = FALSE
+  ) prj;
+"""
+
+# The rollups decide by status value what counts as collected or open, so a
+# status rename or category change can move every row that uses it. Renames are
+# rare admin edits, they recompute both rollups in the same transaction.
+ROLLUP_STATUS_RENAME = f"""
+CREATE OR REPLACE FUNCTION rollups_rebuild() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+BEGIN
+  LOCK TABLE dashboard_rollup IN EXCLUSIVE MODE;
+  DELETE FROM dashboard_rollup;
+  {DASHBOARD_ROLLUP_REBUILD.strip()}
+
+  LOCK TABLE client_summary IN EXCLUSIVE MODE;
+  DELETE FROM client_summary;
+  {CLIENT_SUMMARY_REBUILD.strip()}
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_status_rollups_rebuild ON status;
+CREATE TRIGGER trg_status_rollups_rebuild
+  AFTER UPDATE OF value, category ON status
+  FOR EACH ROW
+  WHEN (OLD.value IS DISTINCT FROM NEW.value OR OLD.category IS DISTINCT FROM NEW.category)
+  EXECUTE FUNCTION rollups_rebuild();
+"""
+
 # ──────────────────────────────────────────────────────────────────────────────
 # 15: VIEWS
 # ──────────────────────────────────────────────────────────────────────────────
 
 VIEWS = """
-CREATE OR REPLACE VIEW client_aggregates AS
-SELECT
-  c.id                                AS client_id,
-  COALESCE(SUM(i.amount), 0)          AS total_invoiced,
-  COALESCE(
-    SUM(i.amount) FILTER (
-      WHERE s.category = 'invoice'
-        AND s.value IN ('Paid','Collected')
-    ), 0
-  )                                    AS total_collected,
-  COALESCE(COUNT(p.id), 0)            AS total_projects,
-  COALESCE(
-    COUNT(p.id) FILTER (
-      WHERE ps.value IN ('Open','In Progress')
-    ), 0
-  )                                    AS open_projects
-FROM client c
-LEFT JOIN invoice i ON i.client_id = c.id AND i.is_deleted = FALSE
-LEFT JOIN status s ON s.id = i.status_id
-LEFT JOIN project p ON p.client_id = c.id AND p.is_deleted = FALSE
-LEFT JOIN status ps ON ps.id = p.status_id
-WHERE c.is_deleted = FALSE
-GROUP BY c.id;
-
-CREATE OR REPLACE VIEW overall_aggregates AS
-SELECT
-  COALESCE(SUM(i.amount), 0) AS total_invoiced,
-  COALESCE(
-    SUM(i.amount) FILTER (
-      WHERE s.category = 'invoice'
-        AND s.value IN ('Paid', 'Collected')
-    ), 0
-  ) AS total_collected,
-  COALESCE(COUNT(p.id), 0)    AS total_projects,
-  COALESCE(
-    COUNT(p.id) FILTER (
-      WHERE ps.value IN ('Open', 'In Progress')
-    ), 0
-  ) AS open_projects
-FROM client c
-LEFT JOIN invoice i ON i.client_id = c.id AND i.is_deleted = FALSE
-LEFT JOIN status s ON s.id = i.status_id
-LEFT JOIN project p ON p.client_id = c.id AND p.is_deleted = FALSE
-LEFT JOIN status ps ON ps.id = p.status_id
-WHERE c.is_deleted = FALSE;
-
 CREATE OR REPLACE VIEW global_search AS
   SELECT 'project'  AS source_table, id::TEXT AS record_id, search_text, is_deleted FROM project
   UNION ALL
@@ -715,8 +1229,9 @@ CREATE INDEX IF NOT EXISTS idx_proj_assignee    ON project(assignee_id);
 CREATE INDEX IF NOT EXISTS idx_proj_due         ON project(due_date);
 CREATE INDEX IF NOT EXISTS idx_proj_received    ON project(date_received);
 CREATE INDEX IF NOT EXISTS idx_proj_cursor      ON project (created_at DESC, id DESC) WHERE is_deleted = FALSE;
-CREATE INDEX IF NOT EXISTS idx_project_scheduled_month ON project (EXTRACT(MONTH FROM scheduled_date)) WHERE scheduled_date IS NOT NULL AND is_deleted = FALSE;
-CREATE INDEX IF NOT EXISTS idx_project_due_month ON project (EXTRACT(MONTH FROM due_date)) WHERE scheduled_date IS NULL AND is_deleted = FALSE;
+-- The calendar now range-scans idx_project_event_cursor
+DROP INDEX IF EXISTS idx_project_scheduled_month;
+DROP INDEX IF EXISTS idx_project_due_month;
 CREATE INDEX IF NOT EXISTS idx_project_event_cursor ON project ((COALESCE(scheduled_date, due_date)) DESC, id DESC) WHERE is_deleted = FALSE;
 
 CREATE INDEX IF NOT EXISTS idx_project_type_value ON project_type (value);
@@ -744,13 +1259,26 @@ CREATE INDEX IF NOT EXISTS idx_notification_cursor ON notification (created_at D
 CREATE INDEX IF NOT EXISTS idx_status_proj_category_value ON status (category, value);
 CREATE INDEX IF NOT EXISTS idx_project_trade_value ON project_trade (value);
 CREATE INDEX IF NOT EXISTS idx_pay_term_value ON pay_term (value);
-CREATE INDEX IF NOT EXISTS idx_message_project_created_at ON message(project_id, created_at DESC) WHERE is_deleted = FALSE;
-CREATE INDEX IF NOT EXISTS idx_quote_project_created_at ON quote(project_id, created_at DESC) WHERE is_deleted = FALSE;
-CREATE INDEX IF NOT EXISTS idx_document_project_created_at ON document(project_id, created_at DESC) WHERE is_deleted = FALSE;
+-- Older databases have these under the *_created_at names without id, replaced by the *_cursor ones
+DROP INDEX IF EXISTS idx_message_project_created_at;
+DROP INDEX IF EXISTS idx_quote_project_created_at;
+DROP INDEX IF EXISTS idx_document_project_created_at;
+DROP INDEX IF EXISTS idx_invoice_client_created_at;
+DROP INDEX IF EXISTS idx_document_client_created_at;
+DROP INDEX IF EXISTS idx_project_client_created_at;
+CREATE INDEX IF NOT EXISTS idx_message_project_cursor ON message(project_id, created_at DESC, id DESC) WHERE is_deleted = FALSE;
+CREATE INDEX IF NOT EXISTS idx_quote_project_cursor ON quote(project_id, created_at DESC, id DESC) WHERE is_deleted = FALSE;
+CREATE INDEX IF NOT EXISTS idx_document_project_cursor ON document(project_id, created_at DESC, id DESC) WHERE is_deleted = FALSE;
 CREATE INDEX IF NOT EXISTS idx_client_cursor ON client (created_at DESC, id DESC) WHERE is_deleted = FALSE;
-CREATE INDEX IF NOT EXISTS idx_invoice_client_created_at ON invoice(client_id, created_at DESC) WHERE is_deleted = FALSE;
-CREATE INDEX IF NOT EXISTS idx_document_client_created_at ON document(client_id, created_at DESC) WHERE is_deleted = FALSE;
-CREATE INDEX IF NOT EXISTS idx_project_client_created_at ON project(client_id, created_at DESC) WHERE is_deleted = FALSE;
+CREATE INDEX IF NOT EXISTS idx_invoice_client_cursor ON invoice(client_id, created_at DESC, id DESC) WHERE is_deleted = FALSE;
+CREATE INDEX IF NOT EXISTS idx_document_client_cursor ON document(client_id, purpose, created_at DESC, id DESC) WHERE is_deleted = FALSE;
+CREATE INDEX IF NOT EXISTS idx_project_client_cursor ON project(client_id, created_at DESC, id DESC) WHERE is_deleted = FALSE;
+CREATE INDEX IF NOT EXISTS idx_invoice_cursor ON invoice (created_at DESC, id DESC) WHERE is_deleted = FALSE;
+CREATE INDEX IF NOT EXISTS idx_client_password_cursor ON client_password(client_id, created_at DESC, user_email DESC);
+-- /get-changes walks these forwards; soft-deleted rows stay in so they come back as tombstones
+CREATE INDEX IF NOT EXISTS idx_project_sync ON project (updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_client_sync  ON client (updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_invoice_sync ON invoice (updated_at, id);
 
 
 -- GIN indexes on search_text
@@ -767,28 +1295,78 @@ CREATE INDEX IF NOT EXISTS idx_message_search_text   ON message   USING GIN (sea
 # 18: FUNCTIONS
 # ──────────────────────────────────────────────────────────────────────────────
 
-FUNCTIONS = """
+# project.search_text over a row source "n", written as joins so the same
+# expression serves one row (project_search_text) and a whole statement's
+# transition table (projects_refresh_search_text_batch)
+PROJECT_SEARCH_TEXT = """array_to_string(ARRAY[
+    COALESCE(n.business_name,''), COALESCE(n.address,''), COALESCE(n.address_line1,''),
+    COALESCE(n.address_line2,''), COALESCE(n.city,''), COALESCE(n.zip_code,''),
+    COALESCE(n.nte::text,''), COALESCE(n.due_date::text,''), COALESCE(n.date_received::text,''),
+    COALESCE(n.scope_of_work,''), COALESCE(n.special_notes,''), COALESCE(n.visit_notes,''),
+    COALESCE(n.planned_resolution,''), COALESCE(n.material_parts_needed,''),
+    COALESCE(c.company_name, ''), COALESCE(u.first_name||' '||u.last_name, ''), COALESCE(pp.value, ''),
+    COALESCE(pt.value, ''), COALESCE(st.value, ''), COALESCE(tr.value, ''), COALESCE(s.name, '')
+  ], ' ')"""
+
+PROJECT_SEARCH_JOINS = """
+    LEFT JOIN client c            ON c.id = n.client_id AND NOT c.is_deleted
+    LEFT JOIN "user" u            ON u.id = n.assignee_id AND NOT u.is_deleted
+    LEFT JOIN project_priority pp ON pp.id = n.priority_id
+    LEFT JOIN project_type pt     ON pt.id = n.type_id
+    LEFT JOIN status st           ON st.id = n.status_id AND st.category = 'project'
+    LEFT JOIN project_trade tr    ON tr.id = n.trade_id
+    LEFT JOIN state s             ON s.id = n.state_id"""
+
+# Columns whose change requires a new project.search_text
+PROJECT_SEARCH_COLUMNS = [
+    "business_name", "address", "address_line1", "address_line2", "city", "zip_code", "nte", "due_date",
+    "date_received", "scope_of_work", "special_notes", "visit_notes", "planned_resolution",
+    "material_parts_needed", "client_id", "assignee_id", "priority_id", "type_id", "status_id", "trade_id",
+    "state_id",
+]
+
+FUNCTIONS = f"""
+-- Shared by the project triggers and the search re-indexer (searchIndexer.py)
+CREATE OR REPLACE FUNCTION project_search_text(p project) RETURNS TEXT LANGUAGE sql STABLE AS $$
+  SELECT {PROJECT_SEARCH_TEXT}
+    FROM (SELECT (p).*) n{PROJECT_SEARCH_JOINS}
+$$;
+
 CREATE OR REPLACE FUNCTION projects_refresh_search_text() RETURNS TRIGGER LANGUAGE plpgsql AS $$
 BEGIN
-  NEW.search_text := array_to_string(ARRAY[
-    COALESCE(NEW.business_name,''), COALESCE(NEW.address,''), COALESCE(NEW.address_line1,''), 
-    COALESCE(NEW.address_line2,''), COALESCE(NEW.city,''), COALESCE(NEW.zip_code,''), 
-    COALESCE(NEW.nte::text,''), COALESCE(NEW.due_date::text,''), COALESCE(NEW.date_received::text,''), 
-    COALESCE(NEW.scope_of_work,''), COALESCE(NEW.special_notes,''), COALESCE(NEW.visit_notes,''), 
-    COALESCE(NEW.planned_resolution,''), COALESCE(NEW.material_parts_needed,''),
-
-    COALESCE((SELECT u.first_name||' '||u.last_name FROM "user" u WHERE u.id=NEW.client_id AND NOT u.is_deleted), ''),
-    COALESCE((SELECT u2.first_name||' '||u2.last_name FROM "user" u2 WHERE u2.id=NEW.assignee_id AND NOT u2.is_deleted), ''),
-    COALESCE((SELECT pp.value FROM project_priority pp WHERE pp.id=NEW.priority_id), ''),
-    COALESCE((SELECT pt.value FROM project_type pt WHERE pt.id=NEW.type_id), ''),
-    COALESCE((SELECT st.value FROM status st WHERE st.id=NEW.status_id AND st.category='project'), ''),
-    COALESCE((SELECT tr.value FROM project_trade tr WHERE tr.id=NEW.trade_id), ''),
-    COALESCE((SELECT s.name FROM state WHERE s.id=NEW.state_id), '')
-  ], ' ');
+  NEW.search_text := project_search_text(NEW);
   RETURN NEW;
 END;
 $$;
 
+-- Statement-level variant: one set-based UPDATE per INSERT/UPDATE statement.
+-- The UPDATE below fires this trigger again, and statement triggers fire even
+-- for zero rows, so without the guard it recurses until "stack depth limit
+-- exceeded". The nested call (depth 2) and empty statements return at once.
+CREATE OR REPLACE FUNCTION projects_refresh_search_text_batch() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+BEGIN
+  IF pg_trigger_depth() > 1 OR NOT EXISTS (SELECT 1 FROM new_rows) THEN
+    RETURN NULL;
+  END IF;
+
+  IF TG_OP = 'INSERT' THEN
+    UPDATE project p
+       SET search_text = {PROJECT_SEARCH_TEXT}
+      FROM new_rows n{PROJECT_SEARCH_JOINS}
+     WHERE p.id = n.id;
+  ELSE
+    UPDATE project p
+       SET search_text = {PROJECT_SEARCH_TEXT}
+      FROM new_rows n
+      JOIN old_rows o ON o.id = n.id{PROJECT_SEARCH_JOINS}
+     WHERE p.id = n.id
+       AND ({", ".join(f"n.{c}" for c in PROJECT_SEARCH_COLUMNS)})
+           IS DISTINCT FROM ({", ".join(f"o.{c}" for c in PROJECT_SEARCH_COLUMNS)});
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
 CREATE OR REPLACE FUNCTION client_refresh_search_text() RETURNS TRIGGER LANGUAGE plpgsql AS $$
 BEGIN
   NEW.search_text := array_to_string(ARRAY[
@@ -837,9 +1415,19 @@ $$;
 # 19: TRIGGERS
 # ──────────────────────────────────────────────────────────────────────────────
 
-TRIGGERS = """-- 1) Project: split INSERT vs. UPDATE so we don’t reference OLD in INSERT
+DROP_PROJECT_SEARCH_TRIGGERS = """
 DROP TRIGGER IF EXISTS trg_project_refresh_search_text_insert ON project;
 DROP TRIGGER IF EXISTS trg_project_refresh_search_text_update ON project;
+DROP TRIGGER IF EXISTS trg_project_refresh_search_text_insert_batch ON project;
+DROP TRIGGER IF EXISTS trg_project_refresh_search_text_update_batch ON project;
+"""
+
+# Two ways to keep project.search_text current, switched with
+# "python DbManager.py search-triggers row|statement". Row triggers are cheapest
+# for the app's one-row writes. Statement triggers suit bulk imports and mass
+# status updates.
+PROJECT_SEARCH_TRIGGERS = {
+    "row": DROP_PROJECT_SEARCH_TRIGGERS + """-- Split INSERT vs. UPDATE so we don’t reference OLD in INSERT
 
 -- Always refresh on INSERT
 CREATE TRIGGER trg_project_refresh_search_text_insert
@@ -877,6 +1465,24 @@ CREATE TRIGGER trg_project_refresh_search_text_update
   EXECUTE FUNCTION projects_refresh_search_text();
 
 
+""",
+    "statement": DROP_PROJECT_SEARCH_TRIGGERS + """
+-- Transition tables are only allowed on single-event AFTER triggers
+CREATE TRIGGER trg_project_refresh_search_text_insert_batch
+  AFTER INSERT ON project
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION projects_refresh_search_text_batch();
+
+CREATE TRIGGER trg_project_refresh_search_text_update_batch
+  AFTER UPDATE ON project
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION projects_refresh_search_text_batch();
+""",
+}
+
+TRIGGERS = PROJECT_SEARCH_TRIGGERS["row"] + """
 -- 2) Client
 DROP TRIGGER IF EXISTS trg_client_refresh_search_text ON client;
 CREATE TRIGGER trg_client_refresh_search_text
@@ -914,6 +1520,359 @@ CREATE TRIGGER trg_message_refresh_search_text
 
 """
 
+# One row per searchable record, copied from the search_text the
+# *_refresh_search_text triggers above compute. Each entry is
+# (table, title, client_id, project_id) with {r} standing for the row.
+SEARCH_SOURCES = [
+    ("project", "{r}.business_name", "{r}.client_id", "{r}.id"),
+    ("client", "{r}.company_name", "{r}.id", "NULL::uuid"),
+    (
+        "document", "{r}.file_name",
+        "COALESCE({r}.client_id, (SELECT p.client_id FROM project p WHERE p.id = {r}.project_id))",
+        "{r}.project_id",
+    ),
+    ("quote", "'Quote #' || {r}.number", "{r}.client_id", "{r}.project_id"),
+    ("invoice", "'Invoice #' || {r}.number", "{r}.client_id", "NULL::uuid"),
+    ("message", "left({r}.content, 120)", "(SELECT p.client_id FROM project p WHERE p.id = {r}.project_id)",
+     "{r}.project_id"),
+]
+
+SEARCH_INDEX = """
+CREATE TABLE IF NOT EXISTS search_index (
+  source_table VARCHAR(20) NOT NULL,
+  record_id    UUID        NOT NULL,
+  client_id    UUID,
+  project_id   UUID,
+  title        TEXT        NOT NULL DEFAULT '',
+  body         TEXT        NOT NULL DEFAULT '',
+  tsv          TSVECTOR    GENERATED ALWAYS AS (
+                 setweight(to_tsvector('simple', title), 'A') || setweight(to_tsvector('simple', body), 'B')
+               ) STORED,
+  is_deleted   BOOLEAN     NOT NULL DEFAULT FALSE,
+  updated_at   TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (source_table, record_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_search_index_tsv   ON search_index USING GIN (tsv) WHERE is_deleted = FALSE;
+CREATE INDEX IF NOT EXISTS idx_search_index_body  ON search_index USING GIN (body gin_trgm_ops) WHERE is_deleted = FALSE;
+CREATE INDEX IF NOT EXISTS idx_search_index_title ON search_index USING GIN (title gin_trgm_ops) WHERE is_deleted = FALSE;
+CREATE INDEX IF NOT EXISTS idx_search_index_client ON search_index (client_id);
+""" + "".join(
+    f"""
+CREATE OR REPLACE FUNCTION search_index_sync_{table}() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    DELETE FROM search_index WHERE source_table = '{table}' AND record_id = OLD.id;
+    RETURN NULL;
+  END IF;
+
+  INSERT INTO search_index (source_table, record_id, client_id, project_id, title, body, is_deleted, updated_at)
+  VALUES (
+    '{table}', NEW.id, {clientId.format(r="NEW")}, {projectId.format(r="NEW")},
+    COALESCE({title.format(r="NEW")}, ''), COALESCE(NEW.search_text, ''), NEW.is_deleted, now()
+  )
+  ON CONFLICT (source_table, record_id) DO UPDATE SET
+    client_id  = EXCLUDED.client_id,
+    project_id = EXCLUDED.project_id,
+    title      = EXCLUDED.title,
+    body       = EXCLUDED.body,
+    is_deleted = EXCLUDED.is_deleted,
+    updated_at = now();
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_{table}_search_index ON {table};
+CREATE TRIGGER trg_{table}_search_index
+  AFTER INSERT OR DELETE ON {table}
+  FOR EACH ROW
+  EXECUTE FUNCTION search_index_sync_{table}();
+
+DROP TRIGGER IF EXISTS trg_{table}_search_index_update ON {table};
+CREATE TRIGGER trg_{table}_search_index_update
+  AFTER UPDATE ON {table}
+  FOR EACH ROW
+  WHEN (OLD.search_text IS DISTINCT FROM NEW.search_text OR OLD.is_deleted IS DISTINCT FROM NEW.is_deleted)
+  EXECUTE FUNCTION search_index_sync_{table}();
+"""
+    for table, title, clientId, projectId in SEARCH_SOURCES
+)
+
+# project.search_text copies names out of these tables. A rename enqueues the
+# changed row and searchIndexer.py rewrites the projects that reference it.
+# Entries are (source, table, project column, watched columns).
+SEARCH_REINDEX_SOURCES = [
+    ("user", '"user"', "assignee_id", ["first_name", "last_name", "is_deleted"]),
+    ("client", "client", "client_id", ["company_name", "is_deleted"]),
+    ("project_priority", "project_priority", "priority_id", ["value"]),
+    ("project_type", "project_type", "type_id", ["value"]),
+    ("status", "status", "status_id", ["value", "category"]),
+    ("project_trade", "project_trade", "trade_id", ["value"]),
+    ("state", "state", "state_id", ["name"]),
+]
+
+SEARCH_REINDEX = """
+-- searchIndexer.py leases entries (claimed_at/claimed_by) and deletes them once
+-- their projects are rewritten; a lease that runs out is claimed again
+CREATE TABLE IF NOT EXISTS search_reindex_queue (
+  id           BIGSERIAL    PRIMARY KEY,
+  source_table VARCHAR(32)  NOT NULL,
+  source_id    UUID         NOT NULL,
+  enqueued_at  TIMESTAMPTZ  NOT NULL DEFAULT clock_timestamp(),
+  claimed_at   TIMESTAMPTZ,
+  claimed_by   VARCHAR(128)
+);
+
+-- One row per indexer process, written with every committed chunk
+CREATE TABLE IF NOT EXISTS search_reindex_progress (
+  worker           VARCHAR(128) PRIMARY KEY,
+  changes_done     BIGINT       NOT NULL DEFAULT 0,
+  projects_written BIGINT       NOT NULL DEFAULT 0,
+  last_lag_ms      BIGINT       NOT NULL DEFAULT 0,
+  last_batch_at    TIMESTAMPTZ,
+  started_at       TIMESTAMPTZ  NOT NULL DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION search_reindex_enqueue() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+BEGIN
+  INSERT INTO search_reindex_queue (source_table, source_id) VALUES (TG_ARGV[0], NEW.id);
+  PERFORM pg_notify('search_reindex', TG_ARGV[0]);
+  RETURN NULL;
+END;
+$$;
+""" + "".join(
+    f"""
+DROP TRIGGER IF EXISTS trg_{source}_search_reindex ON {table};
+CREATE TRIGGER trg_{source}_search_reindex
+  AFTER UPDATE ON {table}
+  FOR EACH ROW
+  WHEN ({" OR ".join(f"OLD.{c} IS DISTINCT FROM NEW.{c}" for c in cols)})
+  EXECUTE FUNCTION search_reindex_enqueue('{source}');
+"""
+    for source, table, _, cols in SEARCH_REINDEX_SOURCES
+)
+
+
+# /get-calendar-events caches one event list per month in Redis under the
+# month's version. Any project change that moves, hides or renames an event
+# bumps the version of the months involved, which retires the cached lists.
+CALENDAR_MONTH_VERSION = """
+CREATE TABLE IF NOT EXISTS calendar_month_version (
+  month   DATE   PRIMARY KEY,
+  version BIGINT NOT NULL DEFAULT 1
+);
+
+CREATE OR REPLACE FUNCTION calendar_month_bump(d DATE) RETURNS VOID LANGUAGE sql AS $$
+  INSERT INTO calendar_month_version (month) VALUES (date_trunc('month', d)::date)
+  ON CONFLICT (month) DO UPDATE SET version = calendar_month_version.version + 1
+$$;
+
+CREATE OR REPLACE FUNCTION project_calendar_invalidate() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    PERFORM calendar_month_bump(COALESCE(NEW.scheduled_date, NEW.due_date));
+  ELSIF TG_OP = 'DELETE' THEN
+    PERFORM calendar_month_bump(COALESCE(OLD.scheduled_date, OLD.due_date));
+  ELSE
+    PERFORM calendar_month_bump(COALESCE(OLD.scheduled_date, OLD.due_date));
+    IF date_trunc('month', COALESCE(NEW.scheduled_date, NEW.due_date))
+       IS DISTINCT FROM date_trunc('month', COALESCE(OLD.scheduled_date, OLD.due_date)) THEN
+      PERFORM calendar_month_bump(COALESCE(NEW.scheduled_date, NEW.due_date));
+    END IF;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_project_calendar_insert_delete ON project;
+CREATE TRIGGER trg_project_calendar_insert_delete
+  AFTER INSERT OR DELETE ON project
+  FOR EACH ROW
+  EXECUTE FUNCTION project_calendar_invalidate();
+
+DROP TRIGGER IF EXISTS trg_project_calendar_update ON project;
+CREATE TRIGGER trg_project_calendar_update
+  AFTER UPDATE ON project
+  FOR EACH ROW
+  WHEN (
+       NEW.scheduled_date IS DISTINCT FROM OLD.scheduled_date
+    OR NEW.due_date       IS DISTINCT FROM OLD.due_date
+    OR NEW.is_deleted     IS DISTINCT FROM OLD.is_deleted
+    OR NEW.business_name  IS DISTINCT FROM OLD.business_name
+    OR NEW.address        IS DISTINCT FROM OLD.address
+    OR NEW.city           IS DISTINCT FROM OLD.city
+    OR NEW.scope_of_work  IS DISTINCT FROM OLD.scope_of_work
+  )
+  EXECUTE FUNCTION project_calendar_invalidate();
+"""
+
+
+# Version tags for conditional requests (ETag / If-None-Match in app.py).
+# Detail endpoints read row_version, which every UPDATE of these tables bumps.
+ROW_VERSION_TABLES = ["project", "client", "invoice", "quote", "document"]
+
+# List endpoints read list_version: (name, table, scope columns) like
+# ROW_COUNTERS, but every write bumps the scope, soft deletes included, and
+# max_updated_at tracks the newest updated_at written to it. "lookup" covers
+# the values the lists join in (statuses, types, trades, ...). Unscoped
+# versions ('*') take every write to their tables, so they are spread over
+# LIST_VERSION_SHARDS rows; a version is the sum of its shards, which every
+# bump moves up by one.
+LIST_VERSION_SHARDS = 16
+
+LIST_VERSIONS = [
+    ("project", "project", []),
+    ("client", "client", []),
+    ("client", "client_summary", []),
+    ("client_summary_by_client", "client_summary", ["client_id"]),
+    ("message_by_project", "message", ["project_id"]),
+    ("quote_by_project", "quote", ["project_id"]),
+    ("document_by_project", "document", ["project_id"]),
+    ("lookup", "status", []),
+    ("lookup", "project_priority", []),
+    ("lookup", "project_type", []),
+    ("lookup", "project_trade", []),
+    ("lookup", "state", []),
+    ("lookup", "client_type", []),
+    ("lookup", "pay_term", []),
+]
+
+ROW_VERSION = """
+CREATE OR REPLACE FUNCTION row_version_bump() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+BEGIN
+  NEW.row_version := OLD.row_version + 1;
+  RETURN NEW;
+END;
+$$;
+
+CREATE TABLE IF NOT EXISTS list_version (
+  name           VARCHAR(64) NOT NULL,
+  scope_key      TEXT        NOT NULL,
+  shard          SMALLINT    NOT NULL DEFAULT 0,
+  version        BIGINT      NOT NULL DEFAULT 1,
+  max_updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (name, scope_key, shard)
+);
+""" + f"""
+-- TG_ARGV[0] is the version name, TG_ARGV[1..] the scope columns. A row
+-- moving between scopes bumps both.
+CREATE OR REPLACE FUNCTION list_version_bump() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+DECLARE
+  recs     JSONB[];
+  r        JSONB;
+  key      TEXT;
+  keys     TEXT[] := ARRAY[]::TEXT[];
+  to_shard SMALLINT := CASE WHEN TG_NARGS = 1 THEN floor(random() * {LIST_VERSION_SHARDS})::smallint ELSE 0 END;
+BEGIN
+  IF TG_OP <> 'INSERT' THEN
+    recs := recs || to_jsonb(OLD);
+  END IF;
+  IF TG_OP <> 'DELETE' THEN
+    recs := recs || to_jsonb(NEW);
+  END IF;
+
+  FOREACH r IN ARRAY recs LOOP
+    key := CASE WHEN TG_NARGS = 1 THEN '*' END;
+    FOR i IN 1 .. TG_NARGS - 1 LOOP
+      key := CASE WHEN i = 1 THEN '' ELSE key || ':' END || COALESCE(r->>TG_ARGV[i], '');
+    END LOOP;
+    CONTINUE WHEN key = ANY(keys);
+    keys := keys || key;
+
+    INSERT INTO list_version (name, scope_key, shard, max_updated_at)
+    VALUES (TG_ARGV[0], key, to_shard, COALESCE((r->>'updated_at')::timestamptz, now()))
+    ON CONFLICT (name, scope_key, shard) DO UPDATE SET
+      version        = list_version.version + 1,
+      max_updated_at = GREATEST(list_version.max_updated_at, EXCLUDED.max_updated_at);
+  END LOOP;
+  RETURN NULL;
+END;
+$$;
+""" + "".join(
+    f"""
+DROP TRIGGER IF EXISTS trg_{table}_row_version ON {table};
+CREATE TRIGGER trg_{table}_row_version
+  BEFORE UPDATE ON {table}
+  FOR EACH ROW
+  EXECUTE FUNCTION row_version_bump();
+"""
+    for table in ROW_VERSION_TABLES
+) + "".join(
+    f"""
+DROP TRIGGER IF EXISTS trg_{name}_list_version ON {table};
+CREATE TRIGGER trg_{name}_list_version
+  AFTER INSERT OR UPDATE OR DELETE ON {table}
+  FOR EACH ROW
+  EXECUTE FUNCTION list_version_bump({", ".join(f"'{a}'" for a in [name, *cols])});
+"""
+    for name, table, cols in LIST_VERSIONS
+)
+
+
+# Delta sync (/get-changes in app.py). Each entry is (table, client column):
+# updated_at is the high-water mark, so an UPDATE that changes anything but
+# search_text / row_version moves it to now() and one that changes nothing
+# leaves it alone. Hard deletes leave a sync_tombstone row, soft deletes are
+# rows with is_deleted and a deleted_at the trigger keeps in step.
+SYNC_TABLES = [("project", "client_id"), ("client", "id"), ("invoice", "client_id")]
+
+SYNC = """
+CREATE OR REPLACE FUNCTION sync_touch() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+BEGIN
+  IF NEW.is_deleted AND NOT OLD.is_deleted THEN
+    NEW.deleted_at := COALESCE(NEW.deleted_at, now());
+  ELSIF OLD.is_deleted AND NOT NEW.is_deleted THEN
+    NEW.deleted_at := NULL;
+  END IF;
+
+  IF to_jsonb(NEW) - 'search_text' - 'updated_at' - 'row_version'
+     IS DISTINCT FROM to_jsonb(OLD) - 'search_text' - 'updated_at' - 'row_version' THEN
+    NEW.updated_at := now();
+  ELSE
+    NEW.updated_at := OLD.updated_at;
+  END IF;
+  RETURN NEW;
+END;
+$$;
+
+CREATE TABLE IF NOT EXISTS sync_tombstone (
+  source_table VARCHAR(64) NOT NULL,
+  record_id    UUID        NOT NULL,
+  client_id    UUID,
+  deleted_at   TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (source_table, record_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_sync_tombstone_cursor ON sync_tombstone (source_table, deleted_at, record_id);
+
+-- TG_ARGV[0] is the column holding the row's client id
+CREATE OR REPLACE FUNCTION sync_tombstone_record() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+BEGIN
+  INSERT INTO sync_tombstone (source_table, record_id, client_id)
+  VALUES (TG_TABLE_NAME, OLD.id, (to_jsonb(OLD)->>TG_ARGV[0])::uuid)
+  ON CONFLICT (source_table, record_id) DO UPDATE SET
+    client_id  = EXCLUDED.client_id,
+    deleted_at = now();
+  RETURN NULL;
+END;
+$$;
+""" + "".join(
+    f"""
+DROP TRIGGER IF EXISTS trg_{table}_sync_touch ON {table};
+CREATE TRIGGER trg_{table}_sync_touch
+  BEFORE UPDATE ON {table}
+  FOR EACH ROW
+  EXECUTE FUNCTION sync_touch();
+
+DROP TRIGGER IF EXISTS trg_{table}_sync_tombstone ON {table};
+CREATE TRIGGER trg_{table}_sync_tombstone
+  AFTER DELETE ON {table}
+  FOR EACH ROW
+  EXECUTE FUNCTION sync_tombstone_record('{clientColumn}');
+"""
+    for table, clientColumn in SYNC_TABLES
+)
+
 
 def preprocess_sql(sql: str) -> str:
     return "\n".join(line for line in sql.splitlines() if not re.match(r'^\s*-{3,}', line))
@@ -946,8 +1905,9 @@ async def execute_block(conn, name: str, sql: str):
     print(f"\n--- Executing {name} ---")
     raw = preprocess_sql(sql)
     for stmt in split_sql(raw):
-        s = stmt.lstrip()
-        if not s or s.upper() in ("BEGIN", "COMMIT") or s.startswith("--"):
+        # A statement may be preceded by "--" comment lines, only skip comment-only chunks
+        s = "\n".join(line for line in stmt.splitlines() if not line.lstrip().startswith("--")).strip()
+        if not s or s.upper() in ("BEGIN", "COMMIT"):
             continue
         await conn.execute(stmt + ";")
         print(f"✅ {s.splitlines()[0]}")
@@ -986,11 +1946,22 @@ async def create_tables():
             ("insurance", INSURANCE),
             ("notification", NOTIFICATION),
             ("notification_listen_notify", NOTIFICATION_LISTEN_NOTIFY),
+            ("notification_inbox", NOTIFICATION_INBOX),
+            ("message_listen_notify", MESSAGE_LISTEN_NOTIFY),
             ("views", VIEWS),
             ("prepares", PREPARES),
             ("indices", INDICES),
             ("functions", FUNCTIONS),
             ("triggers", TRIGGERS),
+            ("row_counter", ROW_COUNTER),
+            ("dashboard_rollup", DASHBOARD_ROLLUP),
+            ("client_summary", CLIENT_SUMMARY),
+            ("rollup_status_rename", ROLLUP_STATUS_RENAME),
+            ("search_index", SEARCH_INDEX),
+            ("search_reindex", SEARCH_REINDEX),
+            ("calendar_month_version", CALENDAR_MONTH_VERSION),
+            ("row_version", ROW_VERSION),
+            ("sync", SYNC),
         ]:
             await execute_block(conn, name, sql)
 
@@ -1006,8 +1977,11 @@ async def create_tables():
 
                     ("p", "employee_account_manager", "*", "/get-messages", "*"),
                     ("p", "employee_account_manager", "*", "/send-message", "*"),
+                    ("p", "employee_account_manager", "*", "/send-messages", "*"),
                     ("p", "employee_account_manager", "*", "/global-search", "*"),
                     ("p", "employee_account_manager", "*", "/get-notifications", "*"),
+                    ("p", "employee_account_manager", "*", "/mark-notifications-read", "*"),
+                    ("p", "employee_account_manager", "*", "/event-stream", "*"),
                     ("p", "employee_account_manager", "*", "/get-profile-details", "*"),
                     ("p", "employee_account_manager", "*", "/get-dashboard-metrics", "*"),
                     ("p", "employee_account_manager", "*", "/get-calendar-events", "*"),
@@ -1020,6 +1994,9 @@ async def create_tables():
                     ("p", "employee_account_manager", "*", "/get-states", "*"),
                     ("p", "employee_account_manager", "*", "/create-new-project", "*"),
                     ("p", "employee_account_manager", "*", "/get-project", "*"),
+                    ("p", "employee_account_manager", "*", "/get-project-view", "*"),
+                    ("p", "employee_account_manager", "*", "/get-changes", "*"),
+                    ("p", "employee_account_manager", "*", "/batch", "*"),
                     ("p", "employee_account_manager", "*", "/fetch-project-quotes", "*"),
                     ("p", "employee_account_manager", "*", "/fetch-project-documents", "*"),
                     ("p", "employee_account_manager", "*", "/get-clients", "*"),
@@ -1045,7 +2022,10 @@ async def create_tables():
 
                     ("p", "client_admin", "*", "/get-messages", "*"),
                     ("p", "client_admin", "*", "/send-message", "*"),
+                    ("p", "client_admin", "*", "/send-messages", "*"),
                     ("p", "client_admin", "*", "/get-notifications", "*"),
+                    ("p", "client_admin", "*", "/mark-notifications-read", "*"),
+                    ("p", "client_admin", "*", "/event-stream", "*"),
                     ("p", "client_admin", "*", "/save-onboarding-data", "*"),
                     ("p", "client_admin", "*", "/get-onboarding-data", "*"),
                     ("p", "client_admin", "*", "/update-insurance-data", "*"),
@@ -1053,6 +2033,9 @@ async def create_tables():
                     ("p", "client_admin", "*", "/get-profile-details", "*"),
                     ("p", "client_admin", "*", "/get-states", "*"),
                     ("p", "client_admin", "*", "/get-project", "*"),
+                    ("p", "client_admin", "*", "/get-project-view", "*"),
+                    ("p", "client_admin", "*", "/get-changes", "*"),
+                    ("p", "client_admin", "*", "/batch", "*"),
                     ("p", "client_admin", "*", "/fetch-project-quotes", "*"),
                     ("p", "client_admin", "*", "/fetch-project-documents", "*"),
                     ("p", "client_admin", "*", "/fetch-client", "*"),
@@ -1073,9 +2056,14 @@ async def create_tables():
 
                     ("p", "client_technician", "*", "/get-messages", "*"),
                     ("p", "client_technician", "*", "/get-notifications", "*"),
+                    ("p", "client_technician", "*", "/mark-notifications-read", "*"),
+                    ("p", "client_technician", "*", "/event-stream", "*"),
                     ("p", "client_technician", "*", "/get-profile-details", "*"),
                     ("p", "client_technician", "*", "/get-states", "*"),
                     ("p", "client_technician", "*", "/get-project", "*"),
+                    ("p", "client_technician", "*", "/get-project-view", "*"),
+                    ("p", "client_technician", "*", "/get-changes", "*"),
+                    ("p", "client_technician", "*", "/batch", "*"),
                     ("p", "client_technician", "*", "/fetch-project-quotes", "*"),
                     ("p", "client_technician", "*", "/fetch-project-documents", "*"),
                     ("p", "client_technician", "*", "/fetch-client", "*"),
@@ -1180,6 +2168,84 @@ async def create_tables():
         await conn.close()
 
 
+async def rebuild_row_counters():
+    conn = await asyncpg.connect(ASYNCPG_URL)
+    try:
+        async with conn.transaction():
+            await conn.execute("LOCK TABLE row_counter IN EXCLUSIVE MODE")
+            await conn.execute("DELETE FROM row_counter")
+            for counter, table, cols, hasDeleted in ROW_COUNTERS:
+                key = (
+                    "concat_ws(':', " + ", ".join(f"COALESCE({c}::text, '')" for c in cols) + ")"
+                    if cols else "'*'"
+                )
+                where = "WHERE is_deleted = FALSE" if hasDeleted else ""
+                await conn.execute(
+                    f"""
+                    INSERT INTO row_counter (counter, scope_key, total)
+                    SELECT $1, {key}, COUNT(*) FROM {table} {where} GROUP BY 2;
+                    """,
+                    counter,
+                )
+                print(f"✅ {counter}")
+        print("\n🔢 Row counters rebuilt.")
+    finally:
+        await conn.close()
+
+
+async def rebuild_rollups():
+    conn = await asyncpg.connect(ASYNCPG_URL)
+    try:
+        async with conn.transaction():
+            await conn.execute("LOCK TABLE dashboard_rollup IN EXCLUSIVE MODE")
+            await conn.execute("DELETE FROM dashboard_rollup")
+            await conn.execute(DASHBOARD_ROLLUP_REBUILD)
+            print("✅ dashboard_rollup")
+
+            await conn.execute("LOCK TABLE client_summary IN EXCLUSIVE MODE")
+            await conn.execute("DELETE FROM client_summary")
+            await conn.execute(CLIENT_SUMMARY_REBUILD)
+            print("✅ client_summary")
+
+            await conn.execute("LOCK TABLE notification_unread IN EXCLUSIVE MODE")
+            await conn.execute("DELETE FROM notification_unread")
+            await conn.execute(NOTIFICATION_UNREAD_REBUILD)
+            print("✅ notification_unread")
+        print("\n📊 Rollups rebuilt.")
+    finally:
+        await conn.close()
+
+
+async def rebuild_search_index():
+    conn = await asyncpg.connect(ASYNCPG_URL)
+    try:
+        async with conn.transaction():
+            await conn.execute("LOCK TABLE search_index IN EXCLUSIVE MODE")
+            await conn.execute("DELETE FROM search_index")
+            for table, title, clientId, projectId in SEARCH_SOURCES:
+                await conn.execute(
+                    f"""
+                    INSERT INTO search_index (source_table, record_id, client_id, project_id, title, body, is_deleted)
+                    SELECT '{table}', t.id, {clientId.format(r="t")}, {projectId.format(r="t")},
+                           COALESCE({title.format(r="t")}, ''), COALESCE(t.search_text, ''), t.is_deleted
+                      FROM {table} t;
+                    """
+                )
+                print(f"✅ {table}")
+        print("\n🔎 Search index rebuilt.")
+    finally:
+        await conn.close()
+
+
+async def set_search_triggers(mode: str):
+    conn = await asyncpg.connect(ASYNCPG_URL)
+    try:
+        async with conn.transaction():
+            await execute_block(conn, f"project search triggers ({mode})", PROJECT_SEARCH_TRIGGERS[mode])
+    finally:
+        await conn.close()
+
+
 async def reset_schema():
     conn = await asyncpg.connect(ASYNCPG_URL)
     try:
@@ -1190,9 +2256,29 @@ async def reset_schema():
 
 
 def print_usage():
-    print("Usage:\n  python db_manager.py reset\n  python db_manager.py create")
+    print(
+        "Usage:\n  python DbManager.py reset\n  python DbManager.py create"
+        "\n  python DbManager.py rebuild-counters\n  python DbManager.py rebuild-rollups"
+        "\n  python DbManager.py rebuild-search-index\n  python DbManager.py search-triggers row|statement"
+    )
 
 
 if __name__ == "__main__":
-    asyncio.run(reset_schema())
-    asyncio.run(create_tables())
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command is None:
+        asyncio.run(reset_schema())
+        asyncio.run(create_tables())
+    elif command == "reset":
+        asyncio.run(reset_schema())
+    elif command == "create":
+        asyncio.run(create_tables())
+    elif command == "rebuild-counters":
+        asyncio.run(rebuild_row_counters())
+    elif command == "rebuild-rollups":
+        asyncio.run(rebuild_rollups())
+    elif command == "rebuild-search-index":
+        asyncio.run(rebuild_search_index())
+    elif command == "search-triggers" and len(sys.argv) > 2 and sys.argv[2] in PROJECT_SEARCH_TRIGGERS:
+        asyncio.run(set_search_triggers(sys.argv[2]))
+    else:
+        print_usage()
@@ -2,6 +2,7 @@
 import asyncio
 import json
 import logging
+import time
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
@@ -9,7 +10,7 @@ import aiofiles
 import httpx
 import uvicorn
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from starlette.background import BackgroundTask
 
@@ -33,7 +34,14 @@ logger.setLevel(logging.INFO)
 backends: list[str] = []
 queue_counts: dict[str, int] = {}
 health_status: dict[str, bool] = {}
+# A backend that answered 503 + Retry-After is saturated, not broken: it gets
+# no new requests until this monotonic time
+busy_until: dict[str, float] = {}
 lock = asyncio.Lock()
+# Overall time a request may take, passed to the backends as an absolute
+# X-Request-Deadline (epoch seconds) so retries do not restart the clock
+REQUEST_BUDGET_SECONDS = 30.0
+DEADLINE_HEADER = b"x-request-deadline"
 client = httpx.AsyncClient(timeout=None)
 
 # ——— Persistence Helpers ———
@@ -110,6 +118,7 @@ async def remove_server(server: Server):
             backends.remove(server.url)
             queue_counts.pop(server.url, None)
             health_status.pop(server.url, None)
+            busy_until.pop(server.url, None)
             await save_backends(backends)
             logger.info(f"Removed backend: {server.url}")
     return {"servers": backends}
@@ -122,7 +131,9 @@ async def list_servers():
 @app.get("/queue-lengths")
 async def list_queue_lengths():
     async with lock:
-        return {"queue_lengths": queue_counts, "health": health_status}
+        now = time.monotonic()
+        busy = {u: round(t - now, 1) for u, t in busy_until.items() if t > now}
+        return {"queue_lengths": queue_counts, "health": health_status, "busy_for_seconds": busy}
 
 # ——— Load-Balancer Middleware ———
 @app.middleware("http")
@@ -134,31 +145,47 @@ async def load_balancer(request: Request, call_next):
     if path.startswith("/servers") or path == "/queue-lengths":
         return await call_next(request)
 
-    # 2) Pick least-loaded healthy backend
+    # 2) Fail fast when no backend is healthy
     async with lock:
         available = [u for u in backends if health_status.get(u)]
         if not available:
             logger.error(f"{client_ip} -> No available backends for {path}")
             raise HTTPException(status_code=503, detail="No available backends")
-        target = min(available, key=lambda u: queue_counts[u])
-        queue_counts[target] += 1
 
-    logger.info(f"{client_ip} -> {request.method} {path} ➔ {target}")
-
-    # 3) Construct upstream URL properly
     qs = request.url.query
-    upstream_url = target + path + (f"?{qs}" if qs else "")
-
-    # 4) Proxy with retries and manual stream-manager enter/exit
+    body = await request.body()
+    headers = request.headers.raw
+    if not any(k.lower() == DEADLINE_HEADER for k, _ in headers):
+        headers = headers + [(DEADLINE_HEADER, f"{time.time() + REQUEST_BUDGET_SECONDS:.3f}".encode())]
+
+    # 3) Proxy with retries and manual stream-manager enter/exit. Connection
+    #    errors are retried, a saturated backend (503 + Retry-After) is skipped
+    #    and the request goes to the next one straight away.
     max_retries = 3
-    for attempt in range(1, max_retries + 1):
+    failures = 0
+    skipped: set[str] = set()
+    for attempt in range(1, max_retries + len(backends) + 1):
+        async with lock:
+            now = time.monotonic()
+            available = [
+                u for u in backends
+                if health_status.get(u) and u not in skipped and busy_until.get(u, 0) <= now
+            ]
+            if not available:
+                break
+            target = min(available, key=lambda u: queue_counts[u])
+            queue_counts[target] += 1
+
+        logger.info(f"{client_ip} -> {request.method} {path} ➔ {target}")
+        upstream_url = target + path + (f"?{qs}" if qs else "")
+
         try:
             # Create, but don’t “await” the async-context manager
             manager = client.stream(
                 request.method,
                 upstream_url,
-                headers=request.headers.raw,
-                content=await request.body(),
+                headers=headers,
+                content=body,
                 timeout=None
             )
 
@@ -166,6 +193,18 @@ async def load_balancer(request: Request, call_next):
             resp = await manager.__aenter__()
             logger.info(f"Response {resp.status_code} from {target} (attempt {attempt})")
 
+            if resp.status_code == 503 and "retry-after" in resp.headers:
+                await manager.__aexit__(None, None, None)
+                try:
+                    wait = max(float(resp.headers["retry-after"]), 0.0)
+                except ValueError:
+                    wait = 1.0
+                skipped.add(target)
+                async with lock:
+                    busy_until[target] = time.monotonic() + wait
+                logger.info(f"{target} is saturated, routing elsewhere for {wait}s")
+                continue
+
             # Return a StreamingResponse that will close the manager in background
             return StreamingResponse(
                 resp.aiter_bytes(),
@@ -176,7 +215,8 @@ async def load_balancer(request: Request, call_next):
 
         except httpx.RequestError as e:
             logger.warning(f"Attempt {attempt} to {upstream_url} failed: {e}")
-            if attempt == max_retries:
+            failures += 1
+            if failures == max_retries:
                 logger.error(f"All {max_retries} attempts failed for {client_ip} -> {path}")
                 raise HTTPException(status_code=502, detail=str(e))
             await asyncio.sleep(1)
@@ -185,5 +225,16 @@ async def load_balancer(request: Request, call_next):
             async with lock:
                 queue_counts[target] -= 1
 
+    # 4) Every healthy backend is saturated: pass the backpressure on
+    async with lock:
+        now = time.monotonic()
+        wait = min((t - now for t in busy_until.values() if t > now), default=1)
+    logger.warning(f"{client_ip} -> All backends busy for {path}")
+    return JSONResponse(
+        {"detail": "All backends busy"},
+        status_code=503,
+        headers={"Retry-After": str(max(round(wait), 1))},
+    )
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8100, log_level="info")
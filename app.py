@@ -1,12 +1,15 @@
 import asyncio
 import base64
+import hashlib
+import inspect
 import json
 import os
 import random
 from contextlib import asynccontextmanager
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, timezone, timedelta
 from decimal import Decimal
-from typing import Optional
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Optional, Union, get_args, get_origin
 from uuid import UUID, uuid4
 
 import httpx
@@ -18,15 +21,27 @@ from casbin import AsyncEnforcer
 from casbin_async_sqlalchemy_adapter import Adapter
 from casbin_redis_watcher import new_watcher, WatcherOptions
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
-from fastapi import FastAPI, HTTPException, Query, Body, Request, Depends, status
+from fastapi import FastAPI, HTTPException, Query, Body, Request, Response, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.exception_handlers import http_exception_handler
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.routing import APIRoute
 from redis.asyncio import Redis
 from sqlalchemy import Column, Integer, String
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import declarative_base
 
-from constants import ASYNCPG_URL, SECRET_KEY, REDIS_URL, KMS_URL, BYPASS_ONBOARDING_CHECKS, BYPASS_SESSION
+from connections import (
+    Budget, BudgetStats, ClientDisconnected, DeadlineExceeded, DisconnectWatch, InFlightLimit, InFlightStats,
+    LazyConnection, PoolGate, PoolSaturated, RouteStats, SingleFlight, fanOut, saturatedResponse
+)
+from constants import ASYNCPG_URL, REPLICA_URL, RESPONSE_CACHE_SHARED, SECRET_KEY, REDIS_URL, KMS_URL, BYPASS_ONBOARDING_CHECKS, BYPASS_SESSION, COOKIE_DOMAIN
+from events import TOPICS, EventHub, Subscriber
+from pagination import (
+    EXACT, HAS_MORE, NEXT, Keyset, countRows, decodeCursor, encodeCursor, fetchPage, readCursor, scopeKey, trimPage
+)
+from replica import REPLICA_MAX_LAG_SECONDS, Replica
+from responsecache import CachePolicy, ResponseCache
 from util import isUUIDv4, createMagicLink, generateJwtRs256, decodeJwtRs256
 
 
@@ -46,9 +61,116 @@ def get_db_pool(request: Request) -> Pool:
     return request.app.state.db_pool
 
 
-async def get_conn(db_pool: Pool = Depends(get_db_pool)):
-    async with db_pool.acquire() as conn:
+# Reads that may be served by the replica (see replica.py). /get-onboarding-data
+# stays on the primary because its result is cached in Redis after a save.
+# /batch runs the routes that pass isBatchable, PRIMARY_READ_ROUTES on a
+# primary connection of their own.
+READ_ROUTE_PREFIXES = ("/get-", "/fetch-", "/global-search", "/batch")
+PRIMARY_READ_ROUTES = {"/get-onboarding-data"}
+
+# Routes that change data the read routes return. Once one of them succeeds
+# the same browser keeps reading from the primary until the replica has caught
+# up with it.
+WRITE_ROUTE_PREFIXES = (
+    "/create-", "/update-", "/delete-", "/send-message", "/save-", "/mark-notifications-read",
+    "/admin/create-", "/admin/update-", "/admin/delete-",
+)
+READ_PRIMARY_COOKIE = "read_primary"
+READ_YOUR_WRITES_SECONDS = 10
+
+
+def isReadRoute(path: str) -> bool:
+    return path.startswith(READ_ROUTE_PREFIXES) and path not in PRIMARY_READ_ROUTES
+
+
+def isBatchable(path: str) -> bool:
+    return path.startswith(READ_ROUTE_PREFIXES) and path != "/batch"
+
+
+# Latency budget (seconds) per route: every query of a request runs with what is
+# left of it as its statement timeout. Overruns are listed by /admin/route-budgets.
+DEFAULT_ROUTE_BUDGET = 5.0
+ROUTE_BUDGETS = {
+    "/global-search": 2.0,
+    "/get-mention-users": 1.0,
+    "/get-dashboard-metrics": 2.0,
+    "/get-calendar-events": 2.0,
+    "/get-notifications": 1.0,
+    "/get-projects": 3.0,
+    "/get-messages": 2.0,
+    "/get-project-view": 3.0,
+    "/get-changes": 2.0,
+    "/save-onboarding-data": 10.0,
+    "/admin/create-endpoint": 15.0,
+}
+# Long-lived, their queries are bounded but the request time is not an overrun
+UNBUDGETED_ROUTES = {"/event-stream"}
+DEADLINE_HEADER = "x-request-deadline"  # absolute epoch seconds, set by LoadBalancer.py
+
+
+def requestBudget(request: Request) -> Budget:
+    path = request.url.path
+    deadline = None
+    try:
+        deadline = float(request.headers[DEADLINE_HEADER])
+    except (KeyError, ValueError):
+        pass
+    return Budget(
+        path,
+        ROUTE_BUDGETS.get(path, DEFAULT_ROUTE_BUDGET),
+        request.app.state.budget_stats,
+        deadline=deadline,
+        disconnected=request.scope.get("disconnected"),
+    )
+
+
+async def get_conn(request: Request, response: Response, db_pool: Pool = Depends(get_db_pool)):
+    # The pool (replica or primary) is chosen here, the connection itself is
+    # only checked out by the first query, see connections.LazyConnection
+    replica = request.app.state.replica
+    useReplica = False
+    if replica and isReadRoute(request.url.path):
+        useReplica = not request.cookies.get(READ_PRIMARY_COOKIE)
+    elif replica and request.url.path.startswith(WRITE_ROUTE_PREFIXES):
+        # Only sent if the endpoint returns, so after its writes have committed.
+        # An HTTPException drops these headers.
+        response.set_cookie(
+            READ_PRIMARY_COOKIE,
+            "1",
+            httponly=True,
+            secure=True,
+            samesite="none",
+            domain=COOKIE_DOMAIN,
+            path="/",
+            max_age=READ_YOUR_WRITES_SECONDS,
+        )
+
+    async def acquirePrimary():
+        return await request.app.state.pool_gate.acquire(), db_pool.release
+
+    async def acquire():
+        if useReplica:
+            conn = await replica.acquire()
+            if conn is not None:
+                return conn, replica.release
+        return await acquirePrimary()
+
+    budget = requestBudget(request)
+    # Only reads are coalesced, a write must never be answered by a query that
+    # started before it
+    flight = request.app.state.single_flight if isReadRoute(request.url.path) else None
+    conn = LazyConnection(
+        acquire, request.url.path, request.app.state.pool_stats, budget,
+        flight=flight, pool="replica" if useReplica else "primary",
+    )
+    # For PRIMARY_READ_ROUTES batched into a replica request, see runBatched
+    request.state.acquire_primary = acquirePrimary
+    try:
         yield conn
+    finally:
+        await conn.release(force=True)
+        if request.url.path not in UNBUDGETED_ROUTES:
+            budget.finish()
 
 
 async def getCurrentUser(request: Request, conn: Connection = Depends(get_conn), ) -> SimpleUser | None:
@@ -77,6 +199,10 @@ async def getCurrentUser(request: Request, conn: Connection = Depends(get_conn),
         email,
     )
     if row:
+        if isinstance(conn, LazyConnection) and conn.flight:
+            # Users with the same roles may share identical reads from here on
+            roles = await request.app.state.enforcer.get_roles_for_user_in_domain(email, "*")
+            conn.flightScope = ",".join(sorted(roles))
         return SimpleUser(
             row["id"],
             email,
@@ -93,6 +219,20 @@ def getEnforcer(request: Request) -> AsyncEnforcer:
     return request.app.state.enforcer
 
 
+async def authorizedClientIds(conn: Connection, enforcer: AsyncEnforcer, user: SimpleUser) -> list[UUID] | None:
+    # None means every client (employee_admin)
+    roles = await enforcer.get_roles_for_user_in_domain(user.email, "*")
+    if "employee_admin" in roles:
+        return None
+    if "employee_account_manager" in roles:
+        rows = await conn.fetch(
+            "SELECT client_id FROM account_manager_client WHERE account_manager_email=$1", user.email
+        )
+        return [r["client_id"] for r in rows]
+    clientId = await conn.fetchval('SELECT client_id FROM "user" WHERE email=$1', user.email)
+    return [clientId] if clientId else []
+
+
 async def authorize(request: Request, user: SimpleUser = Depends(getCurrentUser),
                     enforcer: AsyncEnforcer = Depends(getEnforcer)):
     path = request.url.path
@@ -142,6 +282,11 @@ async def authorize(request: Request, user: SimpleUser = Depends(getCurrentUser)
     return True
 
 
+def mayCall(enforcer: AsyncEnforcer, user: SimpleUser, path: str) -> bool:
+    # The check authorize() makes, for endpoints served from inside another one
+    return BYPASS_SESSION or enforcer.enforce(str(user.email), "*", path, "post")
+
+
 def decryptPayload():
     async def _dep(payload: dict = Body(), request: Request = None):
         if "clientPubKey" not in payload:
@@ -179,14 +324,17 @@ def decryptPayload():
     return _dep
 
 
-def encryptForClient(data: dict, client_pub: bytes, app: FastAPI) -> dict:
+def clientCipher(client_pub: bytes, app: FastAPI) -> AESGCM:
     server_priv = base64.b64decode(app.state.ed25519PrivateKey)
     server_pub = base64.b64decode(app.state.ed25519PublicKey)
     secret = server_priv + server_pub
     server_curve_priv = nacl.bindings.crypto_sign_ed25519_sk_to_curve25519(secret)
     client_curve_pub = nacl.bindings.crypto_sign_ed25519_pk_to_curve25519(client_pub)
     shared = nacl.bindings.crypto_scalarmult(server_curve_priv, client_curve_pub)
-    aes = AESGCM(shared)
+    return AESGCM(shared)
+
+
+def sealForClient(data: dict, aes: AESGCM) -> dict:
     iv = os.urandom(12)
 
     def defaultEncoder(o):
@@ -201,11 +349,28 @@ def encryptForClient(data: dict, client_pub: bytes, app: FastAPI) -> dict:
     }
 
 
+def encryptForClient(data: dict, client_pub: bytes, app: FastAPI) -> dict:
+    return sealForClient(data, clientCipher(client_pub, app))
+
+
+# Set while /batch runs handlers: their payloads go into the batch response,
+# which is encrypted once as a whole
+IN_BATCH = ContextVar("in_batch", default=False)
+
+
 async def encryptForUser(data: dict, email: str, conn: Connection, app: FastAPI) -> dict:
+    if IN_BATCH.get():
+        if isinstance(conn, LazyConnection):
+            await conn.release()
+        return data
     row = await conn.fetchrow(
         "SELECT public_key FROM user_key WHERE user_email=$1 AND purpose='sig'",
         email,
     )
+    # Normally the endpoint's last query, hand the connection back before
+    # spending CPU on serialization and encryption
+    if isinstance(conn, LazyConnection):
+        await conn.release()
     if not row:
         return data
     return encryptForClient(data, row["public_key"], app)
@@ -296,6 +461,14 @@ async def lifespan(app: FastAPI):
         dsn=ASYNCPG_URL, min_size=5, max_size=20
     )
     print("DB pool created")
+    app.state.pool_gate = PoolGate(app.state.db_pool)
+    app.state.pool_stats = RouteStats()
+    app.state.budget_stats = BudgetStats()
+    app.state.single_flight = SingleFlight()
+
+    app.state.replica = Replica(REPLICA_URL) if REPLICA_URL else None
+    if app.state.replica:
+        await app.state.replica.start()
 
     redis = Redis.from_url(REDIS_URL, decode_responses=True)
     app.state.redis = redis
@@ -370,9 +543,21 @@ async def lifespan(app: FastAPI):
 
     asyncio.create_task(refreshKeys())
 
+    app.state.events = EventHub(app.state.db_pool)
+    await app.state.events.start()
+
+    app.state.response_cache = ResponseCache(
+        app.state.db_pool, RESPONSE_CACHE, app.state.redis if RESPONSE_CACHE_SHARED else None
+    )
+    await app.state.response_cache.start()
+
     try:
         yield
     finally:
+        await app.state.response_cache.stop()
+        await app.state.events.stop()
+        if app.state.replica:
+            await app.state.replica.stop()
         await app.state.db_pool.close()
         await app.state.redis.close()
         print("DB pool closed")
@@ -392,6 +577,45 @@ app.add_middleware(
     max_age=86400,
 )
 
+# Added last so it runs first: an over-cap request is turned away before any
+# other work. CORS headers are skipped on those, the load balancer never needs them.
+app.state.in_flight = InFlightStats()
+app.add_middleware(InFlightLimit, stats=app.state.in_flight)
+# Outermost, so it owns receive() and sees a disconnect whatever runs inside
+app.add_middleware(DisconnectWatch)
+
+
+@app.exception_handler(PoolSaturated)
+async def poolSaturatedHandler(request: Request, exc: PoolSaturated):
+    return saturatedResponse(exc.reason)
+
+
+@app.exception_handler(DeadlineExceeded)
+async def deadlineExceededHandler(request: Request, exc: DeadlineExceeded):
+    return JSONResponse({"detail": str(exc)}, status_code=504)
+
+
+@app.exception_handler(ClientDisconnected)
+async def clientDisconnectedHandler(request: Request, exc: ClientDisconnected):
+    # Nobody reads this, the status only shows up in the access log
+    return Response(status_code=499)
+
+
+@app.exception_handler(HTTPException)
+async def httpExceptionHandler(request: Request, exc: HTTPException):
+    # Endpoints turn unexpected errors into 500s with "except Exception", a
+    # saturated pool must still reach the client as 503 + Retry-After and a
+    # blown budget as 504
+    cause = exc.__cause__ or exc.__context__
+    if isinstance(cause, PoolSaturated):
+        return saturatedResponse(cause.reason)
+    if isinstance(cause, DeadlineExceeded):
+        return await deadlineExceededHandler(request, cause)
+    if isinstance(cause, ClientDisconnected):
+        return await clientDisconnectedHandler(request, cause)
+    return await http_exception_handler(request, exc)
+
+
 
 async def save_role_mapping(conn: Connection, sub: str, role: str, dom: str = "*", delete: bool = False):
     if delete:
@@ -528,7 +752,7 @@ async def validateLoginToken(
         httponly=True,
         secure=True,
         samesite="none",
-        domain="localhost",
+        domain=COOKIE_DOMAIN,
         path="/",
         max_age=60 * 60 * 24,
     )
@@ -536,6 +760,138 @@ async def validateLoginToken(
     return response
 
 
+# How each paginated endpoint fills "total_count" (see pagination.py). Filtered
+# searches always fall back to HAS_MORE since no counter covers arbitrary terms.
+COUNT_STRATEGIES = {
+    "/get-notifications": HAS_MORE,
+    "/get-projects": EXACT,
+    "/get-messages": EXACT,
+    "/fetch-project-quotes": EXACT,
+    "/fetch-project-documents": EXACT,
+    "/get-clients": EXACT,
+    "/fetch-client-invoices": EXACT,
+    "/fetch-client-onboarding-documents": EXACT,
+    "/get-insurance-documents": EXACT,
+    "/fetch-client-projects": HAS_MORE,
+    # Lists billing-category invoices only, which no counter tracks
+    "/get-billings": HAS_MORE,
+    "/get-passwords": HAS_MORE,
+}
+
+# Routes whose data may be a few seconds old, see responsecache.py. Only first
+# pages are cached, later pages always hit the database.
+RESPONSE_CACHE = {
+    "/get-dashboard-metrics": CachePolicy(ttl=10, staleFor=50),
+    "/get-projects": CachePolicy(ttl=3, staleFor=27),
+    "/get-clients": CachePolicy(ttl=5, staleFor=25),
+}
+# What each kind of write makes out of date
+PROJECT_WRITE_ROUTES = ("/get-projects", "/get-clients", "/get-dashboard-metrics")
+CLIENT_WRITE_ROUTES = ("/get-clients",)
+INVOICE_WRITE_ROUTES = ("/get-clients", "/get-dashboard-metrics")
+LOOKUP_WRITE_ROUTES = ("/get-projects", "/get-clients", "/get-dashboard-metrics")
+
+
+async def cacheScope(conn: Connection, enforcer: AsyncEnforcer, user: SimpleUser) -> str:
+    # Users share entries only when they are allowed to see the same rows
+    roles = await enforcer.get_roles_for_user_in_domain(user.email, "*")
+    if "employee_admin" in roles:
+        return "all"
+    if "employee_account_manager" in roles:
+        return f"am:{user.email}"
+    clientId = await conn.fetchval('SELECT client_id FROM "user" WHERE email=$1', user.email)
+    return f"client:{clientId}"
+
+
+async def cachedResponse(request: Request, route: str, params: dict, conn: Connection, user: SimpleUser | None,
+                         load: Callable[[Connection], Awaitable[dict]]) -> dict:
+    if not user:
+        return await load(conn)
+    scope = await cacheScope(conn, request.app.state.enforcer, user)
+    return await request.app.state.response_cache.get(route, scope, params, conn, load)
+
+
+async def invalidateCached(*routes: str):
+    # Called by endpoints after a committed write
+    await app.state.response_cache.invalidate(*routes)
+
+
+# Conditional requests. Responses carry an "etag" inside the encrypted payload;
+# a request that sends it back as "ifNoneMatch" gets {"not_modified": true}
+# when nothing changed, with no row loaded, serialized or encrypted. Detail tags
+# come from row_version, list tags from list_version (see ROW_VERSION in
+# DbManager.py), lookups included where a response shows lookup values. A list
+# version is the sum of its shards.
+LOOKUP_VERSION_SQL = "(SELECT SUM(version) FROM list_version WHERE name = 'lookup' AND scope_key = '*')"
+
+DETAIL_TAG_SQL = {
+    "project": f"""
+        SELECT p.row_version, {LOOKUP_VERSION_SQL}
+          FROM project p
+         WHERE p.id = $1;
+    """,
+    "client": f"""
+        SELECT c.row_version,
+               (SELECT SUM(version) FROM list_version
+                 WHERE name = 'client_summary_by_client' AND scope_key = c.id::text),
+               {LOOKUP_VERSION_SQL}
+          FROM client c
+         WHERE c.id = $1;
+    """,
+    "invoice": """
+        SELECT i.row_version, d.row_version
+          FROM invoice i
+          LEFT JOIN document d ON d.id = i.file_id
+         WHERE i.id = $1;
+    """,
+    "quote": """
+        SELECT q.row_version, d.row_version
+          FROM quote q
+          LEFT JOIN document d ON d.id = q.file_id
+         WHERE q.id = $1;
+    """,
+}
+
+LIST_TAG_SQL = """
+    SELECT SUM(v.version) AS version, MAX(v.max_updated_at) AS max_updated_at
+      FROM unnest($1::text[], $2::text[]) WITH ORDINALITY AS s(name, scope_key, n)
+      LEFT JOIN list_version v ON v.name = s.name AND v.scope_key = s.scope_key
+     GROUP BY s.n
+     ORDER BY s.n;
+"""
+
+
+def versionTag(*parts) -> str:
+    return hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()[:20]
+
+
+async def detailTag(conn: Connection, kind: str, recordId, *extra) -> str | None:
+    # None when the record does not exist, the endpoint then answers 404 as usual
+    row = await conn.fetchrow(DETAIL_TAG_SQL[kind], recordId)
+    return versionTag(kind, recordId, *row, *extra) if row else None
+
+
+async def listTag(conn: Connection, scopes: list[tuple[str, str]], data: dict) -> str:
+    # The request parameters are part of the tag, so one tag never stands for
+    # another page, size or filter
+    rows = await conn.fetch(LIST_TAG_SQL, [n for n, _ in scopes], [k for _, k in scopes])
+    params = json.dumps({k: v for k, v in data.items() if k != "ifNoneMatch"}, sort_keys=True, default=str)
+    return versionTag(*[(r["version"], r["max_updated_at"]) for r in rows], params)
+
+
+def escapeLike(term: str) -> str:
+    # Match % and _ literally in LIKE/ILIKE patterns (backslash is the default escape)
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def notModified(data: dict, tag: str | None) -> bool:
+    return tag is not None and data.get("ifNoneMatch") == tag
+
+
+def notModifiedResponse(tag: str) -> dict:
+    return {"not_modified": True, "etag": tag}
+
+
 async def uploadDocument(fileBlob: bytes) -> dict:
     """Placeholder for uploading files to storage bucket."""
     return {
@@ -550,31 +906,168 @@ async def uploadDocument(fileBlob: bytes) -> dict:
 # TODO:                           HEADER ENDPOINTS                             #
 ################################################################################
 
+# Ranked search over search_index (see SEARCH_INDEX in DbManager.py). A record
+# matches on full text or on a trigram substring match. Rank combines ts_rank_cd with
+# title similarity. No type can take more than $2 of the $3 slots. $4 limits hits
+# to the caller's clients (NULL = all). $5 is the term with LIKE wildcards escaped.
+GLOBAL_SEARCH_SQL = """
+    WITH q AS (
+        SELECT websearch_to_tsquery('simple', $1) AS tsq
+    ), hits AS (
+        SELECT si.source_table, si.record_id, si.client_id, si.project_id, si.title, si.body,
+               ts_rank_cd(si.tsv, q.tsq, 32) + word_similarity($1, si.title) AS rank
+          FROM search_index si, q
+         WHERE si.is_deleted = FALSE
+           AND ($4::uuid[] IS NULL OR si.client_id = ANY($4::uuid[]))
+           AND (si.tsv @@ q.tsq OR si.body ILIKE '%' || $5 || '%')
+    ), ranked AS (
+        SELECT *, row_number() OVER (PARTITION BY source_table ORDER BY rank DESC, record_id) AS type_rank
+          FROM hits
+    ), top AS (
+        SELECT * FROM ranked
+         WHERE type_rank <= $2
+         ORDER BY rank DESC, record_id
+         LIMIT $3
+    )
+    SELECT top.source_table, top.record_id, top.client_id, top.project_id, top.title, top.rank,
+           ts_headline('simple', top.body, q.tsq,
+                       'StartSel=<mark>, StopSel=</mark>, MaxFragments=1, MinWords=6, MaxWords=18') AS snippet
+      FROM top, q
+     ORDER BY top.rank DESC, top.record_id;
+"""
+
+# Display fields per result type, fetched with one query per type. $2 repeats the
+# client restriction so a hit can never be hydrated outside the caller's clients.
+SEARCH_HYDRATE_SQL = {
+    "project": """
+        SELECT p.id, p.business_name, c.company_name AS client, pp.value AS priority, pt.value AS type,
+               s.value AS status, u.first_name || ' ' || u.last_name AS assignee
+          FROM project p
+          JOIN client c            ON c.id = p.client_id
+          JOIN project_priority pp ON pp.id = p.priority_id
+          JOIN project_type pt     ON pt.id = p.type_id
+          JOIN status s            ON s.id = p.status_id
+          JOIN "user" u            ON u.id = p.assignee_id
+         WHERE p.id = ANY($1::uuid[])
+           AND p.is_deleted = FALSE
+           AND ($2::uuid[] IS NULL OR p.client_id = ANY($2::uuid[]));
+    """,
+    "client": """
+        SELECT c.id, c.company_name, s.value AS status, ct.value AS type,
+               COALESCE(cs.total_collected, 0) AS total_revenue
+          FROM client c
+          JOIN status s       ON s.id = c.status_id
+          JOIN client_type ct ON ct.id = c.type_id
+          LEFT JOIN client_summary cs ON cs.client_id = c.id
+         WHERE c.id = ANY($1::uuid[])
+           AND c.is_deleted = FALSE
+           AND ($2::uuid[] IS NULL OR c.id = ANY($2::uuid[]));
+    """,
+    "document": """
+        SELECT d.id, d.file_name, d.file_extension, d.document_type, d.purpose,
+               d.project_id, COALESCE(d.client_id, p.client_id) AS client_id, d.created_at
+          FROM document d
+          LEFT JOIN project p ON p.id = d.project_id
+         WHERE d.id = ANY($1::uuid[])
+           AND d.is_deleted = FALSE
+           AND ($2::uuid[] IS NULL OR COALESCE(d.client_id, p.client_id) = ANY($2::uuid[]));
+    """,
+    "quote": """
+        SELECT q.id, q.number, q.amount, s.value AS status, q.project_id, q.client_id, q.created_at
+          FROM quote q
+          JOIN status s ON s.id = q.status_id
+         WHERE q.id = ANY($1::uuid[])
+           AND q.is_deleted = FALSE
+           AND ($2::uuid[] IS NULL OR q.client_id = ANY($2::uuid[]));
+    """,
+    "invoice": """
+        SELECT i.id, i.number, i.amount, s.value AS status, i.issuance_date, i.due_date, i.client_id
+          FROM invoice i
+          JOIN status s ON s.id = i.status_id
+         WHERE i.id = ANY($1::uuid[])
+           AND i.is_deleted = FALSE
+           AND ($2::uuid[] IS NULL OR i.client_id = ANY($2::uuid[]));
+    """,
+    "message": """
+        SELECT m.id, m.content, m.project_id, p.business_name, m.created_at,
+               u.first_name || ' ' || u.last_name AS sender
+          FROM message m
+          JOIN project p ON p.id = m.project_id
+          JOIN "user" u  ON u.id = m.sender_id
+         WHERE m.id = ANY($1::uuid[])
+           AND m.is_deleted = FALSE
+           AND ($2::uuid[] IS NULL OR p.client_id = ANY($2::uuid[]));
+    """,
+}
+
+
 @app.post("/global-search")
 async def globalSearch(
         request: Request,
         data: dict = Depends(decryptPayload()),
         q: str | None = Query(None, description="Search query string"),
         conn: Connection = Depends(get_conn),
-        user: SimpleUser = Depends(getCurrentUser)
+        user: SimpleUser = Depends(getCurrentUser),
+        enforcer: AsyncEnforcer = Depends(getEnforcer)
 ):
     term = data.get("q") or q
     if not term:
         raise HTTPException(status_code=400, detail="Missing search term")
-    globalSearchSql = """
-        SELECT source_table, record_id, search_text, is_deleted
-          FROM global_search
-         WHERE  length($1::text) >= 3
-           AND search_text ILIKE '%' || $1 || '%'
-         ORDER BY source_table, record_id
-         LIMIT 10;
-    """
+    try:
+        perType = max(1, min(int(data.get("per_type", 5)), 20))
+        limit = max(1, min(int(data.get("limit", 20)), 50))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="per_type and limit must be integers")
 
     try:
-        results = await conn.fetch(globalSearchSql, term)
+        clientIds = await authorizedClientIds(conn, enforcer, user) if user else None
+        # Terms under 3 characters have no trigrams to match on
+        hits = await conn.fetch(
+            GLOBAL_SEARCH_SQL, term, perType, limit, clientIds, escapeLike(term)
+        ) if len(term) >= 3 else []
+
+        idsByType = {}
+        for h in hits:
+            idsByType.setdefault(h["source_table"], []).append(h["record_id"])
+        items = {}
+        for sourceTable, ids in idsByType.items():
+            for r in await conn.fetch(SEARCH_HYDRATE_SQL[sourceTable], ids, clientIds):
+                items[(sourceTable, r["id"])] = dict(r)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    payload = {"results": [dict(r) for r in results]}
+
+    results = []
+    for h in hits:
+        item = items.get((h["source_table"], h["record_id"]))
+        if item:
+            results.append({**dict(h), "item": item})
+
+    payload = {
+        "results": results,
+        # Shapes used by the search dialog in components/Header.tsx
+        "projects": [
+            {
+                "poNumber": str(r["item"]["id"]),
+                "businessName": r["item"]["business_name"],
+                "client": r["item"]["client"],
+                "priority": r["item"]["priority"],
+                "type": r["item"]["type"],
+                "status": r["item"]["status"],
+                "assignee": r["item"]["assignee"],
+            }
+            for r in results if r["source_table"] == "project"
+        ],
+        "clients": [
+            {
+                "id": str(r["item"]["id"]),
+                "clientName": r["item"]["company_name"],
+                "status": r["item"]["status"],
+                "type": r["item"]["type"],
+                "totalRevenue": r["item"]["total_revenue"],
+            }
+            for r in results if r["source_table"] == "client"
+        ],
+    }
     if user:
         payload = await encryptForUser(payload, user.email, conn, request.app)
     return payload
@@ -932,6 +1425,87 @@ async def deleteClientAdminTechnicianRelation(
     return {"status": "deleted"}
 
 
+# One round trip per send: the message row and its mentions are written by a
+# single data-modifying CTE. message.mentions carries a copy of the mentioned
+# emails so /get-messages never joins message_mention, which stays for lookups
+# by user. Ids are generated here so a queued client can retry a batch without
+# creating duplicates (ON CONFLICT (id) DO NOTHING).
+MAX_MESSAGE_BATCH = 100
+
+SEND_MESSAGES_SQL = """
+    WITH mention AS (
+        SELECT * FROM unnest($7::uuid[], $8::citext[]) AS t(message_id, user_email)
+    ), input AS (
+        SELECT *
+          FROM unnest($1::uuid[], $2::uuid[], $3::text[], $4::boolean[])
+               AS t(id, project_id, content, has_mentions)
+    ), m AS (
+        INSERT INTO message (id, project_id, sender_id, content, sender_role, has_mentions, mentions)
+        SELECT i.id, i.project_id, $5, i.content, $6, i.has_mentions,
+               ARRAY(SELECT mn.user_email FROM mention mn WHERE mn.message_id = i.id)
+          FROM input i
+        ON CONFLICT (id) DO NOTHING
+        RETURNING id, created_at
+    ), mm AS (
+        INSERT INTO message_mention (message_id, user_email)
+        SELECT m.id, mn.user_email
+          FROM mention mn
+          JOIN m ON m.id = mn.message_id
+        ON CONFLICT DO NOTHING
+    )
+    SELECT id, created_at FROM m
+    UNION ALL
+    SELECT id, created_at FROM message
+     WHERE id = ANY($1::uuid[]) AND sender_id = $5 AND id NOT IN (SELECT id FROM m);
+"""
+
+
+# Projects of messages (live ones only) the sender may write to
+MESSAGE_PROJECTS_SQL = """
+    SELECT id
+      FROM project
+     WHERE id = ANY($1::uuid[])
+       AND is_deleted = FALSE
+       AND ($2::uuid[] IS NULL OR client_id = ANY($2::uuid[]));
+"""
+
+
+async def insertMessages(conn: Connection, enforcer: AsyncEnforcer, user: SimpleUser, senderRole: str,
+                         messages: list[dict]) -> list[dict]:
+    ids, projectIds, contents, hasMentions = [], [], [], []
+    mentionIds, mentionEmails = [], []
+    for msg in messages:
+        projectId = msg.get("projectId")
+        content = msg.get("content")
+        if not projectId or not content:
+            raise HTTPException(status_code=400, detail="invalid params")
+        try:
+            msgId = UUID(str(msg["id"])) if msg.get("id") else uuid4()
+            projectIds.append(UUID(str(projectId)))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid projectId or message id")
+        emails = list(dict.fromkeys(msg.get("mentions") or []))
+        ids.append(msgId)
+        contents.append(content)
+        hasMentions.append(bool(emails))
+        mentionIds += [msgId] * len(emails)
+        mentionEmails += emails
+
+    wanted = set(projectIds)
+    clientIds = await authorizedClientIds(conn, enforcer, user)
+    allowed = {r["id"] for r in await conn.fetch(MESSAGE_PROJECTS_SQL, list(wanted), clientIds)}
+    if wanted - allowed:
+        raise HTTPException(status_code=403, detail="Not allowed to message this project")
+
+    async with conn.transaction():
+        rows = await conn.fetch(
+            SEND_MESSAGES_SQL,
+            ids, projectIds, contents, hasMentions, user.id, senderRole, mentionIds, mentionEmails
+        )
+    createdAt = {r["id"]: r["created_at"] for r in rows}
+    return [{"messageId": str(i), "created_at": createdAt[i].isoformat()} for i in ids if i in createdAt]
+
+
 @app.post("/send-message")
 async def sendMessage(
         request: Request,
@@ -939,34 +1513,58 @@ async def sendMessage(
         conn: Connection = Depends(get_conn),
         user: SimpleUser = Depends(getCurrentUser)
 ):
-    project_id = data.get("projectId")
-    content = data.get("content")
-    mention_emails = data.get("mentions", [])
-    if not project_id or not content:
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    roles = await request.app.state.enforcer.get_roles_for_user_in_domain(user.email, "*")
+    role = roles[0] if roles else ""
+    try:
+        sent = await insertMessages(conn, request.app.state.enforcer, user, role, [data])
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    payload = await encryptForUser(sent[0], user.email, conn, request.app)
+    return payload
+
+
+@app.post("/send-messages")
+async def sendMessages(
+        request: Request,
+        data: dict = Depends(decryptPayload()),
+        conn: Connection = Depends(get_conn),
+        user: SimpleUser = Depends(getCurrentUser)
+):
+    # Bulk variant for clients flushing an offline queue. Each entry may carry
+    # its own "id" so a replayed batch is a no-op for already stored messages.
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    messages = data.get("messages") or []
+    if not messages or len(messages) > MAX_MESSAGE_BATCH:
         raise HTTPException(status_code=400, detail="invalid params")
     roles = await request.app.state.enforcer.get_roles_for_user_in_domain(user.email, "*")
     role = roles[0] if roles else ""
     try:
-        msg_id = await conn.fetchval(
-            "INSERT INTO message (project_id, sender_id, content, sender_role, has_mentions) VALUES ($1,$2,$3,$4,$5) RETURNING id",
-            UUID(project_id), user.id, content, role, bool(mention_emails)
-        )
-        created_at = await conn.fetchval(
-            "SELECT created_at FROM message WHERE id=$1", msg_id
-        )
-        for e in mention_emails:
-            await conn.execute(
-                "INSERT INTO message_mention (message_id, user_email) VALUES ($1,$2) ON CONFLICT DO NOTHING",
-                msg_id, e
-            )
+        sent = await insertMessages(conn, request.app.state.enforcer, user, role, messages)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    payload = {"messageId": str(msg_id), "created_at": created_at.isoformat()}
-    if user:
-        payload = await encryptForUser(payload, user.email, conn, request.app)
+    payload = {"messages": sent}
+    payload = await encryptForUser(payload, user.email, conn, request.app)
     return payload
 
 
+# Notifications are read from the caller's inbox (notification_inbox, filled by
+# a fan-out trigger), so a page costs O(size) regardless of the global table
+MAX_MARK_READ = 500
+NOTIFICATION_MAX_PAGE_SIZE = 100
+
+
+async def unreadNotifications(conn: Connection, userId: UUID) -> int:
+    unread = await conn.fetchval("SELECT unread FROM notification_unread WHERE user_id = $1", userId)
+    return int(unread or 0)
+
+
 @app.post("/get-notifications")
 async def getNotifications(
         request: Request,
@@ -974,59 +1572,150 @@ async def getNotifications(
         conn: Connection = Depends(get_conn),
         user: SimpleUser = Depends(getCurrentUser)
 ):
-    last_seen_created_at = data.get("last_seen_created_at")
-    last_seen_id = data.get("last_seen_id")
-    size = data.get("size", 10)
-
-    if last_seen_created_at:
-        try:
-            dt = datetime.fromisoformat(last_seen_created_at)
-            cursor_ts = dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
-        except ValueError:
-            raise HTTPException(400, detail=f"Invalid timestamp: '{last_seen_created_at}'")
-    else:
-        cursor_ts = datetime.now(timezone.utc)
-
-    max_uuid = UUID("ffffffff-ffff-ffff-ffff-ffffffffffff")
-    cursor_id = last_seen_id or max_uuid
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    try:
+        size = min(int(data.get("size") or 10), NOTIFICATION_MAX_PAGE_SIZE)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="size must be a number")
+    if size <= 0:
+        raise HTTPException(status_code=400, detail="size must be positive")
+    cursor = readCursor(data, "notification")
 
-    sql = """
-    SELECT
-      n.*,
-      COUNT(*) OVER() AS total_count
-    FROM notification n
-    WHERE (n.created_at, n.id) < ($1::timestamptz, $2::uuid)
-    ORDER BY n.created_at DESC, n.id DESC
-    LIMIT $3;
-    """
+    where = ["i.user_id = $1"]
+    if data.get("unread_only"):
+        where.append("i.read_at IS NULL")
 
     try:
-        rows = await conn.fetch(sql, cursor_ts, cursor_id, size)
+        page = await fetchPage(
+            conn, cursor, Keyset("notification_inbox", "i", idColumn="notification_id"),
+            scope="notification",
+            select="n.*, i.read_at, i.read_at IS NULL AS unread",
+            source="notification_inbox i JOIN notification n ON n.id = i.notification_id",
+            size=size,
+            where=where,
+            args=[user.id],
+        )
+        total = await countRows(conn, COUNT_STRATEGIES["/get-notifications"], "notification_inbox")
+        unread = await unreadNotifications(conn, user.id)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(500, detail=str(e))
 
-    total = rows[0]["total_count"] if rows else 0
-
-    if rows:
-        last = rows[-1]
-        next_ts = last["created_at"].isoformat()
-        next_id = str(last["id"])
-    else:
-        next_ts = None
-        next_id = None
-
     payload = {
-        "notifications": [dict(r) for r in rows],
+        "notifications": page.rows,
         "total_count": total,
+        "unread_count": unread,
         "page_size": size,
-        "last_seen_created_at": next_ts,
-        "last_seen_id": next_id,
+        **page.meta(),
     }
-    if user:
-        payload = await encryptForUser(payload, user.email, conn, request.app)
+    payload = await encryptForUser(payload, user.email, conn, request.app)
     return payload
 
 
+@app.post("/mark-notifications-read")
+async def markNotificationsRead(
+        request: Request,
+        data: dict = Depends(decryptPayload()),
+        conn: Connection = Depends(get_conn),
+        user: SimpleUser = Depends(getCurrentUser)
+):
+    # {"ids": [...]} marks those notifications, {"all": true} the whole inbox.
+    # {"unread": true} flips them back to unread.
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    markAll = bool(data.get("all"))
+    ids = data.get("ids") or []
+    if not markAll and not ids:
+        raise HTTPException(status_code=400, detail="ids or all required")
+    if len(ids) > MAX_MARK_READ:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_MARK_READ} ids per request")
+    try:
+        ids = [UUID(str(i)) for i in ids]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid notification id")
+
+    readAt = None if data.get("unread") else datetime.now(timezone.utc)
+    try:
+        result = await conn.execute(
+            """
+            UPDATE notification_inbox
+               SET read_at = $2
+             WHERE user_id = $1
+               AND ($3 OR notification_id = ANY($4::uuid[]))
+               AND (read_at IS NULL) = ($2::timestamptz IS NOT NULL);
+            """,
+            user.id, readAt, markAll, ids,
+        )
+        unread = await unreadNotifications(conn, user.id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    payload = {"updated": int(result.split()[-1]), "unread_count": unread}
+    payload = await encryptForUser(payload, user.email, conn, request.app)
+    return payload
+
+
+@app.get("/event-stream")
+async def eventStream(
+        request: Request,
+        projectId: Optional[str] = Query(None, alias="project_id"),
+        topics: str = Query(",".join(TOPICS)),
+        conn: Connection = Depends(get_conn),
+        user: SimpleUser = Depends(getCurrentUser)
+):
+    # Server-sent events: "message" for new chat messages in projects the user
+    # can access (or only project_id), "notification" for the user's inbox,
+    # "resync" when the client missed events and should refetch. Every data
+    # field is encrypted for the user like a regular response.
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    wanted = {t.strip() for t in topics.split(",") if t.strip()}
+    if not wanted or not wanted <= set(TOPICS):
+        raise HTTPException(status_code=400, detail=f"topics must be a subset of {', '.join(TOPICS)}")
+    clientIds = await authorizedClientIds(conn, request.app.state.enforcer, user)
+
+    if projectId:
+        if not await isUUIDv4(projectId):
+            raise HTTPException(status_code=400, detail=f"Invalid UUIDv4 (must be lowercase-hyphenated): {projectId}")
+        projectId = UUID(projectId)
+        clientId = await conn.fetchval("SELECT client_id FROM project WHERE id=$1 AND is_deleted=FALSE", projectId)
+        if not clientId or (clientIds is not None and clientId not in clientIds):
+            raise HTTPException(status_code=404, detail="Project not found")
+
+    key = await conn.fetchval(
+        "SELECT public_key FROM user_key WHERE user_email=$1 AND purpose='sig'",
+        user.email,
+    )
+    if key:
+        aes = clientCipher(key, request.app)
+        seal = lambda data: sealForClient(data, aes)
+    else:
+        seal = lambda data: data
+
+    # The stream may stay open for hours, it must not keep a pool slot
+    await conn.release()
+
+    hub = request.app.state.events
+    sub = Subscriber(user.id, wanted, clientIds, projectId, seal)
+    hub.subscribe(sub)
+
+    async def frames():
+        try:
+            yield "retry: 5000\n\n"
+            async for f in sub.frames():
+                yield f
+        finally:
+            hub.unsubscribe(sub)
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.post("/get-profile-details")
 async def getProfileDetails(
         request: Request,
@@ -1059,18 +1748,7 @@ async def getProfileDetails(
     return payload
 
 
-@app.post("/project-assessments")
-async def getProjectAssessments(
-        request: Request,
-        data: dict = Depends(decryptPayload()),
-        conn: Connection = Depends(get_conn),
-        user: SimpleUser = Depends(getCurrentUser)
-):
-    projectId = data['projectId']
-    if not await isUUIDv4(projectId):
-        raise HTTPException(status_code=400, detail="Invalid project id")
-
-    sql = """
+PROJECT_ASSESSMENTS_SQL = """
     SELECT
       p.id                     AS project_id,
       p.visit_notes,
@@ -1078,14 +1756,28 @@ async def getProjectAssessments(
       p.material_parts_needed
     FROM project p
     WHERE p.id          = $1
-    """
+"""
 
-    rec = await conn.fetchrow(sql, UUID(projectId))
 
+async def projectAssessments(conn: Connection, projectId: UUID) -> dict:
+    rec = await conn.fetchrow(PROJECT_ASSESSMENTS_SQL, projectId)
     if not rec:
         raise HTTPException(status_code=404, detail="Not found")
+    return dict(rec)
+
 
-    payload = dict(rec)
+@app.post("/project-assessments")
+async def getProjectAssessments(
+        request: Request,
+        data: dict = Depends(decryptPayload()),
+        conn: Connection = Depends(get_conn),
+        user: SimpleUser = Depends(getCurrentUser)
+):
+    projectId = data['projectId']
+    if not await isUUIDv4(projectId):
+        raise HTTPException(status_code=400, detail="Invalid project id")
+
+    payload = await projectAssessments(conn, UUID(projectId))
 
     if user:
         payload = await encryptForUser(payload, user.email, conn, request.app)
@@ -1103,18 +1795,82 @@ async def getDashboardMetrics(
         data: dict = Depends(decryptPayload()),
         conn: Connection = Depends(get_conn),
         user: SimpleUser = Depends(getCurrentUser)):
-    sql = "SELECT * FROM overall_aggregates;"
+    # dashboard_rollup is sharded, see DASHBOARD_ROLLUP in DbManager.py
+    sql = """
+        SELECT COALESCE(SUM(total_invoiced), 0)  AS total_invoiced,
+               COALESCE(SUM(total_collected), 0) AS total_collected,
+               COALESCE(SUM(total_projects), 0)  AS total_projects,
+               COALESCE(SUM(open_projects), 0)   AS open_projects
+          FROM dashboard_rollup;
+    """
+
+    async def load(c: Connection) -> dict:
+        rows = await c.fetch(sql)
+        return {"metrics": [dict(r) for r in rows]}
 
     try:
-        rows = await conn.fetch(sql)
+        payload = await cachedResponse(request, "/get-dashboard-metrics", {}, conn, user, load)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    payload = {"metrics": [dict(r) for r in rows]}
     if user:
         payload = await encryptForUser(payload, user.email, conn, request.app)
     return payload
 
 
+# Each month's events are cached in Redis under the month's version from
+# calendar_month_version, which project triggers bump (see CALENDAR_MONTH_VERSION
+# in DbManager.py). A bumped month simply misses and the old list expires.
+# Versions and events are read in one snapshot, which also keeps these reads out
+# of single-flight: a query that started before a write must not fill the
+# cache under the version that write bumped.
+CALENDAR_CACHE_TTL = 3600
+MAX_CALENDAR_MONTHS = 12
+
+CALENDAR_EVENTS_SQL = """
+    SELECT p.id,
+           p.business_name,
+           p.scope_of_work,
+           p.address,
+           p.city,
+           p.scheduled_date,
+           p.due_date,
+           COALESCE(p.scheduled_date, p.due_date) AS event_date
+      FROM project p
+     WHERE p.is_deleted = FALSE
+       AND COALESCE(p.scheduled_date, p.due_date) >= $1
+       AND COALESCE(p.scheduled_date, p.due_date) <  $2
+     ORDER BY event_date, p.id;
+"""
+
+
+def calendarCacheKey(month: date, version: int) -> str:
+    return f"calendar_events:{month:%Y-%m}:{version}"
+
+
+def addMonths(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def calendarRange(data: dict) -> tuple[date, date]:
+    # Either an explicit [start, end] date range or a year + month. A bare month
+    # (older dashboards) means that month of the current year.
+    try:
+        if data.get("start") or data.get("end"):
+            start = date.fromisoformat(data["start"])
+            end = date.fromisoformat(data["end"])
+        else:
+            year = int(data.get("year") or date.today().year)
+            month = int(data["month"])
+            start = date(year, month, 1)
+            end = addMonths(start, 1) - timedelta(days=1)
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="start and end dates or year and month required")
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    return start, end
+
+
 @app.post("/get-calendar-events")
 async def getCalendarEvents(
         request: Request,
@@ -1122,36 +1878,53 @@ async def getCalendarEvents(
         conn: Connection = Depends(get_conn),
         user: SimpleUser = Depends(getCurrentUser)
 ):
-    month = data["month"]
-
-    if month < 1 or month > 12:
-        raise Exception()
-
-    sql = """
-        SELECT
-          p.*,
-          COALESCE(p.scheduled_date, p.due_date) AS event_date
-        FROM project p
-        WHERE  (
-            (p.scheduled_date IS NOT NULL AND EXTRACT(MONTH FROM p.scheduled_date) = $1)
-            OR
-            (p.scheduled_date IS NULL     AND EXTRACT(MONTH FROM p.due_date)       = $1)
-          )
-        ORDER BY event_date, p.id;
-    """
+    start, end = calendarRange(data)
+    months = []
+    month = start.replace(day=1)
+    while month <= end:
+        months.append(month)
+        month = addMonths(month, 1)
+    if len(months) > MAX_CALENDAR_MONTHS:
+        raise HTTPException(status_code=400, detail=f"Range may span at most {MAX_CALENDAR_MONTHS} months")
 
+    redis = request.app.state.redis
     try:
-        records = await conn.fetch(sql, month)
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            versions = dict(await conn.fetch(
+                "SELECT month, version FROM calendar_month_version WHERE month = ANY($1::date[])",
+                months,
+            ))
+            keys = [calendarCacheKey(m, versions.get(m, 0)) for m in months]
+            cached = dict(zip(months, await redis.mget(keys)))
+
+            missing = [m for m in months if cached[m] is None]
+            records = await conn.fetch(
+                CALENDAR_EVENTS_SQL, missing[0], addMonths(missing[-1], 1)
+            ) if missing else []
+        if missing:
+            byMonth = {m: [] for m in missing}
+            for r in records:
+                d = dict(r)
+                bucket = byMonth.get(d["event_date"].replace(day=1))
+                if bucket is None:
+                    continue
+                d["id"] = str(d["id"])
+                for k in ("scheduled_date", "due_date", "event_date"):
+                    d[k] = d[k].isoformat() if d[k] else None
+                bucket.append(d)
+            async with redis.pipeline(transaction=False) as pipe:
+                for m in missing:
+                    cached[m] = json.dumps(byMonth[m])
+                    pipe.set(calendarCacheKey(m, versions.get(m, 0)), cached[m], ex=CALENDAR_CACHE_TTL)
+                await pipe.execute()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-    # If you want to serialize `event_date` as ISO strings, convert each row to dict
-    events = []
-    for r in records:
-        d = dict(r)
-        # asyncpg returns dates as datetime.date, so cast to ISO string:
-        d["event_date"] = d["event_date"].isoformat()
-        events.append(d)
+    first, last = start.isoformat(), end.isoformat()
+    events = [
+        e for m in months for e in json.loads(cached[m])
+        if first <= e["event_date"] <= last
+    ]
 
     payload = {"events": events}
     if user:
@@ -1172,66 +1945,55 @@ async def getProjects(
         user: SimpleUser = Depends(getCurrentUser)
 ):
     size = data.get("size")
-    last_seen_created_at = data.get("last_seen_created_at")
-    last_seen_id = data.get("last_seen_id")
     if not size:
         raise HTTPException(status_code=400, detail="size required")
-    # 1) parse the timestamp (or default to now)
-    if last_seen_created_at:
-        try:
-            dt = datetime.fromisoformat(last_seen_created_at)
-            cursor_ts = dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
-        except ValueError:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid timestamp: '{last_seen_created_at}'"
+    cursor = readCursor(data, "project")
+
+    scopes = [("project", scopeKey()), ("client", scopeKey()), ("lookup", scopeKey())]
+
+    async def load(c: Connection) -> dict:
+        # The tag is read in the same snapshot as the rows, so a cached body
+        # always carries the tag it was built from
+        async with c.transaction(isolation="repeatable_read", readonly=True):
+            tag = await listTag(c, scopes, data)
+            page = await fetchPage(
+                c, cursor, Keyset("project", "p"),
+                scope="project",
+                select="""
+                  p.*,
+                  c.company_name,
+                  s.value AS status_value
+                """,
+                source="""
+                project p
+                JOIN client  c ON c.id = p.client_id
+                JOIN status  s ON s.id = p.status_id AND s.category = 'project'
+                """,
+                where=["p.is_deleted = FALSE"],
+                size=size,
             )
-    else:
-        cursor_ts = datetime.now(timezone.utc)
-
-    # 2) default the ID cursor to the MAX‐UUID when not provided
-    max_uuid = UUID("ffffffff-ffff-ffff-ffff-ffffffffffff")
-    cursor_id = last_seen_id or max_uuid
-
-    # 3) tuple‐comparison + tie‐break by id
-    sql = """
-    SELECT
-      p.*,
-      c.company_name,
-      s.value AS status_value,
-      COUNT(*) OVER() AS total_count
-    FROM project p
-    JOIN client  c ON c.id = p.client_id
-    JOIN status  s ON s.id = p.status_id AND s.category = 'project'
-      (p.created_at, p.id) < ($1::timestamptz, $2::uuid)
-      
-    ORDER BY p.created_at DESC, p.id DESC
-    LIMIT $3;
-    """
+            total = await countRows(c, COUNT_STRATEGIES["/get-projects"], "project")
+        return {
+            "projects": page.rows,
+            "total_count": total,
+            "page_size": size,
+            **page.meta(),
+            "etag": tag,
+        }
 
     try:
-        rows = await conn.fetch(sql, cursor_ts, cursor_id, size)
+        tag = await listTag(conn, scopes, data)
+        if notModified(data, tag):
+            return notModifiedResponse(tag)
+        if cursor:
+            payload = await load(conn)
+        else:
+            payload = await cachedResponse(request, "/get-projects", {"size": size}, conn, user, load)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-    total = rows[0]["total_count"] if rows else 0
-
-    # Build the next‐page cursors from the last row
-    if rows:
-        last = rows[-1]
-        next_ts = last["created_at"].isoformat()
-        next_id = str(last["id"])
-    else:
-        next_ts = None
-        next_id = None
-
-    payload = {
-        "projects": [dict(r) for r in rows],
-        "total_count": total,
-        "page_size": size,
-        "last_seen_created_at": next_ts,
-        "last_seen_id": next_id,
-    }
     if user:
         payload = await encryptForUser(payload, user.email, conn, request.app)
     return payload
@@ -1567,6 +2329,8 @@ async def createNewProject(
             assigneeId,
         )
 
+    await invalidateCached(*PROJECT_WRITE_ROUTES)
+
     payloadRes = {"projectId": projectId}
     if user:
         payloadRes = await encryptForUser(payloadRes, user.email, conn, request.app)
@@ -1576,8 +2340,112 @@ async def createNewProject(
 ################################################################################
 # TODO:                        PROJECT VIEW ENDPOINTS                          #
 ################################################################################
-@app.post("/get-project")
-async def getProject(
+PROJECT_SQL = """
+    SELECT
+      p.id,
+      p.po_number,
+
+      -- The “client” for a project is actually stored as a user → then join client:
+      p.client_id                            AS client_user_id,
+      cu.first_name || ' ' || cu.last_name   AS client_user_name,
+      cut.name                               AS client_user_type,
+      c.id                                    AS client_id,
+      c.company_name                          AS client_company_name,
+
+      p.business_name,
+      p.date_received,
+
+      p.priority_id,
+      pp.value        AS priority_value,
+      pp.color        AS priority_color,
+
+      p.type_id,
+      pt.value        AS type_value,
+
+      p.address,
+      p.address_line1,
+      p.address_line2,
+      p.city,
+
+      p.state_id,
+      st.name         AS state_name,
+
+      p.zip_code,
+
+      p.trade_id,
+      tr.value        AS trade_value,
+      tr.color        AS trade_color,
+
+      p.status_id,
+      s.value         AS status_value,
+      s.color         AS status_color,
+
+      p.nte,
+      p.due_date,
+
+      p.scope_of_work,
+      p.special_notes,
+      p.visit_notes,
+      p.planned_resolution,
+      p.material_parts_needed,
+
+      p.assignee_id,
+      au.first_name || ' ' || au.last_name AS assignee_name,
+
+      p.created_at,
+      p.updated_at,
+      p.is_deleted
+    FROM project p
+
+      JOIN "user" cu
+        ON cu.id = p.client_id
+       
+
+      LEFT JOIN client c
+        ON c.id = cu.client_id
+       
+       AND cut.name = 'client'
+
+      JOIN project_priority pp
+        ON pp.id = p.priority_id
+       
+
+      JOIN project_type pt
+        ON pt.id = p.type_id
+       
+
+      JOIN state st
+        ON st.id = p.state_id
+       
+
+      JOIN project_trade tr
+        ON tr.id = p.trade_id
+       
+
+      JOIN status s
+        ON s.id = p.status_id
+       AND s.category = 'project'
+       
+
+      JOIN "user" au
+        ON au.id = p.assignee_id
+      WHERE p.id = $1
+"""
+
+
+async def projectDetails(conn: Connection, enforcer: AsyncEnforcer, email: str, projectId: UUID) -> dict:
+    row = await conn.fetchrow(PROJECT_SQL, projectId)
+    if not row:
+        raise HTTPException(status_code=404, detail="Project not found")
+    project = dict(row)
+    roles = await enforcer.get_roles_for_user_in_domain(email, "*")
+    if "client_technician" in roles:
+        project.pop("nte", None)
+    return project
+
+
+@app.post("/get-project")
+async def getProject(
         request: Request,
         data: dict = Depends(decryptPayload()),
         conn: Connection = Depends(get_conn),
@@ -1587,113 +2455,58 @@ async def getProject(
     project_id = data.get("projectId")
     if not project_id:
         raise HTTPException(status_code=400, detail="projectId required")
-    sql = """
-        SELECT
-          p.id,
-          p.po_number,
-
-          -- The “client” for a project is actually stored as a user → then join client:
-          p.client_id                            AS client_user_id,
-          cu.first_name || ' ' || cu.last_name   AS client_user_name,
-          cut.name                               AS client_user_type,
-          c.id                                    AS client_id,
-          c.company_name                          AS client_company_name,
-
-          p.business_name,
-          p.date_received,
-
-          p.priority_id,
-          pp.value        AS priority_value,
-          pp.color        AS priority_color,
-
-          p.type_id,
-          pt.value        AS type_value,
-
-          p.address,
-          p.address_line1,
-          p.address_line2,
-          p.city,
-
-          p.state_id,
-          st.name         AS state_name,
-
-          p.zip_code,
-
-          p.trade_id,
-          tr.value        AS trade_value,
-          tr.color        AS trade_color,
-
-          p.status_id,
-          s.value         AS status_value,
-          s.color         AS status_color,
-
-          p.nte,
-          p.due_date,
-
-          p.scope_of_work,
-          p.special_notes,
-          p.visit_notes,
-          p.planned_resolution,
-          p.material_parts_needed,
-
-          p.assignee_id,
-          au.first_name || ' ' || au.last_name AS assignee_name,
-
-          p.created_at,
-          p.updated_at,
-          p.is_deleted
-        FROM project p
-
-          JOIN "user" cu
-            ON cu.id = p.client_id
-           
-
-          LEFT JOIN client c
-            ON c.id = cu.client_id
-           
-           AND cut.name = 'client'
-
-          JOIN project_priority pp
-            ON pp.id = p.priority_id
-           
-
-          JOIN project_type pt
-            ON pt.id = p.type_id
-           
-
-          JOIN state st
-            ON st.id = p.state_id
-           
-
-          JOIN project_trade tr
-            ON tr.id = p.trade_id
-           
-
-          JOIN status s
-            ON s.id = p.status_id
-           AND s.category = 'project'
-           
-
-          JOIN "user" au
-            ON au.id = p.assignee_id
-          WHERE p.id = $1
-        """
     try:
-        row = await conn.fetchrow(sql, UUID(project_id))
+        # Technicians get nte masked, their tag must differ
+        masked = "client_technician" in await enforcer.get_roles_for_user_in_domain(user.email, "*")
+        tag = await detailTag(conn, "project", UUID(project_id), masked)
+        if notModified(data, tag):
+            return notModifiedResponse(tag)
+        project = await projectDetails(conn, enforcer, user.email, UUID(project_id))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-    project = dict(row)
-    roles = await enforcer.get_roles_for_user_in_domain(user.email, "*")
-    if "client_technician" in roles:
-        project.pop("nte", None)
-
-    payload = {"project": project}
+    payload = {"project": project, "etag": tag}
     if user:
         payload = await encryptForUser(payload, user.email, conn, request.app)
     return payload
 
 
+async def messagesPage(conn: Connection, projectId: UUID, size: int, cursor) -> dict:
+    page = await fetchPage(
+        conn, cursor, Keyset("message", "m"),
+        scope=f"message:{projectId}",
+        select="""
+          m.id,
+          m.created_at,
+          m.updated_at,
+          m.content,
+          m.sender_id,
+          m.sender_role,
+          u.email       AS sender_email,
+          u.first_name  AS sender_first_name,
+          u.last_name   AS sender_last_name,
+          m.mentions,
+          m.file_attachment_id
+        """,
+        # walks idx_message_project_cursor, one "user" probe per row
+        source='message m JOIN "user" u ON u.id = m.sender_id',
+        where=["m.project_id = $1", "m.is_deleted = FALSE"],
+        args=[projectId],
+        size=size,
+    )
+    total = await countRows(
+        conn, COUNT_STRATEGIES["/get-messages"], "message", "message_by_project", (projectId,)
+    )
+    return {
+        "messages": page.rows,
+        "total_count": total,
+        "page_size": size,
+        **page.meta(),
+    }
+
+
 @app.post("/get-messages")
 async def getMessages(
         request: Request,
@@ -1703,140 +2516,51 @@ async def getMessages(
 ):
     projectId = data.get("projectId")
     size = data.get("size")
-    last_seen_created_at = data.get("last_seen_created_at")
-    last_seen_id = data.get("last_seen_id")
     if not projectId or not size:
         raise HTTPException(status_code=400, detail="invalid params")
-    if last_seen_created_at:
-        try:
-            dt = datetime.fromisoformat(last_seen_created_at)
-            cursor_ts = dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
-        except ValueError:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid timestamp: '{last_seen_created_at}'"
-            )
-    else:
-        cursor_ts = datetime.now(timezone.utc)
-
-    max_uuid = UUID("ffffffff-ffff-ffff-ffff-ffffffffffff")
-    cursor_id = last_seen_id or max_uuid
-
-    sql = """
-            SELECT
-              m.id,
-              m.created_at,
-              m.updated_at,
-              m.content,
-              m.sender_id,
-              m.sender_role,
-              u.email       AS sender_email,
-              u.first_name  AS sender_first_name,
-              u.last_name   AS sender_last_name,
-              array_remove(array_agg(mm.user_email), NULL) AS mentions,
-              m.file_attachment_id,
-              COUNT(*) OVER() AS total_count
-            FROM message m
-            JOIN project p ON p.id = m.project_id
-            JOIN "user" u ON u.id = m.sender_id
-            LEFT JOIN message_mention mm ON mm.message_id = m.id
-            WHERE  m.project_id = $1
-              AND (m.created_at, m.id) < ($2::timestamptz, $3::uuid)
-            GROUP BY m.id, u.email, u.first_name, u.last_name
-            ORDER BY m.created_at DESC, m.id DESC
-            LIMIT $4;
-        """
+    cursor = readCursor(data, f"message:{projectId}")
 
     try:
-        rows = await conn.fetch(sql, projectId, cursor_ts, cursor_id, size)
+        tag = await listTag(conn, [("message_by_project", scopeKey(projectId))], data)
+        if notModified(data, tag):
+            return notModifiedResponse(tag)
+        payload = await messagesPage(conn, UUID(projectId), size, cursor)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    payload["etag"] = tag
 
-    total = rows[0]["total_count"] if rows else 0
-
-    if rows:
-        last = rows[-1]
-        next_ts = last["created_at"].isoformat()
-        next_id = str(last["id"])
-    else:
-        next_ts = None
-        next_id = None
-
-    payload = {
-        "messages": [dict(r) for r in rows],
-        "total_count": total,
-        "page_size": size,
-        "last_seen_created_at": next_ts,
-        "last_seen_id": next_id,
-    }
     if user:
         payload = await encryptForUser(payload, user.email, conn, request.app)
     return payload
 
 
-@app.post("/fetch-project-quotes")
-async def fetchProjectQuotesEndpoint(
-        request: Request,
-        data: dict = Depends(decryptPayload()),
-        conn: Connection = Depends(get_conn),
-        user: SimpleUser = Depends(getCurrentUser)
-):
-    project_id = data.get("project_id")
-    size = data.get("size")
-    last_seen_created_at = data.get("last_seen_created_at")
-    last_seen_id = data.get("last_seen_id")
-    if not project_id or not size:
-        raise HTTPException(status_code=400, detail="invalid params")
-    if last_seen_created_at:
-        try:
-            dt = datetime.fromisoformat(last_seen_created_at)
-            cursor_ts = dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
-        except ValueError:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid timestamp: '{last_seen_created_at}'"
-            )
-    else:
-        cursor_ts = datetime.now(timezone.utc)
-
-    max_uuid = UUID("ffffffff-ffff-ffff-ffff-ffffffffffff")
-    cursor_id = last_seen_id or max_uuid
-
-    sql = """
-        SELECT
+async def projectQuotesPage(conn: Connection, projectId: UUID, size: int, cursor) -> dict:
+    page = await fetchPage(
+        conn, cursor, Keyset("quote", "q"),
+        scope=f"quote:{projectId}",
+        select="""
           q.id                 AS quote_id,
           q.number             AS number,
           q.created_at         AS date_created,
           q.amount             AS amount,
-          s.value              AS status_value,
-          COUNT(*) OVER()      AS total_count
-        FROM quote q
+          s.value              AS status_value
+        """,
+        source="""
+        quote q
         JOIN status s
           ON s.id = q.status_id
          AND s.category = 'quote'
-         
-          q.project_id = $1
-          
-          AND (q.created_at, q.id) < ($2::timestamptz, $3::uuid)
-        ORDER BY q.created_at DESC, q.id DESC
-        LIMIT $4;
-        """
-
-    try:
-        rows = await conn.fetch(sql, project_id, cursor_ts, cursor_id, size)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    total = rows[0]["total_count"] if rows else 0
-
-    if rows:
-        last = rows[-1]
-        next_ts = last["created_at"].isoformat()
-        next_id = str(last["id"])
-    else:
-        next_ts = None
-        next_id = None
-
-    payload = {
+        """,
+        where=["q.project_id = $1", "q.is_deleted = FALSE"],
+        args=[projectId],
+        size=size,
+    )
+    total = await countRows(
+        conn, COUNT_STRATEGIES["/fetch-project-quotes"], "quote", "quote_by_project", (projectId,)
+    )
+    return {
         "quotes": [
             {
                 "quote_id": r["quote_id"],
@@ -1845,20 +2569,16 @@ async def fetchProjectQuotesEndpoint(
                 "amount": r["amount"],
                 "status": r["status_value"]
             }
-            for r in rows
+            for r in page.rows
         ],
         "total_count": total,
         "page_size": size,
-        "last_seen_created_at": next_ts,
-        "last_seen_id": next_id,
+        **page.meta(),
     }
-    if user:
-        payload = await encryptForUser(payload, user.email, conn, request.app)
-    return payload
 
 
-@app.post("/fetch-project-documents")
-async def fetchProjectDocumentsEndpoint(
+@app.post("/fetch-project-quotes")
+async def fetchProjectQuotesEndpoint(
         request: Request,
         data: dict = Depends(decryptPayload()),
         conn: Connection = Depends(get_conn),
@@ -1866,56 +2586,46 @@ async def fetchProjectDocumentsEndpoint(
 ):
     project_id = data.get("project_id")
     size = data.get("size")
-    last_seen_created_at = data.get("last_seen_created_at")
-    last_seen_id = data.get("last_seen_id")
     if not project_id or not size:
         raise HTTPException(status_code=400, detail="invalid params")
-    if last_seen_created_at:
-        try:
-            dt = datetime.fromisoformat(last_seen_created_at)
-            cursor_ts = dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
-        except ValueError:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid timestamp: '{last_seen_created_at}'"
-            )
-    else:
-        cursor_ts = datetime.now(timezone.utc)
-
-    max_uuid = UUID("ffffffff-ffff-ffff-ffff-ffffffffffff")
-    cursor_id = last_seen_id or max_uuid
-
-    sql = """
-        SELECT
-          d.id                  AS document_id,
-          d.file_name           AS file_name,
-          d.file_extension      AS type,
-          d.document_type       AS document_type,
-          d.created_at          AS date_uploaded,
-          COUNT(*) OVER()       AS total_count
-        FROM document d
-          d.project_id = $1
-          
-          AND (d.created_at, d.id) < ($2::timestamptz, $3::uuid)
-        ORDER BY d.created_at DESC, d.id DESC
-        LIMIT $4;
-        """
+    cursor = readCursor(data, f"quote:{project_id}")
 
     try:
-        rows = await conn.fetch(sql, project_id, cursor_ts, cursor_id, size)
+        tag = await listTag(conn, [("quote_by_project", scopeKey(project_id)), ("lookup", scopeKey())], data)
+        if notModified(data, tag):
+            return notModifiedResponse(tag)
+        payload = await projectQuotesPage(conn, UUID(project_id), size, cursor)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    total = rows[0]["total_count"] if rows else 0
+    payload["etag"] = tag
 
-    if rows:
-        last = rows[-1]
-        next_ts = last["created_at"].isoformat()
-        next_id = str(last["id"])
-    else:
-        next_ts = None
-        next_id = None
+    if user:
+        payload = await encryptForUser(payload, user.email, conn, request.app)
+    return payload
 
-    payload = {
+
+async def projectDocumentsPage(conn: Connection, projectId: UUID, size: int, cursor) -> dict:
+    page = await fetchPage(
+        conn, cursor, Keyset("document", "d"),
+        scope=f"document:{projectId}",
+        select="""
+          d.id                  AS document_id,
+          d.file_name           AS file_name,
+          d.file_extension      AS type,
+          d.document_type       AS document_type,
+          d.created_at          AS date_uploaded
+        """,
+        source="document d",
+        where=["d.project_id = $1", "d.is_deleted = FALSE"],
+        args=[projectId],
+        size=size,
+    )
+    total = await countRows(
+        conn, COUNT_STRATEGIES["/fetch-project-documents"], "document", "document_by_project", (projectId,)
+    )
+    return {
         "documents": [
             {
                 "document_id": r["document_id"],
@@ -1924,18 +2634,103 @@ async def fetchProjectDocumentsEndpoint(
                 "document_type": r["document_type"],
                 "date_uploaded": r["date_uploaded"]
             }
-            for r in rows
+            for r in page.rows
         ],
         "total_count": total,
         "page_size": size,
-        "last_seen_created_at": next_ts,
-        "last_seen_id": next_id,
+        **page.meta(),
     }
+
+
+@app.post("/fetch-project-documents")
+async def fetchProjectDocumentsEndpoint(
+        request: Request,
+        data: dict = Depends(decryptPayload()),
+        conn: Connection = Depends(get_conn),
+        user: SimpleUser = Depends(getCurrentUser)
+):
+    project_id = data.get("project_id")
+    size = data.get("size")
+    if not project_id or not size:
+        raise HTTPException(status_code=400, detail="invalid params")
+    cursor = readCursor(data, f"document:{project_id}")
+
+    try:
+        tag = await listTag(conn, [("document_by_project", scopeKey(project_id))], data)
+        if notModified(data, tag):
+            return notModifiedResponse(tag)
+        payload = await projectDocumentsPage(conn, UUID(project_id), size, cursor)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    payload["etag"] = tag
+
     if user:
         payload = await encryptForUser(payload, user.email, conn, request.app)
     return payload
 
 
+PROJECT_VIEW_PAGE_SIZE = 20
+PROJECT_VIEW_MAX_PAGE_SIZE = 100
+PROJECT_VIEW_SOURCES = {
+    "project": "/get-project",
+    "messages": "/get-messages",
+    "quotes": "/fetch-project-quotes",
+    "documents": "/fetch-project-documents",
+    "assessments": "/project-assessments",
+}
+PROJECT_VIEW_MAX_CONNECTIONS = 3  # pooled connections one /get-project-view may hold at once
+
+
+@app.post("/get-project-view")
+async def getProjectView(
+        request: Request,
+        data: dict = Depends(decryptPayload()),
+        conn: Connection = Depends(get_conn),
+        user: SimpleUser = Depends(getCurrentUser),
+        enforcer: AsyncEnforcer = Depends(getEnforcer)
+):
+    # Everything the project page loads on open, in one round trip: the same
+    # queries as /get-project, /get-messages, /fetch-project-quotes,
+    # /fetch-project-documents and /project-assessments (first pages only), run
+    # side by side. Paging further goes through those endpoints.
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    projectId = data.get("projectId")
+    if not projectId or not await isUUIDv4(projectId):
+        raise HTTPException(status_code=400, detail="Invalid project id")
+    projectId = UUID(projectId)
+    try:
+        size = min(int(data.get("size") or PROJECT_VIEW_PAGE_SIZE), PROJECT_VIEW_MAX_PAGE_SIZE)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="size must be a number")
+    if size <= 0:
+        raise HTTPException(status_code=400, detail="size must be positive")
+
+    parts = {
+        "project": lambda c: projectDetails(c, enforcer, user.email, projectId),
+        "messages": lambda c: messagesPage(c, projectId, size, None),
+        "quotes": lambda c: projectQuotesPage(c, projectId, size, None),
+        "documents": lambda c: projectDocumentsPage(c, projectId, size, None),
+        "assessments": lambda c: projectAssessments(c, projectId),
+    }
+    # A part is left out when the user may not call the endpoint it stands for
+    parts = {
+        name: part for name, part in parts.items()
+        if mayCall(enforcer, user, PROJECT_VIEW_SOURCES[name])
+    }
+    try:
+        payload = await fanOut(conn, parts, PROJECT_VIEW_MAX_CONNECTIONS)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    payload = await encryptForUser(payload, user.email, conn, request.app)
+    return payload
+
+
 ################################################################################
 # TODO:                         CLIENTS PAGE ENDPOINTS                         #
 ################################################################################
@@ -1953,74 +2748,100 @@ async def getClients(
             None,
             description="UUID cursor to break ties if multiple rows share the same timestamp"
         ),
+        sort: str = Query("created_at", description="Sort order: created_at or revenue"),
+        min_revenue: Optional[Decimal] = Query(None, description="Minimum collected revenue"),
+        max_revenue: Optional[Decimal] = Query(None, description="Maximum collected revenue"),
         conn: Connection = Depends(get_conn),
         user: SimpleUser = Depends(getCurrentUser)
 ):
     size = data.get("size", size)
-    last_seen_created_at = data.get("last_seen_created_at", last_seen_created_at)
-    last_seen_id = data.get("last_seen_id", last_seen_id)
-    if last_seen_created_at:
-        try:
-            dt = datetime.fromisoformat(last_seen_created_at)
-            cursor_ts = dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
-        except ValueError:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid timestamp: '{last_seen_created_at}'"
-            )
+    sort = data.get("sort", sort)
+    minRevenue = data.get("min_revenue", min_revenue)
+    maxRevenue = data.get("max_revenue", max_revenue)
+    if sort not in ("created_at", "revenue"):
+        raise HTTPException(status_code=400, detail=f"Invalid sort: '{sort}'")
+
+    # Revenue ordering walks idx_client_summary_revenue instead of the created_at index
+    if sort == "revenue":
+        keyset = Keyset("client_summary", "cs", tsColumn="total_collected", idColumn="client_id", tsType="numeric")
     else:
-        cursor_ts = datetime.now(timezone.utc)
-
-    max_uuid = UUID("ffffffff-ffff-ffff-ffff-ffffffffffff")
-    cursor_id = last_seen_id or max_uuid
+        keyset = Keyset("client", "c")
+    scope = f"client:{sort}:{minRevenue}:{maxRevenue}"
+    cursor = readCursor(
+        {"last_seen_created_at": last_seen_created_at, "last_seen_id": last_seen_id, **data}, scope
+    )
 
-    sql = """
-            SELECT
-              c.id,
-              c.company_name,
-              ct.value AS type_value,
-              c.status_id,
-              s.value AS status_value,
-              COALESCE(ca.total_collected, 0) AS total_revenue,
-              COUNT(*) OVER() AS total_count
-            FROM client c
-            JOIN status s
-              ON s.id = c.status_id
-             AND s.category = 'client'
-             
-            JOIN client_type ct
-              ON ct.id = c.type_id
-             
-            LEFT JOIN client_aggregates ca
-              ON ca.client_id = c.id
-            WHERE (c.created_at, c.id) < ($1::timestamptz, $2::uuid)
-              
-            ORDER BY c.created_at DESC, c.id DESC
-            LIMIT $3;
-        """
+    scopes = [("client", scopeKey()), ("lookup", scopeKey())]
+
+    async def load(c: Connection) -> dict:
+        # The tag is read in the same snapshot as the rows, so a cached body
+        # always carries the tag it was built from
+        async with c.transaction(isolation="repeatable_read", readonly=True):
+            tag = await listTag(c, scopes, {**data, **params})
+            page = await fetchPage(
+                c, cursor, keyset,
+                scope=scope,
+                select="""
+                  c.id,
+                  c.company_name,
+                  ct.value AS type_value,
+                  c.status_id,
+                  s.value AS status_value,
+                  cs.total_collected AS total_revenue,
+                  cs.total_invoiced,
+                  cs.total_projects,
+                  cs.open_projects
+                """,
+                source="""
+                client c
+                JOIN client_summary cs
+                  ON cs.client_id = c.id
+                JOIN status s
+                  ON s.id = c.status_id
+                 AND s.category = 'client'
+                JOIN client_type ct
+                  ON ct.id = c.type_id
+                """,
+                where=[
+                    "c.is_deleted = FALSE",
+                    "($1::numeric IS NULL OR cs.total_collected >= $1)",
+                    "($2::numeric IS NULL OR cs.total_collected <= $2)",
+                ],
+                args=[
+                    Decimal(str(minRevenue)) if minRevenue is not None else None,
+                    Decimal(str(maxRevenue)) if maxRevenue is not None else None,
+                ],
+                size=size,
+            )
+            total = await countRows(
+                c, HAS_MORE if minRevenue is not None or maxRevenue is not None else COUNT_STRATEGIES["/get-clients"],
+                "client"
+            )
+        return {
+            "clients": page.rows,
+            "total_count": total,
+            "page_size": size,
+            **page.meta(),
+            "etag": tag,
+        }
 
+    params = {
+        "size": size, "sort": sort, "min_revenue": minRevenue, "max_revenue": maxRevenue,
+        "last_seen_created_at": last_seen_created_at, "last_seen_id": last_seen_id,
+    }
     try:
-        rows = await conn.fetch(sql, cursor_ts, cursor_id, size)
+        tag = await listTag(conn, scopes, {**data, **params})
+        if notModified(data, tag):
+            return notModifiedResponse(tag)
+        if cursor:
+            payload = await load(conn)
+        else:
+            payload = await cachedResponse(request, "/get-clients", params, conn, user, load)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-    total = rows[0]["total_count"] if rows else 0
-
-    if rows:
-        last = rows[-1]
-        next_ts = last["created_at"].isoformat()
-        next_id = str(last["id"])
-    else:
-        next_ts = None
-        next_id = None
-
-    payload = {
-        "clients": [dict(r) for r in rows],
-        "total_count": total,
-        "page_size": size,
-        "last_seen_created_at": next_ts,
-        "last_seen_id": next_id,
-    }
     if user:
         payload = await encryptForUser(payload, user.email, conn, request.app)
     return payload
@@ -2178,6 +2999,8 @@ async def createNewClient(
                 amount,
             )
 
+    await invalidateCached(*CLIENT_WRITE_ROUTES)
+
     payload = {"clientId": clientId}
     if user:
         payload = await encryptForUser(payload, user.email, conn, request.app)
@@ -2207,14 +3030,22 @@ async def fetchClient(
           s.value  AS status_value,
           c.zip_code,
           c.updates,
-          c.special_notes
+          c.special_notes,
+          cs.total_invoiced,
+          cs.total_collected,
+          cs.total_projects,
+          cs.open_projects
         FROM client c
         JOIN state st ON st.id = c.state_id 
         JOIN status s ON s.id = c.status_id AND s.category = 'client' 
+        LEFT JOIN client_summary cs ON cs.client_id = c.id
         WHERE c.id = $1 ;
     """
 
     try:
+        tag = await detailTag(conn, "client", client_id)
+        if notModified(data, tag):
+            return notModifiedResponse(tag)
         row = await conn.fetchrow(sql, client_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -2222,7 +3053,7 @@ async def fetchClient(
     if not row:
         raise HTTPException(status_code=404, detail=f"Client {client_id} not found")
 
-    payload = {"client": dict(row)}
+    payload = {"client": dict(row), "etag": tag}
     if user:
         payload = await encryptForUser(payload, user.email, conn, request.app)
     return payload
@@ -2248,63 +3079,46 @@ async def fetchClientInvoices(
 ):
     size = data.get("size", size)
     q = data.get("q", q)
-    last_seen_created_at = data.get("last_seen_created_at", last_seen_created_at)
-    last_seen_id = data.get("last_seen_id", last_seen_id)
-    if last_seen_created_at:
-        try:
-            dt = datetime.fromisoformat(last_seen_created_at)
-            cursor_ts = dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
-        except ValueError:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid timestamp: '{last_seen_created_at}'"
-            )
-    else:
-        cursor_ts = datetime.now(timezone.utc)
-
-    max_uuid = UUID("ffffffff-ffff-ffff-ffff-ffffffffffff")
-    cursor_id = last_seen_id or max_uuid
-
-    sql = """
-        SELECT
-          i.id            AS invoice_id,
-          i.number        AS number,
-          i.created_at    AS date_created,
-          i.issuance_date AS issuance_date,
-          i.amount        AS amount,
-          s.value         AS status_value,
-          COUNT(*) OVER() AS total_count
-        FROM invoice i
-        JOIN status s ON s.id = i.status_id AND s.category = 'invoice' 
-          i.client_id = $1
-          
-          AND (i.created_at, i.id) < ($2::timestamptz, $3::uuid)
-          AND ($4::text IS NULL OR i.number::text ILIKE '%' || $4 || '%')
-        ORDER BY i.created_at DESC, i.id DESC
-        LIMIT $5;
-    """
+    scope = f"invoice:{client_id}:{q or ''}"
+    cursor = readCursor(
+        {"last_seen_created_at": last_seen_created_at, "last_seen_id": last_seen_id, **data}, scope
+    )
 
     try:
-        rows = await conn.fetch(sql, client_id, cursor_ts, cursor_id, q, size)
+        page = await fetchPage(
+            conn, cursor, Keyset("invoice", "i"),
+            scope=scope,
+            select="""
+              i.id            AS invoice_id,
+              i.number        AS number,
+              i.created_at    AS date_created,
+              i.issuance_date AS issuance_date,
+              i.amount        AS amount,
+              s.value         AS status_value
+            """,
+            source="invoice i JOIN status s ON s.id = i.status_id AND s.category = 'invoice'",
+            where=[
+                "i.client_id = $1",
+                "i.is_deleted = FALSE",
+                "($2::text IS NULL OR i.number::text ILIKE '%' || $2 || '%')",
+            ],
+            args=[UUID(client_id), q],
+            size=size,
+        )
+        total = await countRows(
+            conn, HAS_MORE if q else COUNT_STRATEGIES["/fetch-client-invoices"], "invoice", "invoice_by_client",
+            (UUID(client_id),)
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-    total = rows[0]["total_count"] if rows else 0
-
-    if rows:
-        last = rows[-1]
-        next_ts = last["created_at"].isoformat()
-        next_id = str(last["id"])
-    else:
-        next_ts = None
-        next_id = None
-
     payload = {
-        "invoices": [dict(r) for r in rows],
+        "invoices": page.rows,
         "total_count": total,
         "page_size": size,
-        "last_seen_created_at": next_ts,
-        "last_seen_id": next_id,
+        **page.meta(),
     }
     if user:
         payload = await encryptForUser(payload, user.email, conn, request.app)
@@ -2332,56 +3146,41 @@ async def fetchClientOnboardingDocuments(
     client_id = data.get("clientId") or client_id
     size = data.get("size", size)
     q = data.get("q", q)
-    last_seen_created_at = data.get("last_seen_created_at", last_seen_created_at)
-    last_seen_id = data.get("last_seen_id", last_seen_id)
-    if last_seen_created_at:
-        try:
-            dt = datetime.fromisoformat(last_seen_created_at)
-            cursor_ts = dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
-        except ValueError:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid timestamp: '{last_seen_created_at}'"
-            )
-    else:
-        cursor_ts = datetime.now(timezone.utc)
-
-    max_uuid = UUID("ffffffff-ffff-ffff-ffff-ffffffffffff")
-    cursor_id = last_seen_id or max_uuid
-
-    sql = """
-        SELECT
-          d.id             AS document_id,
-          d.file_name      AS file_name,
-          d.file_extension AS type,
-          d.document_type  AS document_type,
-          d.created_at     AS date_uploaded,
-          COUNT(*) OVER()  AS total_count
-        FROM document d
-          d.client_id = $1
-          AND d.purpose = 'onboarding_paperwork'
-          
-          AND (d.created_at, d.id) < ($2::timestamptz, $3::uuid)
-          AND ($4::text IS NULL OR d.file_name ILIKE '%' || $4 || '%')
-        ORDER BY d.created_at DESC, d.id DESC
-        LIMIT $5;
-    """
+    scope = f"document:{client_id}:onboarding_paperwork:{q or ''}"
+    cursor = readCursor(
+        {"last_seen_created_at": last_seen_created_at, "last_seen_id": last_seen_id, **data}, scope
+    )
 
     try:
-        rows = await conn.fetch(sql, client_id, cursor_ts, cursor_id, q, size)
+        page = await fetchPage(
+            conn, cursor, Keyset("document", "d"),
+            scope=scope,
+            select="""
+              d.id             AS document_id,
+              d.file_name      AS file_name,
+              d.file_extension AS type,
+              d.document_type  AS document_type,
+              d.created_at     AS date_uploaded
+            """,
+            source="document d",
+            where=[
+                "d.client_id = $1",
+                "d.purpose = 'onboarding_paperwork'",
+                "d.is_deleted = FALSE",
+                "($2::text IS NULL OR d.file_name ILIKE '%' || $2 || '%')",
+            ],
+            args=[UUID(client_id), q],
+            size=size,
+        )
+        total = await countRows(
+            conn, HAS_MORE if q else COUNT_STRATEGIES["/fetch-client-onboarding-documents"], "document",
+            "document_by_client_purpose", (UUID(client_id), "onboarding_paperwork")
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-    total = rows[0]["total_count"] if rows else 0
-
-    if rows:
-        last = rows[-1]
-        next_ts = last["created_at"].isoformat()
-        next_id = str(last["id"])
-    else:
-        next_ts = None
-        next_id = None
-
     payload = {
         "documents": [
             {
@@ -2391,12 +3190,11 @@ async def fetchClientOnboardingDocuments(
                 "document_type": r["document_type"],
                 "date_uploaded": r["date_uploaded"]
             }
-            for r in rows
+            for r in page.rows
         ],
         "total_count": total,
         "page_size": size,
-        "last_seen_created_at": next_ts,
-        "last_seen_id": next_id,
+        **page.meta(),
     }
     if user:
         payload = await encryptForUser(payload, user.email, conn, request.app)
@@ -2424,52 +3222,40 @@ async def getInsuranceDocuments(
     client_id = data.get("clientId") or client_id
     size = data.get("size", size)
     q = data.get("q", q)
-    last_seen_created_at = data.get("last_seen_created_at", last_seen_created_at)
-    last_seen_id = data.get("last_seen_id", last_seen_id)
-    if last_seen_created_at:
-        try:
-            dt = datetime.fromisoformat(last_seen_created_at)
-            cursor_ts = dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
-        except ValueError:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid timestamp: '{last_seen_created_at}'"
-            )
-    else:
-        cursor_ts = datetime.now(timezone.utc)
-
-    max_uuid = UUID("ffffffff-ffff-ffff-ffff-ffffffffffff")
-    cursor_id = last_seen_id or max_uuid
-
-    sql = """
-        SELECT
-          d.id             AS document_id,
-          d.file_name      AS file_name,
-          d.file_extension AS type,
-          d.document_type  AS document_type,
-          d.created_at     AS date_uploaded,
-          COUNT(*) OVER()  AS total_count
-        FROM document d
-          d.client_id = $1
-          AND d.purpose = 'insurance'
-          
-          AND (d.created_at, d.id) < ($2::timestamptz, $3::uuid)
-          AND ($4::text IS NULL OR d.file_name ILIKE '%' || $4 || '%')
-        ORDER BY d.created_at DESC, d.id DESC
-        LIMIT $5;
-    """
-
-    rows = await conn.fetch(sql, client_id, cursor_ts, cursor_id, q, size)
-
-    total = rows[0]["total_count"] if rows else 0
+    scope = f"document:{client_id}:insurance:{q or ''}"
+    cursor = readCursor(
+        {"last_seen_created_at": last_seen_created_at, "last_seen_id": last_seen_id, **data}, scope
+    )
 
-    if rows:
-        last = rows[-1]
-        next_ts = last["created_at"].isoformat()
-        next_id = str(last["id"])
-    else:
-        next_ts = None
-        next_id = None
+    try:
+        page = await fetchPage(
+            conn, cursor, Keyset("document", "d"),
+            scope=scope,
+            select="""
+              d.id             AS document_id,
+              d.file_name      AS file_name,
+              d.file_extension AS type,
+              d.document_type  AS document_type,
+              d.created_at     AS date_uploaded
+            """,
+            source="document d",
+            where=[
+                "d.client_id = $1",
+                "d.purpose = 'insurance'",
+                "d.is_deleted = FALSE",
+                "($2::text IS NULL OR d.file_name ILIKE '%' || $2 || '%')",
+            ],
+            args=[UUID(client_id), q],
+            size=size,
+        )
+        total = await countRows(
+            conn, HAS_MORE if q else COUNT_STRATEGIES["/get-insurance-documents"], "document",
+            "document_by_client_purpose", (UUID(client_id), "insurance")
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
     payload = {
         "documents": [
@@ -2480,12 +3266,11 @@ async def getInsuranceDocuments(
                 "document_type": r["document_type"],
                 "date_uploaded": r["date_uploaded"]
             }
-            for r in rows
+            for r in page.rows
         ],
         "total_count": total,
         "page_size": size,
-        "last_seen_created_at": next_ts,
-        "last_seen_id": next_id,
+        **page.meta(),
     }
     if user:
         payload = await encryptForUser(payload, user.email, conn, request.app)
@@ -2512,62 +3297,43 @@ async def fetchClientProjects(
 ):
     size = data.get("size", size)
     q = data.get("q", q)
-    last_seen_created_at = data.get("last_seen_created_at", last_seen_created_at)
-    last_seen_id = data.get("last_seen_id", last_seen_id)
-    if last_seen_created_at:
-        try:
-            dt = datetime.fromisoformat(last_seen_created_at)
-            cursor_ts = dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
-        except ValueError:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid timestamp: '{last_seen_created_at}'"
-            )
-    else:
-        cursor_ts = datetime.now(timezone.utc)
-
-    max_uuid = UUID("ffffffff-ffff-ffff-ffff-ffffffffffff")
-    cursor_id = last_seen_id or max_uuid
-
-    sql = """
-        SELECT
-          p.id            AS project_id,
-          p.business_name AS business_name,
-          p.created_at    AS date_created,
-          p.due_date      AS due_date,
-          s.value         AS status_value,
-          COUNT(*) OVER() AS total_count
-        FROM project p
-        JOIN status s ON s.id = p.status_id AND s.category = 'project' 
-          p.client_id = $1
-          AND s.value = 'Open'
-          
-          AND (p.created_at, p.id) < ($2::timestamptz, $3::uuid)
-          AND ($4::text IS NULL OR p.business_name ILIKE '%' || $4 || '%')
-        ORDER BY p.created_at DESC, p.id DESC
-        LIMIT $5;
-    """
+    scope = f"project:{client_id}:{q or ''}"
+    cursor = readCursor(
+        {"last_seen_created_at": last_seen_created_at, "last_seen_id": last_seen_id, **data}, scope
+    )
 
     try:
-        rows = await conn.fetch(sql, client_id, cursor_ts, cursor_id, q, size)
+        page = await fetchPage(
+            conn, cursor, Keyset("project", "p"),
+            scope=scope,
+            select="""
+              p.id            AS project_id,
+              p.business_name AS business_name,
+              p.created_at    AS date_created,
+              p.due_date      AS due_date,
+              s.value         AS status_value
+            """,
+            source="project p JOIN status s ON s.id = p.status_id AND s.category = 'project'",
+            where=[
+                "p.client_id = $1",
+                "s.value = 'Open'",
+                "p.is_deleted = FALSE",
+                "($2::text IS NULL OR p.business_name ILIKE '%' || $2 || '%')",
+            ],
+            args=[UUID(client_id), q],
+            size=size,
+        )
+        total = await countRows(conn, COUNT_STRATEGIES["/fetch-client-projects"], "project")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-    total = rows[0]["total_count"] if rows else 0
-    if rows:
-        last = rows[-1]
-        next_ts = last["created_at"].isoformat()
-        next_id = str(last["id"])
-    else:
-        next_ts = None
-        next_id = None
-
     payload = {
-        "projects": [dict(r) for r in rows],
+        "projects": page.rows,
         "total_count": total,
         "page_size": size,
-        "last_seen_created_at": next_ts,
-        "last_seen_id": next_id,
+        **page.meta(),
     }
     if user:
         payload = await encryptForUser(payload, user.email, conn, request.app)
@@ -2596,72 +3362,49 @@ async def getBillings(
         user: SimpleUser = Depends(getCurrentUser)
 ):
     size = data.get("size", size)
-    lastSeenCreatedAt = data.get("last_seen_created_at", lastSeenCreatedAt)
-    lastSeenId = data.get("last_seen_id", lastSeenId)
-    if lastSeenCreatedAt:
-        try:
-            dt = datetime.fromisoformat(lastSeenCreatedAt)
-            cursorTs = dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
-        except ValueError:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid timestamp: '{lastSeenCreatedAt}'"
-            )
-    else:
-        cursorTs = datetime.now(timezone.utc)
-
-    maxUuid = UUID("ffffffff-ffff-ffff-ffff-ffffffffffff")
-    cursorId = lastSeenId or maxUuid
-
-    sql = """
-        SELECT
-          i.id,
-          i.number,
-          i.issuance_date,
-          i.due_date,
-          i.amount,
-          s.value        AS status_value,
-          d.file_url,
-          d.file_name,
-          d.file_extension,
-          d.document_type,
-          i.created_at,
-          COUNT(*) OVER() AS total_count
-        FROM invoice i
-        JOIN status s
-          ON s.id = i.status_id
-         AND s.category = 'billing'
-         
-        LEFT JOIN document d
-          ON d.id = i.file_id
-         
-        WHERE (i.created_at, i.id) < ($1::timestamptz, $2::uuid)
-          
-        ORDER BY i.created_at DESC, i.id DESC
-        LIMIT $3;
-    """
+    cursor = readCursor(
+        {"last_seen_created_at": lastSeenCreatedAt, "last_seen_id": lastSeenId, **data}, "billing"
+    )
 
     try:
-        rows = await conn.fetch(sql, cursorTs, cursorId, size)
+        page = await fetchPage(
+            conn, cursor, Keyset("invoice", "i"),
+            scope="billing",
+            select="""
+              i.id,
+              i.number,
+              i.issuance_date,
+              i.due_date,
+              i.amount,
+              s.value        AS status_value,
+              d.file_url,
+              d.file_name,
+              d.file_extension,
+              d.document_type,
+              i.created_at
+            """,
+            source="""
+            invoice i
+            JOIN status s
+              ON s.id = i.status_id
+             AND s.category = 'billing'
+            LEFT JOIN document d
+              ON d.id = i.file_id
+            """,
+            where=["i.is_deleted = FALSE"],
+            size=size,
+        )
+        total = await countRows(conn, COUNT_STRATEGIES["/get-billings"], "invoice")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-    total = rows[0]["total_count"] if rows else 0
-
-    if rows:
-        last = rows[-1]
-        nextTs = last["created_at"].isoformat()
-        nextId = str(last["id"])
-    else:
-        nextTs = None
-        nextId = None
-
     payload = {
-        "billings": [dict(r) for r in rows],
+        "billings": page.rows,
         "total_count": total,
         "page_size": size,
-        "last_seen_created_at": nextTs,
-        "last_seen_id": nextId,
+        **page.meta(),
     }
     if user:
         payload = await encryptForUser(payload, user.email, conn, request.app)
@@ -2747,65 +3490,56 @@ async def getPasswords(
             None,
             description="ISO-8601 UTC timestamp cursor (e.g. 2025-05-24T12:00:00Z)"
         ),
-        lastSeenUserId: Optional[UUID] = Query(
+        lastSeenUserEmail: Optional[str] = Query(
             None,
-            description="UUID cursor to break ties if multiple rows share the same timestamp"
+            description="User email cursor to break ties if multiple rows share the same timestamp"
         ),
         data: dict = Depends(decryptPayload()),
         conn: Connection = Depends(get_conn),
         user: SimpleUser = Depends(getCurrentUser)
 ):
     size = data.get("size", size)
-    lastSeenCreatedAt = data.get("last_seen_created_at", lastSeenCreatedAt)
-    lastSeenUserId = data.get("last_seen_user_id", lastSeenUserId)
-    if lastSeenCreatedAt:
-        try:
-            dt = datetime.fromisoformat(lastSeenCreatedAt)
-            cursorTs = dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
-        except ValueError:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid timestamp: '{lastSeenCreatedAt}'"
-            )
-    else:
-        cursorTs = datetime.now(timezone.utc)
-
-    maxUuid = UUID("ffffffff-ffff-ffff-ffff-ffffffffffff")
-    cursorId = lastSeenUserId or maxUuid
-
-    sql = """
-        SELECT
-          p.user_id,
-          p.encrypted_password,
-          p.iv,
-          p.salt,
-          p.kdf_params,
-          p.created_at,
-          COUNT(*) OVER() AS total_count
-        FROM client_password p
-        WHERE p.client_id = $1
-          AND (p.created_at, p.user_id) < ($2::timestamptz, $3::uuid)
-        ORDER BY p.created_at DESC, p.user_id DESC
-        LIMIT $4;
-    """
-
-    rows = await conn.fetch(sql, clientId, cursorTs, cursorId, size)
+    scope = f"client_password:{clientId}"
+    cursor = readCursor(
+        {
+            "last_seen_created_at": lastSeenCreatedAt,
+            "last_seen_id": data.get("last_seen_user_id", lastSeenUserEmail),
+            **data,
+        }, scope
+    )
 
-    total = rows[0]["total_count"] if rows else 0
-    if rows:
-        last = rows[-1]
-        nextTs = last["created_at"].isoformat()
-        nextId = str(last["user_id"])
-    else:
-        nextTs = None
-        nextId = None
+    try:
+        page = await fetchPage(
+            conn, cursor, Keyset("client_password", "p", idColumn="user_email", idType="citext"),
+            scope=scope,
+            select="""
+              p.user_email,
+              p.encrypted_password,
+              p.iv,
+              p.salt,
+              p.kdf_params,
+              p.created_at
+            """,
+            source="client_password p",
+            where=["p.client_id = $1"],
+            args=[UUID(clientId)],
+            size=size,
+        )
+        total = await countRows(
+            conn, COUNT_STRATEGIES["/get-passwords"], "client_password", "client_password_by_client",
+            (UUID(clientId),)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
     payload = {
-        "passwords": [dict(r) for r in rows],
+        "passwords": page.rows,
         "total_count": total,
         "page_size": size,
-        "last_seen_created_at": nextTs,
-        "last_seen_user_id": nextId,
+        **page.meta(),
+        "last_seen_user_id": page.lastId,
     }
     if user:
         payload = await encryptForUser(payload, user.email, conn, request.app)
@@ -2863,12 +3597,162 @@ async def createNewInvoice(
             documentId,
         )
 
+    await invalidateCached(*INVOICE_WRITE_ROUTES)
+
     payload_resp = {"invoiceId": invoiceId}
     if user:
         payload_resp = await encryptForUser(payload_resp, user.email, conn, request.app)
     return payload_resp
 
 
+################################################################################
+# TODO:                         SYNC ENDPOINTS                                 #
+################################################################################
+
+# Delta sync for local replicas. Rows come back in (updated_at, id) order from
+# the idx_*_sync indexes, deletions as tombstones (see SYNC in DbManager.py).
+# Each entity is (route the caller must be allowed, client column, query for
+# the rows by id). The rows carry what the list endpoints show; the joins are
+# outer so a live row is always returned, whatever its lookups.
+SYNC_ENTITIES = {
+    "project": ("/fetch-client-projects", "client_id", """
+        SELECT p.*, c.company_name, s.value AS status_value
+          FROM project p
+          LEFT JOIN client c ON c.id = p.client_id
+          LEFT JOIN status s ON s.id = p.status_id
+         WHERE p.id = ANY($1::uuid[]);
+    """),
+    "client": ("/fetch-client", "id", """
+        SELECT c.id, c.company_name, ct.value AS type_value, c.status_id, s.value AS status_value,
+               cs.total_collected AS total_revenue, cs.total_invoiced, cs.total_projects, cs.open_projects,
+               c.created_at, c.updated_at
+          FROM client c
+          LEFT JOIN client_summary cs ON cs.client_id = c.id
+          LEFT JOIN status s ON s.id = c.status_id
+          LEFT JOIN client_type ct ON ct.id = c.type_id
+         WHERE c.id = ANY($1::uuid[]);
+    """),
+    "invoice": ("/get-billings", "client_id", """
+        SELECT i.id, i.number, i.client_id, i.issuance_date, i.due_date, i.amount, s.value AS status_value,
+               d.file_url, d.file_name, d.file_extension, d.document_type, i.created_at, i.updated_at
+          FROM invoice i
+          LEFT JOIN status s ON s.id = i.status_id
+          LEFT JOIN document d ON d.id = i.file_id
+         WHERE i.id = ANY($1::uuid[]);
+    """),
+}
+SYNC_PAGE_SIZE = 200
+SYNC_MAX_PAGE_SIZE = 1000
+# updated_at is set when a transaction starts, so a row can commit after later
+# ones were already handed out. Every page only holds changes older than this
+# (longer than any write transaction plus the replica lag), so the cursor never
+# passes a row that has yet to commit.
+SYNC_SETTLE_SECONDS = 30 + REPLICA_MAX_LAG_SECONDS
+SYNC_EPOCH = (datetime(1970, 1, 1, tzinfo=timezone.utc), UUID(int=0))
+
+
+def syncChangesSql(entity: str, clientColumn: str) -> str:
+    # $1/$2 the cursor, $3 the visible client ids (NULL for all), $4 the limit,
+    # $5 FALSE on a first sync, which has nothing to delete, $6 the settle horizon
+    return f"""
+        WITH changed AS (
+          SELECT r.updated_at AS ts, r.id, r.is_deleted AS deleted, r.deleted_at
+            FROM {entity} r
+           WHERE (r.updated_at, r.id) > ($1::timestamptz, $2::uuid)
+             AND r.updated_at <= $6
+             AND ($3::uuid[] IS NULL OR r.{clientColumn} = ANY($3::uuid[]))
+             AND ($5 OR r.is_deleted = FALSE)
+           ORDER BY r.updated_at, r.id
+           LIMIT $4
+        ), removed AS (
+          SELECT t.deleted_at AS ts, t.record_id AS id, TRUE AS deleted, t.deleted_at
+            FROM sync_tombstone t
+           WHERE $5
+             AND t.source_table = '{entity}'
+             AND (t.deleted_at, t.record_id) > ($1::timestamptz, $2::uuid)
+             AND t.deleted_at <= $6
+             AND ($3::uuid[] IS NULL OR t.client_id = ANY($3::uuid[]))
+           ORDER BY t.deleted_at, t.record_id
+           LIMIT $4
+        )
+        SELECT * FROM (SELECT * FROM changed UNION ALL SELECT * FROM removed) k
+         ORDER BY k.ts, k.id
+         LIMIT $4;
+    """
+
+
+@app.post("/get-changes")
+async def getChanges(
+        request: Request,
+        data: dict = Depends(decryptPayload()),
+        conn: Connection = Depends(get_conn),
+        user: SimpleUser = Depends(getCurrentUser),
+        enforcer: AsyncEnforcer = Depends(getEnforcer)
+):
+    entity = data.get("entity")
+    if entity not in SYNC_ENTITIES:
+        raise HTTPException(status_code=400, detail=f"entity must be one of {', '.join(SYNC_ENTITIES)}")
+    route, clientColumn, rowsSql = SYNC_ENTITIES[entity]
+    if user and not mayCall(enforcer, user, route):
+        raise HTTPException(status_code=403, detail=f"Not allowed to sync {entity}")
+    try:
+        size = min(int(data.get("size") or SYNC_PAGE_SIZE), SYNC_MAX_PAGE_SIZE)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="size must be a number")
+    if size <= 0:
+        raise HTTPException(status_code=400, detail="size must be positive")
+
+    scope = f"sync:{entity}"
+    keyset = Keyset(entity, "r", tsColumn="updated_at")
+    cursor = decodeCursor(data["cursor"], scope) if data.get("cursor") else None
+    since = (keyset.castTs(cursor.ts), keyset.castId(cursor.id)) if cursor else SYNC_EPOCH
+
+    try:
+        clientIds = await authorizedClientIds(conn, enforcer, user) if user else None
+        horizon = await conn.fetchval("SELECT now() - make_interval(secs => $1)", float(SYNC_SETTLE_SECONDS))
+        keys, hasMore = trimPage(
+            await conn.fetch(
+                syncChangesSql(entity, clientColumn), *since, clientIds, size + 1, cursor is not None, horizon
+            ),
+            size,
+        )
+        live = [k["id"] for k in keys if not k["deleted"]]
+        rows = {r["id"]: dict(r) for r in await conn.fetch(rowsSql, live)} if live else {}
+
+        last = (keys[-1]["ts"], keys[-1]["id"]) if keys else since
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    masked = user is not None and entity == "project" and \
+        "client_technician" in await enforcer.get_roles_for_user_in_domain(user.email, "*")
+    changes = []
+    for k in keys:
+        if k["deleted"]:
+            changes.append({"op": "delete", "id": k["id"], "deleted_at": k["deleted_at"] or k["ts"]})
+            continue
+        row = rows.get(k["id"])
+        if row is None:
+            # Hard-deleted between the two queries, its tombstone comes on a later page
+            print(f"[sync] {entity} {k['id']} changed but could not be loaded")
+            continue
+        row.pop("search_text", None)
+        if masked:
+            row.pop("nte", None)
+        changes.append({"op": "upsert", "row": row})
+
+    payload = {
+        "entity": entity,
+        "changes": changes,
+        "has_more": hasMore,
+        "next_cursor": encodeCursor(scope, NEXT, keyset.dumpTs(last[0]), last[1]),
+    }
+    if user:
+        payload = await encryptForUser(payload, user.email, conn, request.app)
+    return payload
+
+
 ################################################################################
 # TODO:                         QUOTE ENDPOINTS                              #
 ################################################################################
@@ -2946,10 +3830,13 @@ async def getInvoice(
          WHERE i.id = $1 
          LIMIT 1;
     """
+    tag = await detailTag(conn, "invoice", id)
+    if notModified(data, tag):
+        return notModifiedResponse(tag)
     row = await conn.fetchrow(sql, id)
     if not row:
         raise HTTPException(status_code=404, detail=f"Invoice {id} not found")
-    payload = {"invoice": dict(row)}
+    payload = {"invoice": dict(row), "etag": tag}
     if user:
         payload = await encryptForUser(payload, user.email, conn, request.app)
     return payload
@@ -2970,10 +3857,13 @@ async def getQuote(
          WHERE q.id = $1 
          LIMIT 1;
     """
+    tag = await detailTag(conn, "quote", id)
+    if notModified(data, tag):
+        return notModifiedResponse(tag)
     row = await conn.fetchrow(sql, id)
     if not row:
         raise HTTPException(status_code=404, detail=f"Quote {id} not found")
-    payload = {"quote": dict(row)}
+    payload = {"quote": dict(row), "etag": tag}
     if user:
         payload = await encryptForUser(payload, user.email, conn, request.app)
     return payload
@@ -2983,6 +3873,79 @@ async def getQuote(
 # TODO:                         PROFILE ENDPOINTS                              #
 ################################################################################
 
+# The whole onboarding document is assembled by Postgres in one query
+ONBOARDING_DATA_SQL = """
+    SELECT json_build_object(
+      'general', COALESCE((
+        SELECT row_to_json(g) FROM (
+          SELECT satellite_office_address, organization_type, establishment_year,
+                 annual_revenue, accepted_payment_methods, naics_code, duns_number
+            FROM client_onboarding_general
+           WHERE client_id = $1
+           LIMIT 1
+        ) g), '{}'::json),
+      'service', COALESCE((
+        SELECT row_to_json(s) FROM (
+          SELECT coverage_area, admin_staff_count, field_staff_count, licenses,
+                 working_hours, covers_after_hours, covers_weekend_calls
+            FROM client_onboarding_service
+           WHERE client_id = $1
+           LIMIT 1
+        ) s), '{}'::json),
+      'contact', COALESCE((
+        SELECT row_to_json(c) FROM (
+          SELECT dispatch_supervisor, field_supervisor, management_supervisor,
+                 regular_hours_contact, emergency_hours_contact
+            FROM client_onboarding_contact
+           WHERE client_id = $1
+           LIMIT 1
+        ) c), '{}'::json),
+      'load', COALESCE((
+        SELECT row_to_json(l) FROM (
+          SELECT avg_monthly_tickets_last4, po_source_split, monthly_po_capacity
+            FROM client_onboarding_load
+           WHERE client_id = $1
+           LIMIT 1
+        ) l), '{}'::json),
+      'tradeCoverage', COALESCE((
+        SELECT json_agg(t) FROM (
+          SELECT pt.value AS trade, tc.coverage_level
+            FROM client_trade_coverage tc
+            JOIN project_trade pt ON pt.id = tc.project_trade_id
+           WHERE tc.client_id = $1
+        ) t), '[]'::json),
+      'pricing', COALESCE((
+        SELECT json_agg(p) FROM (
+          SELECT item_label, regular_hours_rate, after_hours_rate, is_custom
+            FROM client_pricing_structure
+           WHERE client_id = $1
+        ) p), '[]'::json),
+      'references', COALESCE((
+        SELECT json_agg(r) FROM (
+          SELECT company_name, contact_name, contact_email, contact_phone
+            FROM client_references
+           WHERE client_id = $1
+        ) r), '[]'::json)
+    )::text;
+"""
+
+# The assembled document is cached in Redis, shared by every backend behind the
+# load balancer, under the client's onboarding version. /save-onboarding-data
+# bumps the version after its write commits, so a reader that loaded the
+# document before the save can only store it under the old version, which
+# nobody reads any more.
+ONBOARDING_CACHE_TTL = 3600
+
+
+def onboardingVersionKey(clientId) -> str:
+    return f"onboarding_data_version:{clientId}"
+
+
+async def onboardingCacheKey(redis: Redis, clientId) -> str:
+    version = await redis.get(onboardingVersionKey(clientId))
+    return f"onboarding_data:{clientId}:{int(version or 0)}"
+
+
 @app.post("/get-onboarding-data")
 async def getOnboardingData(
         request: Request,
@@ -2992,78 +3955,24 @@ async def getOnboardingData(
         user: SimpleUser = Depends(getCurrentUser)
 ):
     clientId = data.get("clientId") or clientId
-    if not clientId or not isUUIDv4(clientId):
+    if not clientId or not await isUUIDv4(clientId):
         raise HTTPException(
             status_code=400,
             detail=f"Invalid UUIDv4 (must be lowercase-hyphenated): {clientId}"
         )
 
-    generalSql = """
-        SELECT satellite_office_address, organization_type, establishment_year,
-               annual_revenue, accepted_payment_methods, naics_code, duns_number
-          FROM client_onboarding_general
-         WHERE client_id = $1 
-         LIMIT 1;
-    """
-    serviceSql = """
-        SELECT coverage_area, admin_staff_count, field_staff_count, licenses,
-               working_hours, covers_after_hours, covers_weekend_calls
-          FROM client_onboarding_service
-         WHERE client_id = $1 
-         LIMIT 1;
-    """
-    contactSql = """
-        SELECT dispatch_supervisor, field_supervisor, management_supervisor,
-               regular_hours_contact, emergency_hours_contact
-          FROM client_onboarding_contact
-         WHERE client_id = $1 
-         LIMIT 1;
-    """
-    loadSql = """
-        SELECT avg_monthly_tickets_last4, po_source_split, monthly_po_capacity
-          FROM client_onboarding_load
-         WHERE client_id = $1 
-         LIMIT 1;
-    """
-    tradeSql = """
-        SELECT pt.value AS trade, tc.coverage_level
-          FROM client_trade_coverage tc
-          JOIN project_trade pt ON pt.id = tc.project_trade_id
-         WHERE tc.client_id = $1
-           
-           ;
-    """
-    pricingSql = """
-        SELECT item_label, regular_hours_rate, after_hours_rate, is_custom
-          FROM client_pricing_structure
-         WHERE client_id = $1 ;
-    """
-    refsSql = """
-        SELECT company_name, contact_name, contact_email, contact_phone
-          FROM client_references
-         WHERE client_id = $1 ;
-    """
-
-    try:
-        generalRow = await conn.fetchrow(generalSql, clientId)
-        serviceRow = await conn.fetchrow(serviceSql, clientId)
-        contactRow = await conn.fetchrow(contactSql, clientId)
-        loadRow = await conn.fetchrow(loadSql, clientId)
-        tradeRows = await conn.fetch(tradeSql, clientId)
-        pricingRows = await conn.fetch(pricingSql, clientId)
-        refsRows = await conn.fetch(refsSql, clientId)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    redis = request.app.state.redis
+    # The version is read before the database, never after
+    key = await onboardingCacheKey(redis, clientId)
+    document = await redis.get(key)
+    if document is None:
+        try:
+            document = await conn.fetchval(ONBOARDING_DATA_SQL, UUID(clientId))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        await redis.set(key, document, ex=ONBOARDING_CACHE_TTL)
 
-    payload = {
-        "general": dict(generalRow) if generalRow else {},
-        "service": dict(serviceRow) if serviceRow else {},
-        "contact": dict(contactRow) if contactRow else {},
-        "load": dict(loadRow) if loadRow else {},
-        "tradeCoverage": [dict(r) for r in tradeRows],
-        "pricing": [dict(r) for r in pricingRows],
-        "references": [dict(r) for r in refsRows],
-    }
+    payload = json.loads(document)
     if user:
         payload = await encryptForUser(payload, user.email, conn, request.app)
     return payload
@@ -3074,19 +3983,182 @@ async def getOnboardingData(
 ################################################################################
 
 
+# Whole onboarding form in one statement. Section rows are upserted per client.
+# Trade coverage and pricing are upserted by their natural keys and rows that
+# were removed from the form are deleted. References have no natural key and
+# are replaced. Re-saving the same form leaves the tables unchanged.
+SAVE_ONBOARDING_SQL = """
+    WITH general AS (
+        INSERT INTO client_onboarding_general (
+          client_id, satellite_office_address, organization_type,
+          establishment_year, annual_revenue, accepted_payment_methods,
+          naics_code, duns_number
+        ) VALUES ($1,$2,$3,$4,$5,$6,$7,$8)
+        ON CONFLICT (client_id) DO UPDATE SET
+          satellite_office_address = EXCLUDED.satellite_office_address,
+          organization_type        = EXCLUDED.organization_type,
+          establishment_year       = EXCLUDED.establishment_year,
+          annual_revenue           = EXCLUDED.annual_revenue,
+          accepted_payment_methods = EXCLUDED.accepted_payment_methods,
+          naics_code               = EXCLUDED.naics_code,
+          duns_number              = EXCLUDED.duns_number,
+          updated_at               = now()
+    ), service AS (
+        INSERT INTO client_onboarding_service (
+          client_id, coverage_area, admin_staff_count, field_staff_count,
+          licenses, working_hours, covers_after_hours, covers_weekend_calls
+        ) VALUES ($1,$9,$10,$11,$12,$13,$14,$15)
+        ON CONFLICT (client_id) DO UPDATE SET
+          coverage_area        = EXCLUDED.coverage_area,
+          admin_staff_count    = EXCLUDED.admin_staff_count,
+          field_staff_count    = EXCLUDED.field_staff_count,
+          licenses             = EXCLUDED.licenses,
+          working_hours        = EXCLUDED.working_hours,
+          covers_after_hours   = EXCLUDED.covers_after_hours,
+          covers_weekend_calls = EXCLUDED.covers_weekend_calls,
+          updated_at           = now()
+    ), contact AS (
+        INSERT INTO client_onboarding_contact (
+          client_id, dispatch_supervisor, field_supervisor, management_supervisor,
+          regular_hours_contact, emergency_hours_contact
+        ) VALUES ($1,$16,$17,$18,$19,$20)
+        ON CONFLICT (client_id) DO UPDATE SET
+          dispatch_supervisor     = EXCLUDED.dispatch_supervisor,
+          field_supervisor        = EXCLUDED.field_supervisor,
+          management_supervisor   = EXCLUDED.management_supervisor,
+          regular_hours_contact   = EXCLUDED.regular_hours_contact,
+          emergency_hours_contact = EXCLUDED.emergency_hours_contact,
+          updated_at              = now()
+    ), load AS (
+        INSERT INTO client_onboarding_load (
+          client_id, avg_monthly_tickets_last4, po_source_split, monthly_po_capacity
+        ) VALUES ($1,$21,$22,$23)
+        ON CONFLICT (client_id) DO UPDATE SET
+          avg_monthly_tickets_last4 = EXCLUDED.avg_monthly_tickets_last4,
+          po_source_split           = EXCLUDED.po_source_split,
+          monthly_po_capacity       = EXCLUDED.monthly_po_capacity,
+          updated_at                = now()
+    ), trade_input AS (
+        SELECT pt.id AS project_trade_id, t.coverage_level
+          FROM unnest($24::text[], $25::text[]) AS t(trade, coverage_level)
+          JOIN project_trade pt ON pt.value = t.trade
+    ), trade_upsert AS (
+        INSERT INTO client_trade_coverage (client_id, project_trade_id, coverage_level)
+        SELECT $1, project_trade_id, coverage_level FROM trade_input
+        ON CONFLICT (client_id, project_trade_id) DO UPDATE SET
+          coverage_level = EXCLUDED.coverage_level,
+          updated_at     = now()
+        WHERE client_trade_coverage.coverage_level IS DISTINCT FROM EXCLUDED.coverage_level
+    ), trade_delete AS (
+        DELETE FROM client_trade_coverage
+         WHERE client_id = $1
+           AND project_trade_id NOT IN (SELECT project_trade_id FROM trade_input)
+    ), pricing_upsert AS (
+        INSERT INTO client_pricing_structure (
+          client_id, item_label, regular_hours_rate, after_hours_rate, is_custom
+        )
+        SELECT $1, t.*
+          FROM unnest($26::text[], $27::text[], $28::text[], $29::boolean[])
+               AS t(item_label, regular_hours_rate, after_hours_rate, is_custom)
+        ON CONFLICT (client_id, item_label) DO UPDATE SET
+          regular_hours_rate = EXCLUDED.regular_hours_rate,
+          after_hours_rate   = EXCLUDED.after_hours_rate,
+          is_custom          = EXCLUDED.is_custom,
+          updated_at         = now()
+    ), pricing_delete AS (
+        DELETE FROM client_pricing_structure
+         WHERE client_id = $1
+           AND item_label <> ALL($26::text[])
+    ), refs_delete AS (
+        DELETE FROM client_references WHERE client_id = $1
+    )
+    INSERT INTO client_references (
+      client_id, company_name, contact_name, contact_email, contact_phone
+    )
+    SELECT $1, t.*
+      FROM unnest($30::text[], $31::text[], $32::citext[], $33::text[])
+           AS t(company_name, contact_name, contact_email, contact_phone);
+"""
+
+
+def onboardingSaveArgs(clientId: UUID, payload: dict) -> list:
+    # Arguments of SAVE_ONBOARDING_SQL for one submitted form
+    general = payload.get("general", {})
+    service = payload.get("service", {})
+    contact = payload.get("contact", {})
+    loadInfo = payload.get("load", {})
+    tradeCoverage = payload.get("tradeCoverage", [])
+    pricing = payload.get("pricing", [])
+    references = payload.get("references", [])
+
+    trades = {}
+    for tc in tradeCoverage:
+        if tc.get("trade") and tc.get("coverageLevel"):
+            trades[tc["trade"]] = tc["coverageLevel"].upper()
+    prices = {}
+    for price in pricing:
+        if price.get("label"):
+            prices[price["label"]] = price
+    refs = [ref for ref in references if any(ref.values())]
+
+    return [
+        clientId,
+        general.get("satelliteOfficeAddress"),
+        general.get("organizationType"),
+        general.get("establishmentYear"),
+        general.get("annualRevenue"),
+        general.get("paymentMethods"),
+        general.get("naicsCode"),
+        general.get("dunsNumber"),
+        service.get("coverageArea"),
+        service.get("adminStaffCount"),
+        service.get("fieldStaffCount"),
+        service.get("licenses"),
+        service.get("workingHours"),
+        bool(service.get("coversAfterHours")),
+        bool(service.get("coversWeekendCalls")),
+        contact.get("dispatchSupervisor"),
+        contact.get("fieldSupervisor"),
+        contact.get("managementSupervisor"),
+        contact.get("regularContact"),
+        contact.get("emergencyContact"),
+        loadInfo.get("averageMonthlyTickets"),
+        loadInfo.get("poSourceSplit"),
+        loadInfo.get("monthlyPOCapacity"),
+        list(trades.keys()),
+        list(trades.values()),
+        list(prices.keys()),
+        [p.get("regular") for p in prices.values()],
+        [p.get("after") for p in prices.values()],
+        [bool(p.get("isCustom")) for p in prices.values()],
+        [r.get("company") for r in refs],
+        [r.get("contact") for r in refs],
+        [r.get("email") for r in refs],
+        [r.get("phone") for r in refs],
+    ]
+
+
 @app.post("/save-onboarding-data")
 async def saveOnboardingData(
         request: Request,
         payload: dict = Depends(decryptPayload()),
         conn: Connection = Depends(get_conn),
-        user: SimpleUser = Depends(getCurrentUser)
+        user: SimpleUser = Depends(getCurrentUser),
+        enforcer: AsyncEnforcer = Depends(getEnforcer)
 ):
-    email = payload.get("email")
+    # The form belongs to the client of "email", the caller's own by default.
+    # Saving replaces the client's child rows, so it must be one of the
+    # caller's clients.
+    email = payload.get("email") or (user.email if user else None)
     clientId = None
     if email:
         clientId = await conn.fetchval('SELECT client_id FROM "user" WHERE email=$1', email)
     if not clientId or not await isUUIDv4(str(clientId)):
         raise HTTPException(status_code=400, detail="invalid client")
+    if user:
+        allowed = await authorizedClientIds(conn, enforcer, user)
+        if allowed is not None and clientId not in allowed:
+            raise HTTPException(status_code=403, detail="Not allowed to edit this client's onboarding data")
 
     general = payload.get("general", {})
     service = payload.get("service", {})
@@ -3111,121 +4183,11 @@ async def saveOnboardingData(
         if not has_data:
             raise HTTPException(status_code=400, detail="empty onboarding data")
 
-    async with conn.transaction():
-        await conn.execute(
-            """
-            INSERT INTO client_onboarding_general (
-              client_id, satellite_office_address, organization_type,
-              establishment_year, annual_revenue, accepted_payment_methods,
-              naics_code, duns_number
-            ) VALUES ($1,$2,$3,$4,$5,$6,$7,$8);
-            """,
-            clientId,
-            general.get("satelliteOfficeAddress"),
-            general.get("organizationType"),
-            general.get("establishmentYear"),
-            general.get("annualRevenue"),
-            general.get("paymentMethods"),
-            general.get("naicsCode"),
-            general.get("dunsNumber"),
-        )
-
-        await conn.execute(
-            """
-            INSERT INTO client_onboarding_service (
-              client_id, coverage_area, admin_staff_count, field_staff_count,
-              licenses, working_hours, covers_after_hours, covers_weekend_calls
-            ) VALUES ($1,$2,$3,$4,$5,$6,$7,$8);
-            """,
-            clientId,
-            service.get("coverageArea"),
-            service.get("adminStaffCount"),
-            service.get("fieldStaffCount"),
-            service.get("licenses"),
-            service.get("workingHours"),
-            bool(service.get("coversAfterHours")),
-            bool(service.get("coversWeekendCalls")),
-        )
-
-        await conn.execute(
-            """
-            INSERT INTO client_onboarding_contact (
-              client_id, dispatch_supervisor, field_supervisor, management_supervisor,
-              regular_hours_contact, emergency_hours_contact
-            ) VALUES ($1,$2,$3,$4,$5,$6);
-            """,
-            clientId,
-            contact.get("dispatchSupervisor"),
-            contact.get("fieldSupervisor"),
-            contact.get("managementSupervisor"),
-            contact.get("regularContact"),
-            contact.get("emergencyContact"),
-        )
-
-        await conn.execute(
-            """
-            INSERT INTO client_onboarding_load (
-              client_id, avg_monthly_tickets_last4, po_source_split, monthly_po_capacity
-            ) VALUES ($1,$2,$3,$4);
-            """,
-            clientId,
-            loadInfo.get("averageMonthlyTickets"),
-            loadInfo.get("poSourceSplit"),
-            loadInfo.get("monthlyPOCapacity"),
-        )
-
-        for tc in tradeCoverage:
-            tradeValue = tc.get("trade")
-            coverageLevel = tc.get("coverageLevel")
-            if not tradeValue or not coverageLevel:
-                continue
-            tradeId = await conn.fetchval(
-                "SELECT id FROM project_trade WHERE value=$1  LIMIT 1;",
-                tradeValue,
-            )
-            if tradeId:
-                await conn.execute(
-                    """
-                    INSERT INTO client_trade_coverage (
-                      client_id, project_trade_id, coverage_level
-                    ) VALUES ($1,$2,$3);
-                    """,
-                    clientId,
-                    tradeId,
-                    coverageLevel.upper(),
-                )
-
-        for price in pricing:
-            if not price.get("label"):
-                continue
-            await conn.execute(
-                """
-                INSERT INTO client_pricing_structure (
-                  client_id, item_label, regular_hours_rate, after_hours_rate, is_custom
-                ) VALUES ($1,$2,$3,$4,$5);
-                """,
-                clientId,
-                price.get("label"),
-                price.get("regular"),
-                price.get("after"),
-                bool(price.get("isCustom")),
-            )
-
-        for ref in references:
-            if not any(ref.values()):
-                continue
-            await conn.execute(
-                """
-                INSERT INTO client_references (
-                  client_id, company_name, contact_name, contact_email, contact_phone
-                ) VALUES ($1,$2,$3,$4,$5);
-                """,
-                clientId,
-                ref.get("company"),
-                ref.get("contact"),
-                ref.get("email"),
-                ref.get("phone"),
-            )
+    # A single statement is atomic on its own, no explicit transaction needed
+    await conn.execute(SAVE_ONBOARDING_SQL, *onboardingSaveArgs(clientId, payload))
+    # No expiry on the version, losing it would bring old entries back
+    await request.app.state.redis.incr(onboardingVersionKey(clientId))
+    await invalidateCached(*CLIENT_WRITE_ROUTES)
 
     resp_payload = {"status": "success"}
     if user:
@@ -3383,6 +4345,7 @@ async def adminCreateRecord(data: dict = Depends(decryptPayload()), conn: Connec
         newId = await conn.fetchval(sql, *values)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    await invalidateCached(*LOOKUP_WRITE_ROUTES)
     return {"id": str(newId)}
 
 
@@ -3435,6 +4398,7 @@ async def adminUpdateRecord(data: dict = Depends(decryptPayload()), conn: Connec
         await conn.execute(sql, *params)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    await invalidateCached(*LOOKUP_WRITE_ROUTES)
     return {"status": "updated"}
 
 
@@ -3449,6 +4413,7 @@ async def adminDeleteRecord(data: dict = Depends(decryptPayload()), conn: Connec
         await conn.execute(sql, UUID(recordId))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    await invalidateCached(*LOOKUP_WRITE_ROUTES)
     return {"status": "deleted"}
 
 
@@ -3617,7 +4582,7 @@ async def setRecoveryPhrase(request: Request, data: dict = Depends(decryptPayloa
             httponly=True,
             secure=True,
             samesite="none",
-            domain="localhost",
+            domain=COOKIE_DOMAIN,
             path="/",
             max_age=60 * 60 * 24,
         )
@@ -3729,7 +4694,7 @@ async def refreshSession(request: Request, conn: Connection = Depends(get_conn))
         httponly=True,
         secure=True,
         samesite="none",
-        domain="localhost",
+        domain=COOKIE_DOMAIN,
         path="/",
         max_age=60 * 60 * 24,
     )
@@ -3757,6 +4722,211 @@ async def unblacklistUser(email: str = Body(..., embed=True), request: Request =
     return {"status": "ok"}
 
 
+@app.post("/admin/search-reindex-status")
+async def searchReindexStatus(
+        request: Request,
+        data: dict = Depends(decryptPayload()),
+        conn: Connection = Depends(get_conn),
+        user: SimpleUser = Depends(getCurrentUser)
+):
+    # Backlog and per-worker progress of searchIndexer.py
+    try:
+        queue = await conn.fetchrow(
+            """
+            SELECT COUNT(*) AS pending,
+                   COUNT(*) FILTER (WHERE claimed_at IS NOT NULL) AS claimed,
+                   COALESCE((EXTRACT(EPOCH FROM now() - MIN(enqueued_at)) * 1000)::bigint, 0) AS lag_ms
+              FROM search_reindex_queue;
+            """
+        )
+        workers = await conn.fetch(
+            "SELECT * FROM search_reindex_progress ORDER BY last_batch_at DESC NULLS LAST;"
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    payload = {
+        "pending": queue["pending"],
+        "claimed": queue["claimed"],
+        "lag_ms": queue["lag_ms"],
+        "workers": [dict(r) for r in workers],
+    }
+    if user:
+        payload = await encryptForUser(payload, user.email, conn, request.app)
+    return payload
+
+
+@app.post("/admin/replica-status")
+async def replicaStatus(
+        request: Request,
+        data: dict = Depends(decryptPayload()),
+        conn: Connection = Depends(get_conn),
+        user: SimpleUser = Depends(getCurrentUser)
+):
+    replica = request.app.state.replica
+    payload = replica.status() if replica else {"configured": False}
+    if user:
+        payload = await encryptForUser(payload, user.email, conn, request.app)
+    return payload
+
+
+@app.post("/admin/pool-stats")
+async def poolStats(
+        request: Request,
+        data: dict = Depends(decryptPayload()),
+        conn: Connection = Depends(get_conn),
+        user: SimpleUser = Depends(getCurrentUser)
+):
+    # Per-route hold times, pool waits and queue depth of this worker, for sizing
+    # max_size, and how many reads were answered by another request's query
+    payload = {
+        **request.app.state.pool_stats.snapshot(),
+        "pool": request.app.state.pool_gate.snapshot(),
+        "requests": request.app.state.in_flight.snapshot(),
+        "single_flight": request.app.state.single_flight.snapshot(),
+    }
+    if user:
+        payload = await encryptForUser(payload, user.email, conn, request.app)
+    return payload
+
+
+@app.post("/admin/route-budgets")
+async def routeBudgets(
+        request: Request,
+        data: dict = Depends(decryptPayload()),
+        conn: Connection = Depends(get_conn),
+        user: SimpleUser = Depends(getCurrentUser)
+):
+    # Routes that ran over their budget first, with the last query that timed out
+    payload = {
+        **request.app.state.budget_stats.snapshot(),
+        "budgets": {**ROUTE_BUDGETS, "default": DEFAULT_ROUTE_BUDGET},
+    }
+    if user:
+        payload = await encryptForUser(payload, user.email, conn, request.app)
+    return payload
+
+
+# /batch serves read endpoints only (see isBatchable), up to MAX_BATCH_REQUESTS
+# of them on at most BATCH_MAX_CONNECTIONS pooled connections
+MAX_BATCH_REQUESTS = 20
+BATCH_MAX_CONNECTIONS = 4
+BATCH_INJECTED = {"request", "data", "conn", "user", "enforcer"}
+
+
+def batchHandler(app: FastAPI, path: str):
+    for route in app.routes:
+        if isinstance(route, APIRoute) and route.path == path and "POST" in route.methods:
+            return route.endpoint
+    return None
+
+
+def queryArgument(name: str, param: inspect.Parameter, query: dict):
+    # Query parameters of a handler, taken from the sub-request's "query"
+    field = param.default
+    isRequired = getattr(field, "is_required", None)
+    required = isRequired() if isRequired else getattr(field, "default", field) is Ellipsis
+    if name not in query:
+        if required:
+            raise HTTPException(status_code=400, detail=f"Missing query parameter: {name}")
+        return getattr(field, "default", field)
+    raw = query[name]
+    kind = param.annotation
+    if get_origin(kind) is Union:
+        kind = next((a for a in get_args(kind) if a is not type(None)), str)
+    try:
+        return kind(raw) if kind in (int, float, Decimal, UUID) else raw
+    except (ValueError, TypeError, ArithmeticError):
+        raise HTTPException(status_code=400, detail=f"Invalid query parameter: {name}")
+
+
+async def runBatched(request: Request, conn: Connection, user: SimpleUser, enforcer: AsyncEnforcer, sub: dict) -> dict:
+    # One sub-request through the route's own handler. Its errors are reported
+    # in its slot, a blown budget or a saturated pool fails the whole batch.
+    path = sub.get("path")
+    try:
+        if not isinstance(path, str) or not isBatchable(path):
+            raise HTTPException(status_code=400, detail=f"Not batchable: {path}")
+        handler = batchHandler(request.app, path)
+        if handler is None:
+            raise HTTPException(status_code=404, detail=f"Not found: {path}")
+        if not mayCall(enforcer, user, path):
+            raise HTTPException(status_code=403, detail="Forbidden")
+
+        primary = None
+        if path in PRIMARY_READ_ROUTES and conn.pool != "primary":
+            primary = conn = LazyConnection(
+                request.state.acquire_primary, conn.route, conn.stats, conn.budget, pool="primary"
+            )
+        try:
+            injected = {"request": request, "data": sub.get("body") or {}, "conn": conn, "user": user,
+                        "enforcer": enforcer}
+            kwargs = {}
+            for name, param in inspect.signature(handler).parameters.items():
+                if name in BATCH_INJECTED:
+                    kwargs[name] = injected[name]
+                else:
+                    kwargs[name] = queryArgument(name, param, sub.get("query") or {})
+            return {"path": path, "status": 200, "body": await handler(**kwargs)}
+        finally:
+            if primary is not None:
+                await primary.release(force=True)
+    except HTTPException as e:
+        cause = e.__cause__ or e.__context__
+        if isinstance(cause, (PoolSaturated, DeadlineExceeded, ClientDisconnected)):
+            raise cause
+        return {"path": path, "status": e.status_code, "detail": e.detail}
+
+
+@app.post("/admin/cache-stats")
+async def cacheStats(
+        request: Request,
+        data: dict = Depends(decryptPayload()),
+        conn: Connection = Depends(get_conn),
+        user: SimpleUser = Depends(getCurrentUser)
+):
+    payload = request.app.state.response_cache.snapshot()
+    if user:
+        payload = await encryptForUser(payload, user.email, conn, request.app)
+    return payload
+
+
+@app.post("/batch")
+async def batch(
+        request: Request,
+        data: dict = Depends(decryptPayload()),
+        conn: Connection = Depends(get_conn),
+        user: SimpleUser = Depends(getCurrentUser),
+        enforcer: AsyncEnforcer = Depends(getEnforcer)
+):
+    # {"requests": [{"path": "/get-states", "body": {...}, "query": {...}}, ...]}
+    # runs each through its endpoint's handler and returns {"responses": [...]}
+    # in the same order, each with the status and body (or detail) it would
+    # have had on its own. Sub-requests are authorized like direct calls.
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    subs = data.get("requests")
+    if not isinstance(subs, list) or not subs:
+        raise HTTPException(status_code=400, detail="requests required")
+    if len(subs) > MAX_BATCH_REQUESTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_REQUESTS} requests per batch")
+    if not all(isinstance(sub, dict) for sub in subs):
+        raise HTTPException(status_code=400, detail="Invalid request entry")
+
+    parts = {
+        i: (lambda c, sub=sub: runBatched(request, c, user, enforcer, sub))
+        for i, sub in enumerate(subs)
+    }
+    token = IN_BATCH.set(True)
+    try:
+        results = await fanOut(conn, parts, BATCH_MAX_CONNECTIONS)
+    finally:
+        IN_BATCH.reset(token)
+
+    payload = {"responses": [results[i] for i in range(len(subs))]}
+    payload = await encryptForUser(payload, user.email, conn, request.app)
+    return payload
+
+
 @app.get("/connection-test")
 async def connectionTest():
     return {"status": "ok"}
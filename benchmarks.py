@@ -0,0 +1,571 @@
+import asyncio
+import json
+import math
+import sys
+import time
+from uuid import uuid4
+
+import asyncpg
+
+from constants import ASYNCPG_URL
+from pagination import NEXT, PREV, Cursor, Keyset, pageQuery
+
+# Benchmarks and query-plan checks, run against a database built with
+# "python DbManager.py create". Each command works inside one transaction that
+# is rolled back at the end, so the generated rows never stay behind.
+
+
+class Rollback(Exception):
+    pass
+
+
+async def inTransaction(run):
+    conn = await asyncpg.connect(ASYNCPG_URL)
+    try:
+        async with conn.transaction():
+            await run(conn)
+            raise Rollback
+    except Rollback:
+        pass
+    finally:
+        await conn.close()
+
+
+async def timed(label: str, call, repeat: int = 1):
+    # Best of repeat runs, the first one usually pays for cold caches
+    best, result = math.inf, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = await call()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<56} {best * 1000:10.1f} ms")
+    return result
+
+
+def planIndexes(plan) -> set[str]:
+    found = set()
+    if isinstance(plan, dict):
+        if "Index Name" in plan:
+            found.add(plan["Index Name"])
+        for value in plan.values():
+            found |= planIndexes(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            found |= planIndexes(value)
+    return found
+
+
+async def checkPlan(conn, label: str, sql: str, args: list, index: str) -> bool:
+    # Checks that the index can serve the query. Sequential scans are switched
+    # off since the planner rightly prefers them on small tables.
+    await conn.execute("SET LOCAL enable_seqscan = off")
+    try:
+        raw = await conn.fetchval(f"EXPLAIN (FORMAT JSON) {sql}", *args)
+    finally:
+        await conn.execute("SET LOCAL enable_seqscan = on")
+    used = planIndexes(json.loads(raw) if isinstance(raw, str) else raw)
+    ok = index in used
+    note = "" if ok else f" (plan used {', '.join(sorted(used)) or 'no index'})"
+    print(f"{'✅' if ok else '❌'} {label:<54} {index}{note}")
+    return ok
+
+
+async def fixtures(conn) -> dict:
+    # One row of every lookup a project, client or invoice needs
+    tag = uuid4().hex[:8]
+    f = {"tag": tag}
+    for category in ("project", "client", "billing", "invoice"):
+        f[f"{category}_status"] = await conn.fetchval(
+            "INSERT INTO status (category, value) VALUES ($1, $2) RETURNING id", category, f"Bench {tag}"
+        )
+    f["client_type"] = await conn.fetchval("INSERT INTO client_type (value) VALUES ($1) RETURNING id", f"Bench {tag}")
+    f["state"] = await conn.fetchval("INSERT INTO state (name) VALUES ($1) RETURNING id", f"Bench {tag}")
+    f["priority"] = await conn.fetchval(
+        "INSERT INTO project_priority (value, color) VALUES ($1, $1) RETURNING id", f"Bench {tag}"
+    )
+    f["type"] = await conn.fetchval("INSERT INTO project_type (value) VALUES ($1) RETURNING id", f"Bench {tag}")
+    f["trade"] = await conn.fetchval("INSERT INTO project_trade (value) VALUES ($1) RETURNING id", f"Bench {tag}")
+    f["client"] = await conn.fetchval(
+        """
+        INSERT INTO client (
+          company_name, poc_first_name, poc_last_name, type_id, status_id, address_line_1, city, state_id,
+          zip_code, general_onboarding_email, phone_number_main_line, accounting_email,
+          accounting_phone_number, pay_terms, trip_rate, updates, special_notes
+        ) VALUES ($1, 'Bench', 'Client', $2, $3, '1 Main St', 'Springfield', $4, '00000',
+                  $5, '555-0100', $5, '555-0101', 'Net 30', 0, '', '')
+        RETURNING id;
+        """,
+        f"Bench {tag}", f["client_type"], f["client_status"], f["state"], f"bench-{tag}@example.com",
+    )
+    f["user"] = await conn.fetchval(
+        """INSERT INTO "user" (email, first_name, last_name) VALUES ($1, 'Bench', 'User') RETURNING id""",
+        f"bench-user-{tag}@example.com",
+    )
+    return f
+
+
+async def insertProjects(conn, f: dict, rows: int):
+    # created_at is spread over the past so the lists have a realistic order
+    await conn.execute(
+        """
+        INSERT INTO project (
+          client_id, priority_id, type_id, address, address_line1, city, state_id, zip_code, trade_id,
+          status_id, nte, business_name, due_date, date_received, scope_of_work, special_notes,
+          visit_notes, planned_resolution, material_parts_needed, assignee_id, created_at
+        )
+        SELECT $1, $2, $3, g || ' Main St', g || ' Main St', 'Springfield', $4, '00000', $5,
+               $6, 100 + g % 900, 'Bench ' || g, current_date + g % 365, current_date, 'Scope ' || g, '',
+               '', '', '', $7, now() - g * interval '1 second'
+          FROM generate_series(1, $8) g;
+        """,
+        f["client"], f["priority"], f["type"], f["state"], f["trade"], f["project_status"], f["user"], rows,
+    )
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# counts: COUNT(*) OVER() against the count strategies in pagination.py
+# ──────────────────────────────────────────────────────────────────────────────
+
+PAGE_WITH_WINDOW_COUNT_SQL = """
+    SELECT p.*, COUNT(*) OVER() AS total_count
+      FROM project p
+     WHERE p.is_deleted = FALSE
+     ORDER BY p.created_at DESC, p.id DESC
+     LIMIT $1;
+"""
+
+PAGE_SQL = """
+    SELECT p.*
+      FROM project p
+     WHERE p.is_deleted = FALSE
+     ORDER BY p.created_at DESC, p.id DESC
+     LIMIT $1;
+"""
+
+EXACT_COUNT_SQL = "SELECT SUM(total) FROM row_counter WHERE counter=$1 AND scope_key=$2"
+ESTIMATE_COUNT_SQL = "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass($1)"
+
+
+async def benchCounts(rows: int):
+    async def run(conn):
+        f = await fixtures(conn)
+        await timed(f"insert {rows:,} projects", lambda: insertProjects(conn, f, rows))
+        await conn.execute("ANALYZE project")
+        await conn.execute("ANALYZE row_counter")
+
+        await timed("page of 20 + COUNT(*) OVER()", lambda: conn.fetch(PAGE_WITH_WINDOW_COUNT_SQL, 20), 5)
+        await timed("page of 20 + 1 (has_more)", lambda: conn.fetch(PAGE_SQL, 21), 5)
+        total = await timed("exact: row_counter shards", lambda: conn.fetchval(EXACT_COUNT_SQL, "project", "*"), 5)
+        estimate = await timed("estimate: pg_class.reltuples", lambda: conn.fetchval(ESTIMATE_COUNT_SQL, "project"), 5)
+        print(f"exact total {total:,}, estimate {estimate:,}")
+
+        await checkPlan(conn, "page walks the cursor index", PAGE_SQL, [21], "idx_proj_cursor")
+        await checkPlan(conn, "exact count reads the counter key", EXACT_COUNT_SQL, ["project", "*"], "row_counter_pkey")
+
+    await inTransaction(run)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# plans: every paginated list on its cursor index
+# ──────────────────────────────────────────────────────────────────────────────
+
+# (endpoint, keyset, source, where, argument kinds, index). Sources and filters
+# copy the fetchPage calls in app.py, keep them in step. Argument kinds:
+# "id" is any uuid, None a filter left empty.
+PAGE_PLANS = [
+    ("/get-projects", Keyset("project", "p"),
+     "project p JOIN client c ON c.id = p.client_id JOIN status s ON s.id = p.status_id AND s.category = 'project'",
+     ["p.is_deleted = FALSE"], [], "idx_proj_cursor"),
+    ("/get-clients", Keyset("client", "c"),
+     "client c JOIN client_summary cs ON cs.client_id = c.id "
+     "JOIN status s ON s.id = c.status_id AND s.category = 'client' JOIN client_type ct ON ct.id = c.type_id",
+     ["c.is_deleted = FALSE", "($1::numeric IS NULL OR cs.total_collected >= $1)",
+      "($2::numeric IS NULL OR cs.total_collected <= $2)"], [None, None], "idx_client_cursor"),
+    ("/get-clients sort=revenue",
+     Keyset("client_summary", "cs", tsColumn="total_collected", idColumn="client_id", tsType="numeric"),
+     "client c JOIN client_summary cs ON cs.client_id = c.id "
+     "JOIN status s ON s.id = c.status_id AND s.category = 'client' JOIN client_type ct ON ct.id = c.type_id",
+     ["c.is_deleted = FALSE", "($1::numeric IS NULL OR cs.total_collected >= $1)",
+      "($2::numeric IS NULL OR cs.total_collected <= $2)"], [None, None], "idx_client_summary_revenue"),
+    ("/get-billings", Keyset("invoice", "i"),
+     "invoice i JOIN status s ON s.id = i.status_id AND s.category = 'billing' LEFT JOIN document d ON d.id = i.file_id",
+     ["i.is_deleted = FALSE"], [], "idx_invoice_cursor"),
+    ("/get-notifications", Keyset("notification_inbox", "i", idColumn="notification_id"),
+     "notification_inbox i JOIN notification n ON n.id = i.notification_id",
+     ["i.user_id = $1"], ["id"], "idx_notification_inbox_cursor"),
+    ("/get-messages", Keyset("message", "m"), 'message m JOIN "user" u ON u.id = m.sender_id',
+     ["m.project_id = $1", "m.is_deleted = FALSE"], ["id"], "idx_message_project_cursor"),
+    ("/fetch-project-quotes", Keyset("quote", "q"),
+     "quote q JOIN status s ON s.id = q.status_id AND s.category = 'quote'",
+     ["q.project_id = $1", "q.is_deleted = FALSE"], ["id"], "idx_quote_project_cursor"),
+    ("/fetch-project-documents", Keyset("document", "d"), "document d",
+     ["d.project_id = $1", "d.is_deleted = FALSE"], ["id"], "idx_document_project_cursor"),
+    ("/fetch-client-invoices", Keyset("invoice", "i"),
+     "invoice i JOIN status s ON s.id = i.status_id AND s.category = 'invoice'",
+     ["i.client_id = $1", "i.is_deleted = FALSE", "($2::text IS NULL OR i.number::text ILIKE '%' || $2 || '%')"],
+     ["id", None], "idx_invoice_client_cursor"),
+    ("/fetch-client-onboarding-documents", Keyset("document", "d"), "document d",
+     ["d.client_id = $1", "d.purpose = 'onboarding_paperwork'", "d.is_deleted = FALSE",
+      "($2::text IS NULL OR d.file_name ILIKE '%' || $2 || '%')"], ["id", None], "idx_document_client_cursor"),
+    ("/get-insurance-documents", Keyset("document", "d"), "document d",
+     ["d.client_id = $1", "d.purpose = 'insurance'", "d.is_deleted = FALSE",
+      "($2::text IS NULL OR d.file_name ILIKE '%' || $2 || '%')"], ["id", None], "idx_document_client_cursor"),
+    ("/fetch-client-projects", Keyset("project", "p"),
+     "project p JOIN status s ON s.id = p.status_id AND s.category = 'project'",
+     ["p.client_id = $1", "s.value = 'Open'", "p.is_deleted = FALSE",
+      "($2::text IS NULL OR p.business_name ILIKE '%' || $2 || '%')"], ["id", None], "idx_project_client_cursor"),
+    ("/get-passwords", Keyset("client_password", "p", idColumn="user_email", idType="citext"), "client_password p",
+     ["p.client_id = $1"], ["id"], "idx_client_password_cursor"),
+]
+
+
+def samplePosition(keyset: Keyset) -> tuple[str, str]:
+    ts = "1000" if keyset.tsType == "numeric" else "2026-01-01T00:00:00+00:00"
+    return ts, "bench@example.com" if keyset.idType == "citext" else str(uuid4())
+
+
+async def checkPlans() -> bool:
+    failed = 0
+
+    async def run(conn):
+        nonlocal failed
+        for endpoint, keyset, source, where, kinds, index in PAGE_PLANS:
+            args = [uuid4() if kind == "id" else None for kind in kinds]
+            ts, id = samplePosition(keyset)
+            for label, cursor in (
+                    ("first page", None),
+                    ("next page", Cursor(endpoint, NEXT, ts, id)),
+                    ("previous page", Cursor(endpoint, PREV, ts, id)),
+            ):
+                sql, queryArgs = pageQuery(keyset, cursor, select="1", source=source, size=20, where=where, args=args)
+                if not await checkPlan(conn, f"{endpoint} {label}", sql, queryArgs, index):
+                    failed += 1
+
+    await inTransaction(run)
+    print(f"\n{failed} plan check(s) failed" if failed else "\nAll lists run on their cursor index.")
+    return failed == 0
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# onboarding: /save-onboarding-data, row by row against one statement
+# ──────────────────────────────────────────────────────────────────────────────
+
+PRICING_ROWS = 50
+
+
+def onboardingForm(trades: list[str]) -> dict:
+    return {
+        "general": {"organizationType": "LLC", "establishmentYear": 2001, "naicsCode": "238220"},
+        "service": {"coverageArea": "Statewide", "adminStaffCount": 4, "fieldStaffCount": 30},
+        "contact": {"dispatchSupervisor": "Dispatch", "regularContact": "555-0100"},
+        "load": {"averageMonthlyTickets": 120, "monthlyPOCapacity": 200},
+        "tradeCoverage": [{"trade": t, "coverageLevel": "full"} for t in trades],
+        "pricing": [
+            {"label": f"Item {i}", "regular": f"{80 + i}", "after": f"{120 + i}", "isCustom": i >= 40}
+            for i in range(PRICING_ROWS)
+        ],
+        "references": [
+            {"company": f"Ref {i}", "contact": "Contact", "email": f"ref{i}@example.com", "phone": "555-0199"}
+            for i in range(3)
+        ],
+    }
+
+
+async def saveRowByRow(conn, clientId, form: dict):
+    # The save as it was before the set-based statement: one round trip per row
+    async with conn.transaction():
+        g, sv, c, ld = form["general"], form["service"], form["contact"], form["load"]
+        await conn.execute(
+            "INSERT INTO client_onboarding_general (client_id, organization_type, establishment_year, naics_code) "
+            "VALUES ($1,$2,$3,$4) ON CONFLICT (client_id) DO NOTHING",
+            clientId, g["organizationType"], g["establishmentYear"], g["naicsCode"],
+        )
+        await conn.execute(
+            "INSERT INTO client_onboarding_service (client_id, coverage_area, admin_staff_count, field_staff_count) "
+            "VALUES ($1,$2,$3,$4) ON CONFLICT (client_id) DO NOTHING",
+            clientId, sv["coverageArea"], sv["adminStaffCount"], sv["fieldStaffCount"],
+        )
+        await conn.execute(
+            "INSERT INTO client_onboarding_contact (client_id, dispatch_supervisor, regular_hours_contact) "
+            "VALUES ($1,$2,$3) ON CONFLICT (client_id) DO NOTHING",
+            clientId, c["dispatchSupervisor"], c["regularContact"],
+        )
+        await conn.execute(
+            "INSERT INTO client_onboarding_load (client_id, avg_monthly_tickets_last4, monthly_po_capacity) "
+            "VALUES ($1,$2,$3) ON CONFLICT (client_id) DO NOTHING",
+            clientId, ld["averageMonthlyTickets"], ld["monthlyPOCapacity"],
+        )
+        for tc in form["tradeCoverage"]:
+            tradeId = await conn.fetchval("SELECT id FROM project_trade WHERE value=$1 LIMIT 1", tc["trade"])
+            await conn.execute(
+                "INSERT INTO client_trade_coverage (client_id, project_trade_id, coverage_level) VALUES ($1,$2,$3) "
+                "ON CONFLICT (client_id, project_trade_id) DO NOTHING",
+                clientId, tradeId, tc["coverageLevel"].upper(),
+            )
+        for price in form["pricing"]:
+            await conn.execute(
+                "INSERT INTO client_pricing_structure (client_id, item_label, regular_hours_rate, after_hours_rate, "
+                "is_custom) VALUES ($1,$2,$3,$4,$5) ON CONFLICT (client_id, item_label) DO NOTHING",
+                clientId, price["label"], price["regular"], price["after"], price["isCustom"],
+            )
+        for ref in form["references"]:
+            await conn.execute(
+                "INSERT INTO client_references (client_id, company_name, contact_name, contact_email, contact_phone) "
+                "VALUES ($1,$2,$3,$4,$5)",
+                clientId, ref["company"], ref["contact"], ref["email"], ref["phone"],
+            )
+
+
+async def benchOnboarding(repeat: int):
+    # app.py holds the statement and its argument builder
+    from app import SAVE_ONBOARDING_SQL, onboardingSaveArgs
+
+    async def run(conn):
+        f = await fixtures(conn)
+        trades = [r["value"] for r in await conn.fetch("SELECT value FROM project_trade ORDER BY value LIMIT 8")]
+        form = onboardingForm(trades)
+        args = onboardingSaveArgs(f["client"], form)
+        print(f"{PRICING_ROWS} pricing rows, {len(trades)} trades, {len(form['references'])} references")
+
+        async def rowByRow():
+            async with conn.transaction():
+                await saveRowByRow(conn, f["client"], form)
+                raise Rollback
+
+        async def setBased():
+            async with conn.transaction():
+                await conn.execute(SAVE_ONBOARDING_SQL, *args)
+                raise Rollback
+
+        for label, call in (("row by row (previous save)", rowByRow), ("one statement, first save", setBased)):
+            async def once(call=call):
+                try:
+                    await call()
+                except Rollback:
+                    pass
+            await timed(label, once, repeat)
+
+        # Re-saving an unchanged form is the common case once a client is onboarded
+        await conn.execute(SAVE_ONBOARDING_SQL, *args)
+        await timed("one statement, unchanged re-save", lambda: conn.execute(SAVE_ONBOARDING_SQL, *args), repeat)
+        pricing = await conn.fetchval("SELECT count(*) FROM client_pricing_structure WHERE client_id = $1", f["client"])
+        print(f"pricing rows after {repeat + 1} saves: {pricing}")
+
+    await inTransaction(run)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# search: /global-search over a filled search_index
+# ──────────────────────────────────────────────────────────────────────────────
+
+SEARCH_WORDS = [
+    "plumbing", "electrical", "roofing", "hvac", "painting", "flooring", "drywall", "landscaping", "masonry",
+    "carpentry", "glazing", "insulation", "paving", "fencing", "signage", "lighting", "boiler", "chiller",
+    "sprinkler", "elevator", "generator", "compressor", "ductwork", "thermostat", "valve", "faucet", "toilet",
+    "breaker", "panel", "outlet", "gutter", "skylight", "shingle", "membrane", "sealant", "grout", "tile",
+    "carpet", "ceiling", "window", "door", "lock", "hinge", "ramp", "railing", "parking", "storefront",
+    "warehouse", "kitchen", "restroom",
+]
+SEARCH_CLIENTS = 50
+
+FILL_SEARCH_INDEX_SQL = """
+    INSERT INTO search_index (source_table, record_id, client_id, project_id, title, body)
+    SELECT (ARRAY['project', 'client', 'invoice', 'quote', 'document', 'message'])[1 + g % 6],
+           gen_random_uuid(),
+           ($1::uuid[])[1 + g % array_length($1::uuid[], 1)],
+           NULL,
+           'Bench ' || ($2::text[])[1 + g % array_length($2::text[], 1)] || ' ' || g,
+           ($2::text[])[1 + (g * 7) % array_length($2::text[], 1)] || ' '
+             || ($2::text[])[1 + (g * 13) % array_length($2::text[], 1)] || ' ' || md5(g::text)
+      FROM generate_series(1, $3) g;
+"""
+
+
+async def benchSearch(rows: int):
+    # app.py holds the query and the LIKE escaping it is called with
+    from app import GLOBAL_SEARCH_SQL, escapeLike
+
+    async def run(conn):
+        clients = [uuid4() for _ in range(SEARCH_CLIENTS)]
+        await timed(f"fill search_index with {rows:,} rows",
+                    lambda: conn.execute(FILL_SEARCH_INDEX_SQL, clients, SEARCH_WORDS, rows))
+        await conn.execute("ANALYZE search_index")
+
+        terms = [
+            ("common word", "plumbing"),
+            ("two words", "roofing membrane"),
+            ("title and number", f"Bench {rows // 2}"),
+            ("substring only", (await conn.fetchval("SELECT md5($1::text)", str(rows // 3)))[4:14]),
+            ("no match", "zzqxv"),
+        ]
+        for scopeLabel, clientIds in (("all clients", None), ("one client", [clients[0]])):
+            for label, term in terms:
+                args = [term, 5, 20, clientIds, escapeLike(term)]
+                hits = await timed(f"{scopeLabel}, {label}", lambda: conn.fetch(GLOBAL_SEARCH_SQL, *args), 5)
+                print(f"  {len(hits)} hit(s) for {term!r}")
+
+        await checkPlan(conn, "search matches through the tsvector index", GLOBAL_SEARCH_SQL,
+                        ["plumbing", 5, 20, None, "plumbing"], "idx_search_index_tsv")
+        await checkPlan(conn, "search matches through the trigram index", GLOBAL_SEARCH_SQL,
+                        ["plumbing", 5, 20, None, "plumbing"], "idx_search_index_body")
+
+    await inTransaction(run)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# search-triggers: project.search_text with row against statement triggers
+# ──────────────────────────────────────────────────────────────────────────────
+
+STALE_SEARCH_TEXT_SQL = """
+    SELECT count(*) FROM project p
+     WHERE p.client_id = $1 AND p.search_text IS DISTINCT FROM project_search_text(p);
+"""
+
+
+async def benchSearchTriggers(rows: int):
+    from DbManager import PROJECT_SEARCH_TRIGGERS
+
+    async def run(conn):
+        f = await fixtures(conn)
+        for mode, triggers in PROJECT_SEARCH_TRIGGERS.items():
+            try:
+                async with conn.transaction():
+                    await conn.execute(triggers)
+                    await timed(f"{mode}: insert {rows:,} projects", lambda: insertProjects(conn, f, rows))
+                    await timed(
+                        f"{mode}: update a search column on {rows:,} projects",
+                        lambda: conn.execute("UPDATE project SET city = 'Shelbyville' WHERE client_id = $1", f["client"]),
+                    )
+                    await timed(
+                        f"{mode}: update no search column on {rows:,} projects",
+                        lambda: conn.execute("UPDATE project SET updated_at = now() WHERE client_id = $1", f["client"]),
+                    )
+                    stale = await conn.fetchval(STALE_SEARCH_TEXT_SQL, f["client"])
+                    print(f"{mode}: {stale} project(s) with stale search_text")
+                    raise Rollback
+            except Rollback:
+                pass
+
+    await inTransaction(run)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# events: one EventHub fanning a message out to idle subscribers
+# ──────────────────────────────────────────────────────────────────────────────
+
+EVENT_ROUNDS = 5
+
+
+class TransactionPool:
+    # Stands in for the hub's pool: its lookups run on the benchmark connection,
+    # which sees the rows of the transaction that is rolled back at the end
+    def __init__(self, conn):
+        self.conn = conn
+
+    def acquire(self):
+        return self
+
+    async def __aenter__(self):
+        return self.conn
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def percentile(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+async def benchEvents(subscribers: int):
+    import tracemalloc
+    from events import MESSAGE_CHANNEL, EventHub, Subscriber
+
+    async def run(conn):
+        f = await fixtures(conn)
+        await insertProjects(conn, f, 1)
+        projectId = await conn.fetchval("SELECT id FROM project WHERE client_id = $1", f["client"])
+
+        hub = EventHub(TransactionPool(conn))
+        await hub.start()
+        await asyncio.sleep(1)  # let the hub's LISTEN connection come up
+
+        # Idle streams as /event-stream keeps them: one subscriber and one task
+        # waiting on its queue. seal is left out, it is per-user encryption.
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        received: list[float] = []
+        subs = [
+            Subscriber(uuid4(), {"message"}, [f["client"]], None, lambda data: data)
+            for _ in range(subscribers)
+        ]
+
+        async def consume(sub):
+            while True:
+                await sub.queue.get()
+                received.append(time.perf_counter())
+
+        consumers = [asyncio.create_task(consume(sub)) for sub in subs]
+        for sub in subs:
+            hub.subscribe(sub)
+        await asyncio.sleep(0)
+        grown = sum(d.size_diff for d in tracemalloc.take_snapshot().compare_to(before, "filename"))
+        tracemalloc.stop()
+        print(f"{subscribers:,} idle subscribers: {grown / 2 ** 20:.1f} MiB, {grown / subscribers:,.0f} bytes each")
+
+        notifier = await asyncpg.connect(ASYNCPG_URL)
+        try:
+            for i in range(EVENT_ROUNDS):
+                messageId = await conn.fetchval(
+                    "INSERT INTO message (project_id, sender_id, content, sender_role) "
+                    "VALUES ($1, $2, $3, 'employee_admin') RETURNING id",
+                    projectId, f["user"], f"Bench message {i}",
+                )
+                received.clear()
+                start = time.perf_counter()
+                # Committed on its own, the message row itself never is
+                await notifier.execute("SELECT pg_notify($1, $2)", MESSAGE_CHANNEL, str(messageId))
+                while len(received) < subscribers and time.perf_counter() - start < 10:
+                    await asyncio.sleep(0.001)
+                latencies = [(t - start) * 1000 for t in received]
+                if len(latencies) < subscribers:
+                    print(f"round {i + 1}: only {len(latencies):,} of {subscribers:,} subscribers reached")
+                    continue
+                print(
+                    f"round {i + 1}: fan-out to {subscribers:,} subscribers p50 {percentile(latencies, 0.5):.1f} ms, "
+                    f"p99 {percentile(latencies, 0.99):.1f} ms, last {max(latencies):.1f} ms"
+                )
+        finally:
+            await notifier.close()
+            for task in consumers:
+                task.cancel()
+            await asyncio.gather(*consumers, return_exceptions=True)
+            await hub.stop()
+
+    await inTransaction(run)
+
+
+def print_usage():
+    print(
+        "Usage:\n  python benchmarks.py counts [rows]\n  python benchmarks.py plans"
+        "\n  python benchmarks.py onboarding [repeat]\n  python benchmarks.py search [rows]"
+        "\n  python benchmarks.py search-triggers [rows]\n  python benchmarks.py events [subscribers]"
+    )
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command == "counts":
+        asyncio.run(benchCounts(int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000))
+    elif command == "onboarding":
+        asyncio.run(benchOnboarding(int(sys.argv[2]) if len(sys.argv) > 2 else 20))
+    elif command == "search":
+        asyncio.run(benchSearch(int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000))
+    elif command == "search-triggers":
+        asyncio.run(benchSearchTriggers(int(sys.argv[2]) if len(sys.argv) > 2 else 100_000))
+    elif command == "events":
+        asyncio.run(benchEvents(int(sys.argv[2]) if len(sys.argv) > 2 else 5000))
+    elif command == "plans":
+        sys.exit(0 if asyncio.run(checkPlans()) else 1)
+    else:
+        print_usage()
@@ -37,7 +37,7 @@ import {
 import { GoKebabHorizontal } from "react-icons/go";
 import { ArrowUpDown, ArrowUp, ArrowDown } from "lucide-react";
 import { useRouter } from "next/router";
-import { encryptPost, decryptPost } from "@/lib/apiClient";
+import { conditionalPost } from "@/lib/apiClient";
 import CurrencyFormat from "react-currency-format";
 
 export type DocumentData = {
@@ -141,8 +141,7 @@ function ClientsTable({ onTableReady }: ClientsTableProps) {
   React.useEffect(() => {
     const load = async () => {
       try {
-        const r = await encryptPost("/get-clients", { size: pageSize });
-        const d = await decryptPost<any>(r);
+        const d = await conditionalPost<any>("/get-clients", { size: pageSize });
         if (d) {
           setData(
             d.clients.map((c: any) => ({
@@ -65,11 +65,13 @@ export interface Notification {
   id: string;
   createdAt: string;
   message: string;
+  unread: boolean;
 }
 
 export interface NotificationsResponse {
   notifications: Notification[];
   totalCount: number;
+  unreadCount: number;
   pageSize: number;
   lastSeenCreatedAt: string | null;
   lastSeenId: string | null;
@@ -92,8 +94,8 @@ export async function getDashboardMetrics() {
   };
 }
 
-export function getCalendarEvents(month: number) {
-  return fetchJson<{ events: any[] }>("/get-calendar-events", { month });
+export function getCalendarEvents(year: number, month: number) {
+  return fetchJson<{ events: any[] }>("/get-calendar-events", { year, month });
 }
 
 export async function getNotifications(
@@ -110,15 +112,25 @@ export async function getNotifications(
     notifications: data.notifications.map((n: any) => ({
       id: n.id,
       createdAt: n.created_at,
-      message: n.message,
+      message: n.content,
+      unread: n.unread,
     })),
     totalCount: data.total_count,
+    unreadCount: data.unread_count,
     pageSize: data.page_size,
     lastSeenCreatedAt: data.last_seen_created_at,
     lastSeenId: data.last_seen_id,
   } as NotificationsResponse;
 }
 
+export function markNotificationsRead(ids: string[], unread = false) {
+  return fetchJson<{ updated: number; unread_count: number }>("/mark-notifications-read", { ids, unread });
+}
+
+export function markAllNotificationsRead() {
+  return fetchJson<{ updated: number; unread_count: number }>("/mark-notifications-read", { all: true });
+}
+
 export async function getProfileDetails() {
   const data = await fetchJson<{ first_name: string; hex_color: string }>(
     "/get-profile-details"
@@ -274,15 +286,25 @@ const Header: FC<IProps> = ({ title }) => {
   }, [searchTerm]);
 
   const handleMarkRead = (id) => {
+    const target = notifs.find((n) => n.id === id);
     setNotifs((prev) =>
       prev.map((n) => (n.id === id ? { ...n, unread: !n.unread } : n))
     );
+    if (target) {
+      markNotificationsRead([id], !target.unread).catch((err) =>
+        console.error("mark notification failed:", err)
+      );
+    }
   };
   const handleMarkAllRead = () => {
     const anyUnread = notifs.some((n) => n.unread);
     setNotifs((prev) =>
       prev.map((n) => ({ ...n, unread: anyUnread ? false : true }))
     );
+    const request = anyUnread
+      ? markAllNotificationsRead()
+      : markNotificationsRead(notifs.map((n) => n.id), true);
+    request.catch((err) => console.error("mark notifications failed:", err));
   };
 
   useEffect(() => {
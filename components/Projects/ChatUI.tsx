@@ -4,6 +4,7 @@ import { Paperclip, Send, User } from "lucide-react";
 import MessageBubble from "@/components/Projects/MessageBubble";
 import { ScrollArea } from "@/components/ui/scroll-area";
 import { encryptPost, decryptPost } from "@/lib/apiClient";
+import { subscribeEvents } from "@/lib/eventStream";
 import { useAuth } from "@/lib/authContext";
 
 type Attachment = {
@@ -24,14 +25,35 @@ type Message = {
   attachments?: Attachment[];
 };
 
+const toMessage = (m: any): Message => ({
+  id: m.id,
+  text: m.content,
+  senderEmail: m.sender_email,
+  senderRole: m.sender_role,
+  timestamp: new Date(m.created_at).toLocaleTimeString([], { hour: "2-digit", minute: "2-digit", hour12: true }),
+  date: new Date(m.created_at),
+  mentions: m.mentions || [],
+});
 
-export default function ChatUI({ projectId, clientname, clientId }: { projectId: string; clientname: string; clientId?: string }) {
+
+export default function ChatUI({
+  projectId,
+  clientname,
+  clientId,
+  initialPage,
+}: {
+  projectId: string;
+  clientname: string;
+  clientId?: string;
+  initialPage?: any; // first /get-messages page, already loaded by /get-project-view
+}) {
     const { email, isClient, role } = useAuth();
   const [allMessages, setAllMessages] = useState<Message[]>([]);
   const [visibleCount, setVisibleCount] = useState(20);
   const [input, setInput] = useState("");
   const [isLoading, setIsLoading] = useState(false);
   const [cursor, setCursor] = useState<{ ts?: string; id?: string }>({});
+  const [reloadKey, setReloadKey] = useState(0);
   const [messageType, setMessageType] = useState<"internal" | "all">(
     isClient ? "all" : "internal"
   );
@@ -64,20 +86,13 @@ export default function ChatUI({ projectId, clientname, clientId }: { projectId:
   useEffect(() => {
     const load = async () => {
       try {
-        const r = await encryptPost("/get-messages", { projectId, size: 20 });
-        const j = await decryptPost<any>(r);
+        let j = reloadKey === 0 ? initialPage : undefined;
+        if (!j) {
+          const r = await encryptPost("/get-messages", { projectId, size: 20 });
+          j = await decryptPost<any>(r);
+        }
         if (j) {
-          setAllMessages(
-            j.messages.map((m: any) => ({
-              id: m.id,
-              text: m.content,
-              senderEmail: m.sender_email,
-              senderRole: m.sender_role,
-              timestamp: new Date(m.created_at).toLocaleTimeString([], { hour: "2-digit", minute: "2-digit", hour12: true }),
-              date: new Date(m.created_at),
-              mentions: m.mentions || [],
-            }))
-          );
+          setAllMessages(j.messages.map(toMessage));
           setCursor({ ts: j.last_seen_created_at || undefined, id: j.last_seen_id || undefined });
           setVisibleCount(20);
         }
@@ -86,7 +101,33 @@ export default function ChatUI({ projectId, clientname, clientId }: { projectId:
       }
     };
     load();
-  }, [projectId]);
+  }, [projectId, reloadKey, initialPage]);
+
+  useEffect(() => {
+    return subscribeEvents(
+      {
+        message: (m) => {
+          const incoming = toMessage(m);
+          setAllMessages((prev) => {
+            if (prev.some((p) => p.id === incoming.id)) return prev;
+            // our own message is already shown optimistically without an id
+            const pending = prev.findIndex(
+              (p) => !p.id && p.senderEmail === incoming.senderEmail && p.text === incoming.text
+            );
+            if (pending >= 0) {
+              const next = [...prev];
+              next[pending] = incoming;
+              return next;
+            }
+            return [...prev, incoming];
+          });
+          if (incoming.senderEmail !== email) setVisibleCount((c) => c + 1);
+        },
+        resync: () => setReloadKey((k) => k + 1),
+      },
+      projectId
+    );
+  }, [projectId, email]);
 
   const filteredMessages =
     messageType === "employee"
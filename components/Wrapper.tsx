@@ -11,6 +11,7 @@ import {
   type ProfileDetails,
   fetchWithRetry,
 } from "@/components/Header";
+import { subscribeEvents } from "@/lib/eventStream";
 
 let wrapperCache: {
   notifications: WrapperData["notifications"];
@@ -67,7 +68,7 @@ const Wrapper: FC<IProps> = ({ children, title, initialChildLoading = false }) =
                 id: n.id,
                 message: n.message,
                 time: new Date(n.createdAt).toLocaleString(),
-                unread: true,
+                unread: n.unread,
                 avatar: (
                   <div
                     className="flex h-8 w-8 items-center justify-center rounded-full text-white text-base font-medium cursor-pointer"
@@ -101,6 +102,33 @@ const Wrapper: FC<IProps> = ({ children, title, initialChildLoading = false }) =
       .finally(() => setChildLoading(false));
   }, []);
 
+  useEffect(() => {
+    return subscribeEvents({
+      notification: (n) => {
+        setUserData((prev) => {
+          if (prev.notifications.some((p) => p.id === n.id)) return prev;
+          const item = {
+            id: n.id,
+            message: n.content,
+            time: new Date(n.created_at).toLocaleString(),
+            unread: n.unread,
+            avatar: (
+              <div
+                className="flex h-8 w-8 items-center justify-center rounded-full text-white text-base font-medium cursor-pointer"
+                style={{ backgroundColor: prev.avatarColor }}
+              >
+                <span className="-mt-[2px]">{prev.userName.charAt(0)}</span>
+              </div>
+            ),
+          };
+          const data = { ...prev, notifications: [item, ...prev.notifications] };
+          wrapperCache = data;
+          return data;
+        });
+      },
+    });
+  }, []);
+
 
   return (
     <WrapperContext.Provider value={{
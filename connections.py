@@ -0,0 +1,454 @@
+import asyncio
+import bisect
+import os
+import socket
+import time
+from typing import Awaitable, Callable
+
+from asyncpg import Connection, Pool
+from fastapi.responses import JSONResponse
+
+WORKER = f"{socket.gethostname()}:{os.getpid()}"
+
+# Upper bounds (ms) of the histogram buckets, the last bucket is open
+BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+# Backpressure, see PoolGate and InFlightLimit
+POOL_ACQUIRE_TIMEOUT_SECONDS = 2.0
+MAX_POOL_WAITERS = 100  # requests queued for a connection before new ones are turned away
+MAX_IN_FLIGHT = 256  # concurrent requests per worker
+RETRY_AFTER_SECONDS = 1
+# Health checks must see a live worker, not a busy one. Event streams are
+# long-lived and idle, they would use up the cap without doing any work.
+UNLIMITED_PATHS = {"/connection-test", "/event-stream"}
+
+
+class PoolSaturated(Exception):
+    # Mapped to 503 + Retry-After by the handlers registered in app.py, also when
+    # an endpoint wrapped it into a 500 HTTPException
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class Histogram:
+    def __init__(self):
+        self.count = 0
+        self.totalMs = 0.0
+        self.maxMs = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def record(self, seconds: float):
+        ms = seconds * 1000
+        self.count += 1
+        self.totalMs += ms
+        self.maxMs = max(self.maxMs, ms)
+        self.buckets[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.totalMs / self.count, 2) if self.count else 0.0,
+            "max_ms": round(self.maxMs, 2),
+            "total_ms": round(self.totalMs, 2),
+            "histogram": dict(zip([f"le_{b}" for b in BUCKETS_MS] + ["inf"], self.buckets)),
+        }
+
+
+class RouteStats:
+    # Per-route pool hold times of this worker, see /admin/pool-stats
+    def __init__(self):
+        self.routes: dict[str, Histogram] = {}
+
+    def record(self, route: str, seconds: float):
+        h = self.routes.get(route)
+        if h is None:
+            h = self.routes[route] = Histogram()
+        h.record(seconds)
+
+    def snapshot(self) -> dict:
+        routes = sorted(self.routes.items(), key=lambda kv: -kv[1].totalMs)
+        return {"worker": WORKER, "routes": {route: h.snapshot() for route, h in routes}}
+
+
+class PoolGate:
+    # Bounded wait for a pooled connection. A request either gets one within
+    # POOL_ACQUIRE_TIMEOUT_SECONDS or fails fast with PoolSaturated, and once
+    # MAX_POOL_WAITERS requests are queued new ones do not queue at all.
+    def __init__(self, pool: Pool):
+        self.pool = pool
+        self.waiting = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.waits = Histogram()
+
+    async def acquire(self) -> Connection:
+        if self.waiting >= MAX_POOL_WAITERS:
+            self.rejected += 1
+            raise PoolSaturated("pool queue full")
+        self.waiting += 1
+        started = time.perf_counter()
+        try:
+            return await self.pool.acquire(timeout=POOL_ACQUIRE_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise PoolSaturated("pool acquire timed out")
+        finally:
+            self.waiting -= 1
+            self.waits.record(time.perf_counter() - started)
+
+    def snapshot(self) -> dict:
+        return {
+            "size": self.pool.get_size(),
+            "idle": self.pool.get_idle_size(),
+            "max": self.pool.get_max_size(),
+            "waiting": self.waiting,
+            "max_waiting": MAX_POOL_WAITERS,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "wait": self.waits.snapshot(),
+        }
+
+
+class InFlightStats:
+    def __init__(self):
+        self.inFlight = 0
+        self.rejected = 0
+
+    def snapshot(self) -> dict:
+        return {"in_flight": self.inFlight, "max_in_flight": MAX_IN_FLIGHT, "rejected": self.rejected}
+
+
+class InFlightLimit:
+    # ASGI middleware capping concurrent HTTP requests per worker. Requests over
+    # the cap get an immediate 503 + Retry-After, which LoadBalancer.py takes as
+    # "route elsewhere".
+    def __init__(self, app, stats: InFlightStats):
+        self.app = app
+        self.stats = stats
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in UNLIMITED_PATHS:
+            return await self.app(scope, receive, send)
+        if self.stats.inFlight >= MAX_IN_FLIGHT:
+            self.stats.rejected += 1
+            return await saturatedResponse("too many requests in flight")(scope, receive, send)
+        self.stats.inFlight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.stats.inFlight -= 1
+
+
+def saturatedResponse(reason: str) -> JSONResponse:
+    return JSONResponse(
+        {"detail": f"Server busy: {reason}"},
+        status_code=503,
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+    )
+
+
+class DeadlineExceeded(Exception):
+    # Mapped to 504 in app.py, like PoolSaturated also through a wrapping 500
+    pass
+
+
+class ClientDisconnected(Exception):
+    pass
+
+
+class DisconnectWatch:
+    # ASGI middleware that reads the client's messages in the background so a
+    # disconnect is noticed while the endpoint is still busy. Handlers see it as
+    # scope["disconnected"], an asyncio.Event.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        disconnected = asyncio.Event()
+        messages = asyncio.Queue()
+
+        async def pump():
+            while True:
+                message = await receive()
+                messages.put_nowait(message)
+                if message["type"] == "http.disconnect":
+                    disconnected.set()
+                    return
+
+        task = asyncio.create_task(pump())
+        scope["disconnected"] = disconnected
+        try:
+            await self.app(scope, messages.get, send)
+        finally:
+            task.cancel()
+
+
+class BudgetStats:
+    # Per-route budget overruns of this worker, see /admin/route-budgets
+    def __init__(self):
+        self.routes: dict[str, dict] = {}
+
+    def route(self, route: str) -> dict:
+        r = self.routes.get(route)
+        if r is None:
+            r = self.routes[route] = {
+                "requests": 0,
+                "overruns": 0,
+                "timeouts": 0,
+                "disconnects": 0,
+                "worst_ms": 0.0,
+                "last_timed_out_query": None,
+            }
+        return r
+
+    def snapshot(self) -> dict:
+        routes = sorted(self.routes.items(), key=lambda kv: (-kv[1]["overruns"], -kv[1]["worst_ms"]))
+        return {"worker": WORKER, "routes": dict(routes)}
+
+
+class Budget:
+    # Latency budget of one request: the route's allowance, cut short by the
+    # load balancer's X-Request-Deadline (epoch seconds) when that is sooner.
+    # Every query runs with the time that is left as its timeout.
+    def __init__(self, route: str, seconds: float, stats: BudgetStats, deadline: float | None = None,
+                 disconnected: asyncio.Event | None = None):
+        self.route = route
+        self.seconds = seconds
+        self.stats = stats
+        self.disconnected = disconnected
+        self.started = time.monotonic()
+        self.expires = self.started + seconds
+        if deadline is not None:
+            self.expires = min(self.expires, self.started + deadline - time.time())
+
+    def remaining(self) -> float:
+        left = self.expires - time.monotonic()
+        if left <= 0:
+            raise DeadlineExceeded(f"{self.route} exceeded its {self.seconds}s budget")
+        return left
+
+    def timedOut(self, query: str):
+        r = self.stats.route(self.route)
+        r["timeouts"] += 1
+        r["last_timed_out_query"] = " ".join(query.split())[:300]
+
+    def finish(self):
+        elapsedMs = (time.monotonic() - self.started) * 1000
+        r = self.stats.route(self.route)
+        r["requests"] += 1
+        r["worst_ms"] = round(max(r["worst_ms"], elapsedMs), 2)
+        if elapsedMs > self.seconds * 1000:
+            r["overruns"] += 1
+        if self.disconnected is not None and self.disconnected.is_set():
+            r["disconnects"] += 1
+
+
+def gaveUp(fut: asyncio.Future) -> bool:
+    # The query was abandoned for reasons of the caller that ran it
+    return fut.done() and (fut.cancelled() or isinstance(fut.exception(), (ClientDisconnected, DeadlineExceeded)))
+
+
+class SingleFlight:
+    # Concurrent identical reads share one execution: the first caller runs the
+    # query, callers arriving while it is in flight wait for its result. Rows
+    # are shared before any per-user encryption. If the first caller gives up
+    # (disconnect, its own deadline) the others run the query themselves.
+    def __init__(self):
+        self.inflight: dict[tuple, asyncio.Future] = {}
+        self.routes: dict[str, dict] = {}
+
+    def route(self, route: str) -> dict:
+        r = self.routes.get(route)
+        if r is None:
+            r = self.routes[route] = {"executed": 0, "coalesced": 0}
+        return r
+
+    async def do(self, route: str, key: tuple, call: Callable[[], Awaitable]):
+        fut = self.inflight.get(key)
+        if fut is not None:
+            try:
+                result = await asyncio.shield(fut)
+            except (asyncio.CancelledError, ClientDisconnected, DeadlineExceeded):
+                if not gaveUp(fut):
+                    raise
+                return await self.do(route, key, call)
+            self.route(route)["coalesced"] += 1
+            return list(result) if isinstance(result, list) else result
+
+        fut = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting, do not warn about an unretrieved exception
+        fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self.inflight[key] = fut
+        self.route(route)["executed"] += 1
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            if self.inflight.get(key) is fut:
+                del self.inflight[key]
+        fut.set_result(result)
+        return result
+
+    def snapshot(self) -> dict:
+        routes = sorted(self.routes.items(), key=lambda kv: -kv[1]["coalesced"])
+        return {
+            "in_flight": len(self.inflight),
+            "executed": sum(r["executed"] for r in self.routes.values()),
+            "coalesced": sum(r["coalesced"] for r in self.routes.values()),
+            "routes": dict(routes),
+        }
+
+
+class LazyTransaction:
+    def __init__(self, lazy: "LazyConnection", kwargs: dict):
+        self.lazy = lazy
+        self.kwargs = kwargs
+        self.tx = None
+
+    async def __aenter__(self):
+        conn = await self.lazy.connection()
+        self.tx = conn.transaction(**self.kwargs)
+        self.lazy.depth += 1
+        try:
+            return await self.tx.__aenter__()
+        except BaseException:
+            self.lazy.depth -= 1
+            raise
+
+    async def __aexit__(self, *exc):
+        try:
+            return await self.tx.__aexit__(*exc)
+        finally:
+            self.lazy.depth -= 1
+
+
+class LazyConnection:
+    # Stands in for an asyncpg Connection in request handlers. A pooled
+    # connection is checked out on the first query and handed back by release(),
+    # which encryptForUser calls once the last query of an endpoint has run, or
+    # at the end of the request. Routes that never query never take a slot.
+    def __init__(self, acquire: Callable[[], Awaitable[tuple[Connection, Callable]]], route: str,
+                 stats: RouteStats, budget: Budget, flight: SingleFlight | None = None, pool: str = "primary"):
+        self.acquire = acquire
+        self.route = route
+        self.stats = stats
+        self.budget = budget
+        # Reads are coalesced through flight once flightScope (the caller's
+        # authorization scope) is known, see getCurrentUser in app.py
+        self.flight = flight
+        self.pool = pool
+        self.flightScope: str | None = None
+        self.conn: Connection | None = None
+        self.releaseTo = None
+        self.since = 0.0
+        self.depth = 0
+
+    async def connection(self) -> Connection:
+        if self.conn is None:
+            self.conn, self.releaseTo = await self.acquire()
+            self.since = time.perf_counter()
+        return self.conn
+
+    async def release(self, force: bool = False):
+        # Inside a transaction the connection has to stay checked out
+        if self.conn is None or (self.depth and not force):
+            return
+        conn, releaseTo = self.conn, self.releaseTo
+        self.conn = self.releaseTo = None
+        self.stats.record(self.route, time.perf_counter() - self.since)
+        await releaseTo(conn)
+
+    def transaction(self, **kwargs) -> LazyTransaction:
+        return LazyTransaction(self, kwargs)
+
+    async def read(self, method: str, query: str, *args, **kwargs):
+        if self.flight is None or self.flightScope is None or self.depth or kwargs:
+            return await self.run(method, query, *args, **kwargs)
+        key = (self.pool, self.flightScope, method, query, tuple(map(repr, args)))
+        return await self.flight.do(self.route, key, lambda: self.run(method, query, *args))
+
+    async def run(self, method: str, query: str, *args, **kwargs):
+        # asyncpg cancels the statement on the server when the timeout hits or
+        # when the awaiting task is cancelled
+        conn = await self.connection()
+        kwargs["timeout"] = self.budget.remaining()
+        call = asyncio.ensure_future(getattr(conn, method)(query, *args, **kwargs))
+        disconnected = self.budget.disconnected
+        try:
+            if disconnected is None:
+                return await call
+            waiter = asyncio.ensure_future(disconnected.wait())
+            try:
+                await asyncio.wait({call, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                waiter.cancel()
+            if not call.done():
+                call.cancel()
+                await asyncio.gather(call, return_exceptions=True)
+                raise ClientDisconnected()
+            return call.result()
+        except asyncio.TimeoutError:
+            self.budget.timedOut(query)
+            raise DeadlineExceeded(f"{self.route} exceeded its {self.budget.seconds}s budget")
+        except asyncio.CancelledError:
+            call.cancel()
+            raise
+
+    async def execute(self, query: str, *args, **kwargs):
+        return await self.run("execute", query, *args, **kwargs)
+
+    async def executemany(self, command: str, args, **kwargs):
+        return await self.run("executemany", command, args, **kwargs)
+
+    async def fetch(self, query: str, *args, **kwargs):
+        return await self.read("fetch", query, *args, **kwargs)
+
+    async def fetchrow(self, query: str, *args, **kwargs):
+        return await self.read("fetchrow", query, *args, **kwargs)
+
+    async def fetchval(self, query: str, *args, **kwargs):
+        return await self.read("fetchval", query, *args, **kwargs)
+
+    def sibling(self) -> "LazyConnection":
+        # Another slot from the same pool under the same budget, for running
+        # independent queries of one request side by side (see fanOut)
+        lazy = LazyConnection(self.acquire, self.route, self.stats, self.budget, self.flight, self.pool)
+        lazy.flightScope = self.flightScope
+        return lazy
+
+
+async def fanOut(conn: LazyConnection, parts: dict[str, Callable[[LazyConnection], Awaitable]], limit: int) -> dict:
+    # Runs parts concurrently on at most limit pooled connections, conn being
+    # one of them, and returns their results by name. The first failure cancels
+    # the rest and is raised.
+    free = asyncio.Queue()
+    free.put_nowait(conn)
+    siblings = [conn.sibling() for _ in range(min(limit, len(parts)) - 1)]
+    for s in siblings:
+        free.put_nowait(s)
+
+    async def run(part):
+        c = await free.get()
+        try:
+            return await part(c)
+        finally:
+            free.put_nowait(c)
+
+    tasks = {name: asyncio.ensure_future(run(part)) for name, part in parts.items()}
+    try:
+        await asyncio.gather(*tasks.values())
+        return {name: task.result() for name, task in tasks.items()}
+    finally:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        for s in siblings:
+            await s.release(force=True)
@@ -0,0 +1,200 @@
+import asyncio
+import json
+from typing import Callable
+from uuid import UUID
+
+import asyncpg
+from asyncpg import Pool
+from fastapi.encoders import jsonable_encoder
+
+from constants import ASYNCPG_URL
+
+# Channels NOTIFYed by triggers in DbManager.py. Payloads carry only ids, the
+# rows are read once per worker and then fanned out to its subscribers.
+MESSAGE_CHANNEL = "project_message"
+NOTIFICATION_CHANNEL = "new_notification_row"
+
+TOPICS = ("message", "notification")
+
+QUEUE_SIZE = 100  # undelivered frames per subscriber before it is told to resync
+DISPATCH_BATCH = 200  # NOTIFYs folded into one lookup query
+KEEPALIVE_SECONDS = 25
+RECONNECT_SECONDS = 5
+
+MESSAGE_EVENTS_SQL = """
+    SELECT m.id,
+           m.created_at,
+           m.updated_at,
+           m.content,
+           m.sender_id,
+           m.sender_role,
+           m.project_id,
+           p.client_id,
+           u.email      AS sender_email,
+           u.first_name AS sender_first_name,
+           u.last_name  AS sender_last_name,
+           m.mentions,
+           m.file_attachment_id
+      FROM message m
+      JOIN project p ON p.id = m.project_id
+      JOIN "user" u ON u.id = m.sender_id
+     WHERE m.id = ANY($1::uuid[])
+       AND m.is_deleted = FALSE
+     ORDER BY m.created_at, m.id;
+"""
+
+NOTIFICATION_EVENTS_SQL = """
+    SELECT i.user_id, n.*, i.read_at, i.read_at IS NULL AS unread
+      FROM notification_inbox i
+      JOIN notification n ON n.id = i.notification_id
+     WHERE i.notification_id = ANY($1::uuid[])
+       AND i.user_id = ANY($2::uuid[])
+     ORDER BY n.created_at, n.id;
+"""
+
+
+def frame(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class Subscriber:
+    # One open event stream. topics is a subset of TOPICS, clientIds is None for
+    # users who may see every client (see authorizedClientIds in app.py),
+    # projectId narrows messages to one project's chat, seal encrypts a payload
+    # for this user.
+    def __init__(self, userId: UUID, topics: set[str], clientIds: list[UUID] | None, projectId: UUID | None,
+                 seal: Callable[[dict], dict]):
+        self.userId = userId
+        self.topics = topics
+        self.clientIds = None if clientIds is None else set(clientIds)
+        self.projectId = projectId
+        self.seal = seal
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.closed = False
+
+    def wantsMessage(self, clientId: UUID, projectId: UUID) -> bool:
+        if "message" not in self.topics:
+            return False
+        if self.projectId and self.projectId != projectId:
+            return False
+        return self.clientIds is None or clientId in self.clientIds
+
+    def push(self, event: str, data: dict):
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(frame(event, self.seal(data)))
+        except asyncio.QueueFull:
+            # A client this far behind refetches instead of replaying the backlog
+            self.resync()
+
+    def resync(self):
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(frame("resync", {}))
+        self.closed = True
+
+    async def frames(self):
+        while not self.closed or not self.queue.empty():
+            try:
+                yield await asyncio.wait_for(self.queue.get(), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+
+
+class EventHub:
+    # One LISTEN connection per worker feeds every event stream the worker serves
+    def __init__(self, pool: Pool):
+        self.pool = pool
+        self.subscribers: dict[UUID, set[Subscriber]] = {}
+        self.pending = asyncio.Queue()
+        self.tasks = []
+
+    async def start(self):
+        self.tasks = [asyncio.create_task(self.listen()), asyncio.create_task(self.dispatch())]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        for subs in self.subscribers.values():
+            for sub in subs:
+                sub.resync()
+
+    def subscribe(self, sub: Subscriber):
+        self.subscribers.setdefault(sub.userId, set()).add(sub)
+
+    def unsubscribe(self, sub: Subscriber):
+        subs = self.subscribers.get(sub.userId)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self.subscribers[sub.userId]
+
+    def onNotify(self, conn, pid, channel, payload):
+        self.pending.put_nowait((channel, payload))
+
+    async def listen(self):
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(dsn=ASYNCPG_URL)
+                lost = asyncio.Event()
+                conn.add_termination_listener(lambda _: lost.set())
+                await conn.add_listener(MESSAGE_CHANNEL, self.onNotify)
+                await conn.add_listener(NOTIFICATION_CHANNEL, self.onNotify)
+                print(f"[events] listening on '{MESSAGE_CHANNEL}', '{NOTIFICATION_CHANNEL}'")
+                await lost.wait()
+            except (OSError, asyncpg.PostgresError) as e:
+                print(f"[events] listener error: {e}")
+            finally:
+                if conn and not conn.is_closed():
+                    await conn.close()
+            # Anything NOTIFYed while we were away is lost, let clients refetch
+            for subs in list(self.subscribers.values()):
+                for sub in list(subs):
+                    sub.resync()
+            await asyncio.sleep(RECONNECT_SECONDS)
+
+    async def dispatch(self):
+        while True:
+            batch = [await self.pending.get()]
+            while not self.pending.empty() and len(batch) < DISPATCH_BATCH:
+                batch.append(self.pending.get_nowait())
+            if not self.subscribers:
+                continue
+
+            messageIds, notificationIds = [], []
+            for channel, payload in batch:
+                try:
+                    if channel == MESSAGE_CHANNEL:
+                        messageIds.append(UUID(payload))
+                    else:
+                        notificationIds.append(UUID(json.loads(payload)["id"]))
+                except (ValueError, KeyError, TypeError):
+                    print(f"[events] bad payload on '{channel}': {payload[:200]}")
+
+            try:
+                async with self.pool.acquire() as conn:
+                    messages = await conn.fetch(MESSAGE_EVENTS_SQL, messageIds) if messageIds else []
+                    notifications = await conn.fetch(
+                        NOTIFICATION_EVENTS_SQL, notificationIds, list(self.subscribers)
+                    ) if notificationIds else []
+            except Exception as e:
+                print(f"[events] dispatch failed: {e}")
+                continue
+
+            for r in messages:
+                data = jsonable_encoder(dict(r))
+                for subs in list(self.subscribers.values()):
+                    for sub in list(subs):
+                        if sub.wantsMessage(r["client_id"], r["project_id"]):
+                            sub.push("message", data)
+
+            for r in notifications:
+                data = dict(r)
+                userId = data.pop("user_id")
+                data = jsonable_encoder(data)
+                for sub in list(self.subscribers.get(userId, ())):
+                    if "notification" in sub.topics:
+                        sub.push("notification", data)
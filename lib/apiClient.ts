@@ -183,4 +183,52 @@ export function decryptPost<T>(res: Response): Promise<T | null> {
   return decryptResponse<T>(res);
 }
 
+// Last response per request for endpoints that send an "etag". Repeating a
+// request sends it back as ifNoneMatch; a not_modified answer reuses the body.
+const etagCache = new Map<string, { etag: string; body: any }>();
+
+export async function conditionalPost<T>(path: string, data: any): Promise<T | null> {
+  const key = `${path}:${JSON.stringify(data)}`;
+  const cached = etagCache.get(key);
+  const r = await encryptRequest(path, cached ? { ...data, ifNoneMatch: cached.etag } : data, "POST");
+  const j = await decryptResponse<any>(r);
+  if (j?.not_modified && cached) return cached.body as T;
+  if (j?.etag) etagCache.set(key, { etag: j.etag, body: j });
+  return j as T;
+}
+
+export type BatchResponse = { path: string; status: number; body?: any; detail?: any };
+
+// Several read endpoints in one encrypted round trip (see /batch in app.py).
+// Results come back in request order; a failed entry has status and detail.
+export async function batchPost(
+  requests: { path: string; body?: any; query?: Record<string, any> }[]
+): Promise<BatchResponse[]> {
+  const r = await encryptRequest("/batch", { requests }, "POST");
+  const j = await decryptResponse<{ responses: BatchResponse[] }>(r);
+  return j?.responses || [];
+}
+
+export type SyncChange =
+  | { op: "upsert"; row: any }
+  | { op: "delete"; id: string; deleted_at: string };
+
+// Changes to one entity since a cursor from an earlier call (see /get-changes
+// in app.py), every page of them in order. Keep the returned cursor for the
+// next call; without one the first call returns every live row.
+export async function pullChanges(
+  entity: "project" | "client" | "invoice",
+  cursor?: string | null
+): Promise<{ changes: SyncChange[]; cursor: string | null }> {
+  const changes: SyncChange[] = [];
+  for (;;) {
+    const r = await encryptRequest("/get-changes", { entity, cursor }, "POST");
+    const j = await decryptResponse<{ changes: SyncChange[]; has_more: boolean; next_cursor: string }>(r);
+    if (!j) return { changes, cursor: cursor ?? null };
+    changes.push(...j.changes);
+    cursor = j.next_cursor;
+    if (!j.has_more) return { changes, cursor };
+  }
+}
+
 export { fetchServerKey, encryptRequest, decryptResponse };
@@ -0,0 +1,40 @@
+// lib/eventStream.ts
+import { decryptResponse } from "./apiClient";
+
+export type StreamHandlers = {
+  message?: (m: any) => void;
+  notification?: (n: any) => void;
+  // events were missed (server restart, slow client), refetch what is shown
+  resync?: () => void;
+};
+
+// Opens the /event-stream server-sent event channel. Each event's data is the
+// same encrypted envelope a normal response carries. Returns a close function.
+export function subscribeEvents(handlers: StreamHandlers, projectId?: string) {
+  const params = new URLSearchParams();
+  // only ask for the topics this caller handles
+  params.set("topics", (["message", "notification"] as const).filter((t) => handlers[t]).join(","));
+  if (projectId) params.set("project_id", projectId);
+  const source = new EventSource(
+    `${process.env.NEXT_PUBLIC_BACKEND_URL}/event-stream?${params}`,
+    { withCredentials: true }
+  );
+
+  const listen = (name: keyof StreamHandlers) => {
+    source.addEventListener(name, async (e: MessageEvent) => {
+      const handler = handlers[name];
+      if (!handler) return;
+      try {
+        const data = await decryptResponse<any>(new Response(e.data));
+        (handler as (d: any) => void)(data);
+      } catch (err) {
+        console.error(`event-stream ${name} failed:`, err);
+      }
+    });
+  };
+  listen("message");
+  listen("notification");
+  listen("resync");
+
+  return () => source.close();
+}
@@ -13,7 +13,7 @@ import { z } from "zod";
 import { useForm, Controller } from "react-hook-form";
 import { zodResolver } from "@hookform/resolvers/zod";
 import { Form } from "@/components/ui/form";
-import { encryptPost, decryptPost } from "@/lib/apiClient";
+import { batchPost } from "@/lib/apiClient";
 import { useEffect, useState } from "react";
 
 const formSchema = z.object({
@@ -60,14 +60,15 @@ const NewClient = () => {
     useEffect(() => {
         const load = async () => {
             try {
-                let r = await encryptPost("/get-client-types", {});
-                const ct = await decryptPost<{ client_types: any[] }>(r);
+                const [ct, st, pt] = (
+                    await batchPost([
+                        { path: "/get-client-types" },
+                        { path: "/get-states" },
+                        { path: "/get-pay-terms" },
+                    ])
+                ).map((res) => res.body);
                 setTypes(ct?.client_types || []);
-                r = await encryptPost("/get-states", {});
-                const st = await decryptPost<{ states: any[] }>(r);
                 setStates(st?.states || []);
-                r = await encryptPost("/get-pay-terms", {});
-                const pt = await decryptPost<{ pay_terms: any[] }>(r);
                 setPayTerms(pt?.pay_terms || []);
             } catch (err) {
                 console.error(err);
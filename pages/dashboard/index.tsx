@@ -25,12 +25,14 @@ const { notifications, setChildLoading } = useWrapperData();
     if (dashboardFetched) return;
     dashboardFetched = true;
     setChildLoading(true);
-    const month = new Date().getMonth() + 1;
+    const today = new Date();
+    const year = today.getFullYear();
+    const month = today.getMonth() + 1;
 
     const load = async () => {
       try {
         const [eventsRes, metricsRes] = await Promise.all([
-          fetchWithRetry(() => getCalendarEvents(month)),
+          fetchWithRetry(() => getCalendarEvents(year, month)),
           fetchWithRetry(() => getDashboardMetrics()),
         ]);
 
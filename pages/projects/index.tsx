@@ -24,7 +24,7 @@ import {
   Search,
 } from "lucide-react";
 import Table, { DocumentData } from "@/components/Projects/Table";
-import { encryptPost, decryptPost } from "@/lib/apiClient";
+import { encryptPost, decryptPost, conditionalPost } from "@/lib/apiClient";
 import { Button } from "@/components/ui/button";
 import { TbTableExport } from "react-icons/tb";
 import * as XLSX from "xlsx";
@@ -61,8 +61,7 @@ const Projects = () => {
         r = await encryptPost("/get-project-trades", {});
         const tr = await decryptPost<{ project_trades: any[] }>(r);
         setTrades(tr?.project_trades || []);
-        const pr = await encryptPost("/get-projects", { size: 20 });
-        const pj = await decryptPost<any>(pr);
+        const pj = await conditionalPost<any>("/get-projects", { size: 20 });
         if (pj) {
           setProjects(
             pj.projects.map((r: any) => ({
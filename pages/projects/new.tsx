@@ -22,7 +22,7 @@ import { z } from "zod";
 import { useForm, Controller } from "react-hook-form";
 import { zodResolver } from "@hookform/resolvers/zod";
 import { Form } from "@/components/ui/form";
-import { encryptPost, decryptPost } from "@/lib/apiClient";
+import { encryptPost, decryptPost, batchPost } from "@/lib/apiClient";
 
 // Validation schema
 const formSchema = z.object({
@@ -72,20 +72,19 @@ const NewProject = () => {
   useEffect(() => {
     const load = async () => {
       try {
-        let r = await encryptPost("/get-all-client-admins", {});
-        const c = await decryptPost<{ client_admins: any[] }>(r);
+        const [c, p, t, s, a] = (
+          await batchPost([
+            { path: "/get-all-client-admins" },
+            { path: "/get-project-priorities" },
+            { path: "/get-project-trades" },
+            { path: "/get-states" },
+            { path: "/get-account-managers" },
+          ])
+        ).map((res) => res.body);
         setClients(c?.client_admins || []);
-        r = await encryptPost("/get-project-priorities", {});
-        const p = await decryptPost<{ project_priorities: any[] }>(r);
         setPriorities(p?.project_priorities || []);
-        r = await encryptPost("/get-project-trades", {});
-        const t = await decryptPost<{ project_trades: any[] }>(r);
         setTrades(t?.project_trades || []);
-        r = await encryptPost("/get-states", {});
-        const s = await decryptPost<{ states: any[] }>(r);
         setStates(s?.states || []);
-        r = await encryptPost("/get-account-managers", {});
-        const a = await decryptPost<{ account_managers: any[] }>(r);
         setAssignees(a?.account_managers || []);
       } catch (err) {
         console.error(err);
@@ -67,6 +67,7 @@ const ProjectView = () => {
   } & Record<string, any>;
 
   const [project, setProject] = useState<Project>();
+  const [firstMessages, setFirstMessages] = useState<any>();
   const router = useRouter();
   const { id } = router.query;
 
@@ -80,9 +81,11 @@ const ProjectView = () => {
     const load = async () => {
       if (id && typeof id === "string" && !project) {
         try {
-          const r = await encryptPost("/get-project", { projectId: id });
-          const j = await decryptPost<{ project: any }>(r);
+          // one round trip for the project, its first messages, quotes and documents
+          const r = await encryptPost("/get-project-view", { projectId: id });
+          const j = await decryptPost<{ project: any; messages?: any }>(r);
           if (j) {
+            setFirstMessages(j.messages);
             setProject({
               poNumber: j.project.po_number,
               client: j.project.client_company_name,
@@ -593,7 +596,9 @@ const ProjectView = () => {
           </div>
           <div className="w-full lg:w-[40%] lg:border-l border-t lg:border-t-0 flex-none h-full overflow-auto">
             <div className="flex flex-col h-full min-h-0 overflow-hidden">
-              <ChatUI projectId={id as string} clientname={project?.client || ""} clientId={project?.client_id} />
+              {project && (
+                <ChatUI projectId={id as string} clientname={project.client || ""} clientId={project.client_id} initialPage={firstMessages} />
+              )}
             </div>
           </div>
         </div>
@@ -0,0 +1,288 @@
+import base64
+import hashlib
+import hmac
+import json
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from uuid import UUID
+
+from asyncpg import Connection
+from fastapi import HTTPException
+
+from constants import SECRET_KEY
+
+# Count strategies an endpoint can pick for its "total_count" field.
+#   EXACT    -> sum the trigger-maintained row_counter shards (O(1))
+#   ESTIMATE -> planner statistics from pg_class.reltuples (O(1), approximate)
+#   HAS_MORE -> no total at all, only has_more from the LIMIT+1 probe
+EXACT = "exact"
+ESTIMATE = "estimate"
+HAS_MORE = "has_more"
+
+# Cursor directions
+NEXT = "next"
+PREV = "prev"
+AT = "at"
+
+
+def scopeKey(*values) -> str:
+    # Must match the key built by row_counter_refresh() in DbManager.py
+    if not values:
+        return "*"
+    return ":".join("" if v is None else str(v) for v in values)
+
+
+def trimPage(rows: list, size: int) -> tuple[list, bool]:
+    # Queries fetch size + 1 rows; the extra row only tells us another page exists
+    if len(rows) > size:
+        return rows[:size], True
+    return rows, False
+
+
+async def countRows(
+        conn: Connection,
+        strategy: str,
+        table: str,
+        counter: str | None = None,
+        scope: tuple = (),
+) -> int | None:
+    if strategy == EXACT:
+        total = await conn.fetchval(
+            "SELECT SUM(total) FROM row_counter WHERE counter=$1 AND scope_key=$2",
+            counter or table,
+            scopeKey(*scope),
+        )
+        return max(int(total or 0), 0)
+
+    if strategy == ESTIMATE:
+        # reltuples is -1 for a table that has never been vacuumed/analyzed
+        estimate = await conn.fetchval(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass($1)",
+            table,
+        )
+        return max(int(estimate or 0), 0)
+
+    return None
+
+
+class Keyset:
+    # Sort key of a list: (ts DESC, id DESC) on one table. Every keyset must be
+    # backed by an index ending in (<ts> DESC, <id> DESC), see INDICES in DbManager.py.
+    # "ts" is usually a timestamp but any numeric sort column works (tsType="numeric").
+    def __init__(self, table: str, alias: str, tsColumn: str = "created_at", idColumn: str = "id",
+                 idType: str = "uuid", tsType: str = "timestamptz"):
+        self.table = table
+        self.alias = alias
+        self.tsColumn = tsColumn
+        self.idColumn = idColumn
+        self.idType = idType
+        self.tsType = tsType
+
+    @property
+    def ts(self) -> str:
+        return f"{self.alias}.{self.tsColumn}"
+
+    @property
+    def id(self) -> str:
+        return f"{self.alias}.{self.idColumn}"
+
+    def castId(self, value):
+        return UUID(str(value)) if self.idType == "uuid" else value
+
+    def dumpTs(self, value) -> str:
+        return value.isoformat() if isinstance(value, datetime) else str(value)
+
+    def castTs(self, value: str):
+        try:
+            if self.tsType == "timestamptz":
+                dt = datetime.fromisoformat(value)
+                return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+            return Decimal(value)
+        except (ValueError, InvalidOperation):
+            raise HTTPException(status_code=400, detail=f"Invalid cursor value: '{value}'")
+
+
+class Cursor:
+    # ts is the serialized sort value, Keyset.castTs turns it back into a query argument
+    def __init__(self, scope: str, direction: str, ts: str | None = None, id: str | None = None):
+        self.scope = scope
+        self.direction = direction
+        self.ts = ts
+        self.id = id
+
+
+class Page:
+    def __init__(self, rows: list[dict], hasNext: bool, hasPrev: bool, nextCursor: str | None,
+                 prevCursor: str | None, lastTs: str | None, lastId: str | None):
+        self.rows = rows
+        self.hasNext = hasNext
+        self.hasPrev = hasPrev
+        self.nextCursor = nextCursor
+        self.prevCursor = prevCursor
+        self.lastTs = lastTs
+        self.lastId = lastId
+
+    def meta(self) -> dict:
+        return {
+            "has_more": self.hasNext,
+            "has_previous": self.hasPrev,
+            "next_cursor": self.nextCursor,
+            "prev_cursor": self.prevCursor,
+            # kept for callers that still page with the raw timestamp/id pair
+            "last_seen_created_at": self.lastTs,
+            "last_seen_id": self.lastId,
+        }
+
+
+def _b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _unb64(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(body: str) -> str:
+    return _b64(hmac.new(SECRET_KEY.encode(), body.encode(), hashlib.sha256).digest())
+
+
+def encodeCursor(scope: str, direction: str, ts: str, id) -> str:
+    body = _b64(json.dumps({"s": scope, "d": direction, "t": ts, "i": str(id)}).encode())
+    return f"{body}.{_sign(body)}"
+
+
+def decodeCursor(token: str, scope: str) -> Cursor:
+    try:
+        body, signature = token.split(".", 1)
+        if not hmac.compare_digest(signature, _sign(body)):
+            raise ValueError("bad signature")
+        data = json.loads(_unb64(body))
+        if data["s"] != scope or data["d"] not in (NEXT, PREV):
+            raise ValueError("wrong scope")
+        return Cursor(scope, data["d"], str(data["t"]), data["i"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def readCursor(params: dict, scope: str) -> Cursor | None:
+    # Accepts, in order: an opaque "cursor", an "anchor_id" to jump to, or the
+    # legacy last_seen_created_at / last_seen_id pair. None means first page.
+    token = params.get("cursor")
+    if token:
+        return decodeCursor(token, scope)
+
+    anchor = params.get("anchor_id")
+    if anchor:
+        return Cursor(scope, AT, id=str(anchor))
+
+    lastSeenCreatedAt = params.get("last_seen_created_at")
+    if not lastSeenCreatedAt:
+        return None
+    lastSeenId = params.get("last_seen_id") or "ffffffff-ffff-ffff-ffff-ffffffffffff"
+    return Cursor(scope, NEXT, str(lastSeenCreatedAt), str(lastSeenId))
+
+
+def pageQuery(
+        keyset: Keyset,
+        cursor: Cursor | None,
+        *,
+        select: str,
+        source: str,
+        size: int,
+        where: list[str] | None = None,
+        args: list | None = None,
+        groupBy: str | None = None,
+) -> tuple[str, list]:
+    # The page SELECT of fetchPage, an AT cursor already resolved to its key.
+    # benchmarks.py EXPLAINs it to check every list runs on its index.
+    where = list(where or [])
+    args = list(args or [])
+    direction = cursor.direction if cursor else NEXT
+
+    if cursor:
+        op = {NEXT: "<", PREV: ">", AT: "<="}[direction]
+        where.append(
+            f"({keyset.ts}, {keyset.id}) {op} (${len(args) + 1}::{keyset.tsType}, ${len(args) + 2}::{keyset.idType})"
+        )
+        args += [keyset.castTs(cursor.ts), keyset.castId(cursor.id)]
+
+    # Backward pages walk the same index in the opposite direction
+    order = "ASC" if direction == PREV else "DESC"
+    sql = f"""
+        SELECT {keyset.ts} AS _cursor_ts, {keyset.id} AS _cursor_id, {select}
+          FROM {source}
+         {"WHERE " + " AND ".join(where) if where else ""}
+         {"GROUP BY " + groupBy if groupBy else ""}
+         ORDER BY {keyset.ts} {order}, {keyset.id} {order}
+         LIMIT ${len(args) + 1};
+    """
+    return sql, args + [size + 1]
+
+
+async def fetchPage(
+        conn: Connection,
+        cursor: Cursor | None,
+        keyset: Keyset,
+        *,
+        scope: str,
+        select: str,
+        source: str,
+        size: int,
+        where: list[str] | None = None,
+        args: list | None = None,
+        groupBy: str | None = None,
+) -> Page:
+    where = list(where or [])
+    args = list(args or [])
+    direction = cursor.direction if cursor else NEXT
+
+    if cursor and direction == AT:
+        # The anchor must be a row of this very list, so it goes through the same
+        # source and filters. Otherwise any id, another client's or a deleted one,
+        # would position the page and give away that it exists.
+        anchorWhere = where + [f"{keyset.id} = ${len(args) + 1}::{keyset.idType}"]
+        key = await conn.fetchrow(
+            f"""
+            SELECT {keyset.ts} AS ts, {keyset.id} AS id
+              FROM {source}
+             WHERE {" AND ".join(anchorWhere)}
+             {"GROUP BY " + groupBy if groupBy else ""}
+             LIMIT 1;
+            """,
+            *args,
+            keyset.castId(cursor.id),
+        )
+        if not key:
+            raise HTTPException(status_code=404, detail="Anchor not found")
+        cursor = Cursor(scope, AT, keyset.dumpTs(key["ts"]), str(key["id"]))
+
+    sql, queryArgs = pageQuery(
+        keyset, cursor, select=select, source=source, size=size, where=where, args=args, groupBy=groupBy
+    )
+    rows, extra = trimPage(await conn.fetch(sql, *queryArgs), size)
+
+    if direction == PREV:
+        rows = list(reversed(rows))
+        hasNext, hasPrev = True, extra
+    else:
+        hasNext, hasPrev = extra, cursor is not None
+
+    records = []
+    for r in rows:
+        d = dict(r)
+        d.pop("_cursor_ts")
+        d.pop("_cursor_id")
+        records.append(d)
+
+    first, last = (rows[0], rows[-1]) if rows else (None, None)
+    firstTs = keyset.dumpTs(first["_cursor_ts"]) if first else None
+    lastTs = keyset.dumpTs(last["_cursor_ts"]) if last else None
+    return Page(
+        records,
+        hasNext,
+        hasPrev,
+        encodeCursor(scope, NEXT, lastTs, last["_cursor_id"]) if last and hasNext else None,
+        encodeCursor(scope, PREV, firstTs, first["_cursor_id"]) if first and hasPrev else None,
+        lastTs,
+        str(last["_cursor_id"]) if last else None,
+    )
@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+import asyncpg
+from asyncpg import Connection, Pool, create_pool
+
+REPLICA_POOL_MIN = 2
+REPLICA_POOL_MAX = 20
+REPLICA_MAX_LAG_SECONDS = 5.0  # reads go to the primary while the replica is further behind
+LAG_POLL_SECONDS = 2
+ACQUIRE_TIMEOUT_SECONDS = 1.0
+
+# Replay delay of a streaming replica. An instance that is not in recovery
+# (e.g. a second local Postgres used for testing) reports no lag.
+LAG_SQL = """
+    SELECT CASE
+             WHEN NOT pg_is_in_recovery() THEN 0
+             WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+             ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+           END::float8;
+"""
+
+
+class Replica:
+    # Optional read replica. A background task measures its lag; reads are
+    # routed here only while it answers and stays within REPLICA_MAX_LAG_SECONDS.
+    # Any failure marks it down until the next successful probe.
+    def __init__(self, url: str):
+        self.url = url
+        self.pool: Pool | None = None
+        self.healthy = False
+        self.lagSeconds: float | None = None
+        self.lastError: str | None = None
+        self.checkedAt: float | None = None
+        self.task = None
+
+    async def start(self):
+        self.task = asyncio.create_task(self.monitor())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+        if self.pool:
+            await self.pool.close()
+
+    def markDown(self, error: Exception):
+        if self.healthy:
+            print(f"[replica] unavailable, reading from primary: {error}")
+        self.healthy = False
+        self.lastError = str(error)
+
+    async def probe(self):
+        try:
+            if self.pool is None:
+                self.pool = await create_pool(dsn=self.url, min_size=REPLICA_POOL_MIN, max_size=REPLICA_POOL_MAX)
+            async with self.pool.acquire(timeout=ACQUIRE_TIMEOUT_SECONDS) as conn:
+                self.lagSeconds = await conn.fetchval(LAG_SQL)
+        except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+            self.markDown(e)
+            return
+        finally:
+            self.checkedAt = time.time()
+
+        wasHealthy = self.healthy
+        self.healthy = self.lagSeconds <= REPLICA_MAX_LAG_SECONDS
+        self.lastError = None if self.healthy else f"lag {self.lagSeconds:.1f}s"
+        if self.healthy and not wasHealthy:
+            print(f"[replica] serving reads, lag {self.lagSeconds:.1f}s")
+
+    async def monitor(self):
+        while True:
+            await self.probe()
+            await asyncio.sleep(LAG_POLL_SECONDS)
+
+    async def acquire(self) -> Connection | None:
+        # None tells the caller to use the primary
+        if not self.healthy:
+            return None
+        try:
+            return await self.pool.acquire(timeout=ACQUIRE_TIMEOUT_SECONDS)
+        except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+            self.markDown(e)
+            return None
+
+    async def release(self, conn: Connection):
+        await self.pool.release(conn)
+
+    def status(self) -> dict:
+        return {
+            "configured": True,
+            "healthy": self.healthy,
+            "lag_seconds": self.lagSeconds,
+            "max_lag_seconds": REPLICA_MAX_LAG_SECONDS,
+            "last_error": self.lastError,
+            "checked_at": self.checkedAt,
+        }
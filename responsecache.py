@@ -0,0 +1,205 @@
+import asyncio
+import hashlib
+import json
+import math
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from asyncpg import Connection, Pool
+from fastapi.encoders import jsonable_encoder
+
+MAX_LOCAL_ENTRIES = 2000
+REFRESH_ACQUIRE_TIMEOUT_SECONDS = 2.0
+REFRESH_LOCK_SECONDS = 10  # one backend refreshes a shared entry, the others keep serving it stale
+INVALIDATE_CHANNEL = "response_cache_invalidate"
+KEY_PREFIX = "rcache"
+
+
+class CachePolicy:
+    # Entries are fresh for ttl seconds, then served stale for up to staleFor
+    # more while a background refresh runs
+    def __init__(self, ttl: float, staleFor: float):
+        self.ttl = ttl
+        self.staleFor = staleFor
+
+
+class ResponseCache:
+    # Response data (before per-user encryption) keyed by route, scope and
+    # request parameters. Entries live in this process and, with a Redis client,
+    # also in Redis where every backend finds them. invalidate() bumps the
+    # route's generation, which is part of every key, so old entries are simply
+    # never read again; other backends hear about it over INVALIDATE_CHANNEL.
+    def __init__(self, pool: Pool, policies: dict[str, CachePolicy], redis=None):
+        self.pool = pool
+        self.policies = policies
+        self.redis = redis
+        self.entries: OrderedDict[str, tuple[dict, float, float]] = OrderedDict()
+        self.generations: dict[str, int] = {}
+        self.refreshing: dict[str, asyncio.Task] = {}
+        self.routes: dict[str, dict] = {}
+        self.task = None
+
+    async def start(self):
+        if self.redis is None:
+            return
+        for route in self.policies:
+            gen = await self.redis.get(f"{KEY_PREFIX}:gen:{route}")
+            self.generations[route] = int(gen or 0)
+        self.task = asyncio.create_task(self.listen())
+
+    async def stop(self):
+        tasks = list(self.refreshing.values()) + ([self.task] if self.task else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def route(self, route: str) -> dict:
+        r = self.routes.get(route)
+        if r is None:
+            r = self.routes[route] = {
+                "hits": 0, "stale_hits": 0, "shared_hits": 0, "misses": 0,
+                "refreshes": 0, "refresh_errors": 0, "invalidations": 0,
+            }
+        return r
+
+    def key(self, route: str, scope: str, params: dict) -> str:
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()[:16]
+        return f"{KEY_PREFIX}:{route}:{self.generations.get(route, 0)}:{scope}:{digest}"
+
+    async def get(self, route: str, scope: str, params: dict, conn: Connection,
+                  load: Callable[[Connection], Awaitable[dict]]) -> dict:
+        policy = self.policies[route]
+        key = self.key(route, scope, params)
+        stats = self.route(route)
+
+        entry = await self.lookup(key, stats)
+        if entry:
+            payload, freshUntil, staleUntil = entry
+            now = time.time()
+            if now < freshUntil:
+                stats["hits"] += 1
+                return payload
+            if now < staleUntil:
+                stats["stale_hits"] += 1
+                self.refreshLater(route, key, policy, load)
+                return payload
+
+        stats["misses"] += 1
+        payload = jsonable_encoder(await load(conn))
+        if getattr(conn, "pool", "primary") == "primary":
+            await self.store(key, payload, policy)
+        else:
+            # A lagging replica could fill the generation a write just bumped
+            # with rows from before that write, the entry is loaded from the
+            # primary instead
+            self.refreshLater(route, key, policy, load)
+        return payload
+
+    async def lookup(self, key: str, stats: dict) -> tuple[dict, float, float] | None:
+        entry = self.entries.get(key)
+        if entry:
+            self.entries.move_to_end(key)
+            return entry
+        if self.redis is None:
+            return None
+        try:
+            raw = await self.redis.get(key)
+        except Exception as e:
+            print(f"[cache] redis read failed: {e}")
+            return None
+        if not raw:
+            return None
+        stored = json.loads(raw)
+        entry = (stored["payload"], stored["fresh_until"], stored["stale_until"])
+        self.remember(key, entry)
+        stats["shared_hits"] += 1
+        return entry
+
+    def remember(self, key: str, entry: tuple[dict, float, float]):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > MAX_LOCAL_ENTRIES:
+            self.entries.popitem(last=False)
+
+    async def store(self, key: str, payload: dict, policy: CachePolicy):
+        now = time.time()
+        entry = (payload, now + policy.ttl, now + policy.ttl + policy.staleFor)
+        self.remember(key, entry)
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(
+                key,
+                json.dumps({"payload": payload, "fresh_until": entry[1], "stale_until": entry[2]}),
+                ex=math.ceil(policy.ttl + policy.staleFor),
+            )
+        except Exception as e:
+            print(f"[cache] redis write failed: {e}")
+
+    def refreshLater(self, route: str, key: str, policy: CachePolicy, load: Callable[[Connection], Awaitable[dict]]):
+        if key in self.refreshing:
+            return
+        task = asyncio.create_task(self.refresh(route, key, policy, load))
+        self.refreshing[key] = task
+        task.add_done_callback(lambda _: self.refreshing.pop(key, None))
+
+    async def refresh(self, route: str, key: str, policy: CachePolicy, load: Callable[[Connection], Awaitable[dict]]):
+        # Runs after the request that noticed the stale or missing entry has
+        # finished, so it takes its own connection from the primary pool
+        stats = self.route(route)
+        try:
+            if self.redis is not None and not await self.redis.set(f"{key}:refresh", 1, nx=True, ex=REFRESH_LOCK_SECONDS):
+                return
+            async with self.pool.acquire(timeout=REFRESH_ACQUIRE_TIMEOUT_SECONDS) as conn:
+                payload = jsonable_encoder(await load(conn))
+            await self.store(key, payload, policy)
+            stats["refreshes"] += 1
+        except Exception as e:
+            stats["refresh_errors"] += 1
+            print(f"[cache] refresh of {route} failed: {e}")
+
+    def drop(self, route: str, generation: int):
+        self.generations[route] = max(self.generations.get(route, 0), generation)
+        prefix = f"{KEY_PREFIX}:{route}:"
+        for key in [k for k in self.entries if k.startswith(prefix)]:
+            del self.entries[key]
+
+    async def invalidate(self, *routes: str):
+        for route in routes:
+            self.route(route)["invalidations"] += 1
+            if self.redis is None:
+                self.drop(route, self.generations.get(route, 0) + 1)
+                continue
+            try:
+                generation = await self.redis.incr(f"{KEY_PREFIX}:gen:{route}")
+                self.drop(route, generation)
+                await self.redis.publish(INVALIDATE_CHANNEL, f"{route} {generation}")
+            except Exception as e:
+                # Other backends keep their entries until these expire
+                self.drop(route, self.generations.get(route, 0) + 1)
+                print(f"[cache] shared invalidation of {route} failed: {e}")
+
+    async def listen(self):
+        pub = self.redis.pubsub()
+        await pub.subscribe(INVALIDATE_CHANNEL)
+        async for m in pub.listen():
+            if m.get("type") != "message":
+                continue
+            d = m.get("data")
+            if isinstance(d, bytes):
+                d = d.decode()
+            try:
+                route, generation = d.rsplit(" ", 1)
+                self.drop(route, int(generation))
+            except ValueError:
+                print(f"[cache] bad invalidation message: {d[:200]}")
+
+    def snapshot(self) -> dict:
+        return {
+            "shared": self.redis is not None,
+            "local_entries": len(self.entries),
+            "refreshing": len(self.refreshing),
+            "policies": {r: {"ttl": p.ttl, "stale_for": p.staleFor} for r, p in self.policies.items()},
+            "routes": self.routes,
+        }
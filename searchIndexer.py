@@ -0,0 +1,133 @@
+import asyncio
+import os
+import socket
+from uuid import UUID
+
+import asyncpg
+
+from constants import ASYNCPG_URL
+from DbManager import SEARCH_REINDEX_SOURCES
+
+# Channel the search_reindex_enqueue() trigger NOTIFYs on
+REINDEX_CHANNEL = "search_reindex"
+
+BATCH_SIZE = 200  # queue entries claimed at a time
+CHUNK_SIZE = 500  # project rows rewritten per UPDATE, each in its own transaction
+POLL_SECONDS = 30  # wake up even without a NOTIFY, e.g. after a restart
+LEASE_SECONDS = 300  # a claim left this long (crashed worker) is taken over
+
+WORKER = f"{socket.gethostname()}:{os.getpid()}"
+PROJECT_COLUMNS = {source: column for source, _, column, _ in SEARCH_REINDEX_SOURCES}
+
+CLAIM_SQL = """
+    UPDATE search_reindex_queue
+       SET claimed_at = clock_timestamp(), claimed_by = $2
+     WHERE id IN (
+       SELECT id FROM search_reindex_queue
+        WHERE claimed_at IS NULL OR claimed_at < clock_timestamp() - make_interval(secs => $3)
+        ORDER BY id
+        LIMIT $1
+        FOR UPDATE SKIP LOCKED
+     )
+    RETURNING id, source_table, source_id, enqueued_at;
+"""
+
+# Hands entries back to the queue after a failed batch
+RELEASE_SQL = """
+    UPDATE search_reindex_queue SET claimed_at = NULL, claimed_by = NULL
+     WHERE id = ANY($1::bigint[]) AND claimed_by = $2;
+"""
+
+PROGRESS_SQL = """
+    INSERT INTO search_reindex_progress (worker, changes_done, projects_written, last_lag_ms, last_batch_at)
+    VALUES ($1, $2, $3, COALESCE($4::bigint, 0), now())
+    ON CONFLICT (worker) DO UPDATE SET
+      changes_done     = search_reindex_progress.changes_done + EXCLUDED.changes_done,
+      projects_written = search_reindex_progress.projects_written + EXCLUDED.projects_written,
+      last_lag_ms      = COALESCE($4::bigint, search_reindex_progress.last_lag_ms),
+      last_batch_at    = EXCLUDED.last_batch_at;
+"""
+
+
+async def rewrite_projects(conn, column: str, ids: list[UUID]) -> int:
+    # Walk the affected projects in id order and commit every chunk on its own,
+    # so a rename of a widely used status or user never holds row locks on all
+    # of its projects at once. Rewriting is idempotent, a retried batch only
+    # redoes the chunks that still differ.
+    written = 0
+    lastId = UUID(int=0)
+    while True:
+        chunk = await conn.fetch(
+            f"SELECT id FROM project WHERE {column} = ANY($1::uuid[]) AND id > $2 ORDER BY id LIMIT $3",
+            ids, lastId, CHUNK_SIZE,
+        )
+        if not chunk:
+            return written
+        chunkIds = [r["id"] for r in chunk]
+        async with conn.transaction():
+            result = await conn.execute(
+                """
+                UPDATE project p
+                   SET search_text = project_search_text(p)
+                 WHERE p.id = ANY($1::uuid[])
+                   AND p.search_text IS DISTINCT FROM project_search_text(p);
+                """,
+                chunkIds,
+            )
+            chunkWritten = int(result.split()[-1])
+            await conn.execute(PROGRESS_SQL, WORKER, 0, chunkWritten, None)
+        written += chunkWritten
+        lastId = chunkIds[-1]
+
+
+async def drain(conn):
+    while True:
+        rows = await conn.fetch(CLAIM_SQL, BATCH_SIZE, WORKER, LEASE_SECONDS)
+        if not rows:
+            return
+        claimed = [r["id"] for r in rows]
+
+        bySource = {}
+        for r in rows:
+            bySource.setdefault(r["source_table"], set()).add(r["source_id"])
+
+        written = 0
+        try:
+            for source, ids in bySource.items():
+                column = PROJECT_COLUMNS.get(source)
+                if column:
+                    written += await rewrite_projects(conn, column, list(ids))
+        except Exception:
+            await conn.execute(RELEASE_SQL, claimed, WORKER)
+            raise
+
+        async with conn.transaction():
+            await conn.execute("DELETE FROM search_reindex_queue WHERE id = ANY($1::bigint[])", claimed)
+            lagMs = await conn.fetchval(
+                "SELECT (EXTRACT(EPOCH FROM clock_timestamp() - $1::timestamptz) * 1000)::bigint",
+                min(r["enqueued_at"] for r in rows),
+            )
+            await conn.execute(PROGRESS_SQL, WORKER, len(rows), 0, lagMs)
+        print(f"[search_reindex] {len(rows)} changes, {written} projects rewritten, lag {lagMs} ms")
+
+
+async def listener():
+    conn = await asyncpg.connect(dsn=ASYNCPG_URL)
+    wake = asyncio.Event()
+    await conn.add_listener(REINDEX_CHANNEL, lambda *_: wake.set())
+    print(f"Listening on '{REINDEX_CHANNEL}' as {WORKER}...")
+
+    try:
+        while True:
+            await drain(conn)
+            try:
+                await asyncio.wait_for(wake.wait(), timeout=POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            wake.clear()
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(listener())